@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+
+"""At-Most-One/One-Hot 制約の符号化方法の比較を行うプログラム
+:file: bench_amo.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_amo [-f <制約の種類>] [-s <SATプログラム名>] [<問題ファイル名> ...]
+- 問題ファイルを省略した場合は bench.genproblem で生成した問題を用いる．
+- 制約の種類を指定した場合はその種類のみ符号化方法を変え，残りは pairwise とする．
+  省略した場合は全ての種類で同じ符号化方法を用いる．
+- SATプログラムを省略した場合は組み込みの CdclSolver を用いる．
+符号化方法ごとに以下の値を出力する．
+- 変数の数，節数，リテラル数
+- エンコードの時間
+- solve_adc2019() の実行時間
+"""
+
+import argparse
+import time
+from core.adc2019parser import Adc2019Parser
+from sat.satsolver import SatSolver
+from sat.satbool3 import SatBool3
+from sat.adc2019enc import Adc2019Enc, AMO_FAMILY_LIST, solve_adc2019
+from sat.amoencoder import AMO_METHOD_LIST
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+default_param_list = [
+    (6, 6, 4, 3, 1),
+    (8, 8, 6, 4, 2),
+    (10, 10, 8, 6, 2),
+]
+
+
+def measure_cnf(problem, width, height, enc_options):
+    """エンコードのみを行って CNF の大きさを計測する．
+    :return: (変数の数, 節数, リテラル数, エンコード時間) を返す．
+    """
+    start = time.perf_counter()
+    solver = SatSolver('dummy')
+    enc = Adc2019Enc(solver, problem, width, height, **enc_options)
+    enc.gen_placement_constraint()
+    enc.gen_routing_constraint()
+    enc_time = time.perf_counter() - start
+    solver._flush_lits()
+    return solver._var_count, solver._clause_num, len(solver._lit_array), enc_time
+
+
+def measure_solve(problem, width, height, satprog, enc_options, time_limit):
+    """solve_adc2019() を実行して時間を計測する．
+    :return: (結果, 実行時間) を返す．
+    """
+    start = time.perf_counter()
+    stat, ans = solve_adc2019(problem, width, height, satprog,
+                              time_limit=time_limit, enc_options=enc_options)
+    return stat, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-f', '--family', type=str, choices=AMO_FAMILY_LIST,
+                        help='specify the constraint family to vary')
+    parser.add_argument('-s', '--satprog', type=str, default='cdcl',
+                        help='specify the SAT program')
+    parser.add_argument('-t', '--time-limit', type=float,
+                        help='specify the time limit of each solve')
+    parser.add_argument('input', type=str, nargs='*',
+                        help='problem filename')
+    args = parser.parse_args()
+
+    problem_list = []
+    if args.input:
+        for ifile in args.input:
+            with open(ifile, 'rt') as fin:
+                problem = Adc2019Parser().read_problem(fin)
+                if not problem:
+                    print(f'{ifile}: read failed.')
+                    exit(-1)
+                problem_list.append((ifile, problem))
+    else:
+        for param in default_param_list:
+            w, h, nb, nl, seed = param
+            name = f'gen{w}x{h}_b{nb}_l{nl}_s{seed}'
+            problem_list.append((name, gen_problem(w, h, nb, nl, seed=seed)))
+
+    print(f'{"problem":<24} {"method":<10} {"vars":>8} {"clauses":>9} {"literals":>9}'
+          f' {"encode":>9} {"result":>7} {"solve":>9}')
+    for name, problem in problem_list:
+        width = problem.max_width
+        height = problem.max_height
+        for method in AMO_METHOD_LIST:
+            if args.family is None:
+                amo_encoding = method
+            else:
+                amo_encoding = {args.family: method}
+            enc_options = {'amo_encoding': amo_encoding}
+            nv, nc, nl, enc_time = measure_cnf(problem, width, height, enc_options)
+            stat, solve_time = measure_solve(problem, width, height, args.satprog,
+                                             enc_options, args.time_limit)
+            if stat == SatBool3.TRUE:
+                result = 'SAT'
+            elif stat == SatBool3.FALSE:
+                result = 'UNSAT'
+            else:
+                result = 'UNKNOWN'
+            print(f'{name:<24} {method:<10} {nv:>8} {nc:>9} {nl:>9}'
+                  f' {enc_time:>8.3f}s {result:>7} {solve_time:>8.3f}s')
@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+
+"""組み込みの CdclSolver と外部プログラムを用いる SatSolver の比較を行うプログラム
+:file: bench_cdcl.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_cdcl [-s <SATプログラム名>] [<問題ファイル名> ...]
+- 問題ファイルを省略した場合は bench.genproblem で生成した問題を用いる．
+- SATプログラムを省略した場合は CdclSolver を MiniSat2 互換のコマンドとして
+  起動するスクリプトを用いる．この場合，両者の差はプロセス起動と
+  ファイル入出力のオーバーヘッドとなる．
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from core.adc2019parser import Adc2019Parser
+from sat.adc2019enc import solve_adc2019
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+default_param_list = [
+    (6, 6, 4, 3, 1),
+    (8, 8, 6, 4, 2),
+    (10, 10, 8, 6, 2),
+]
+
+
+def make_cdcl_command(dirname):
+    """CdclSolver を MiniSat2 互換のコマンドとして起動するスクリプトを作る．
+    :param str dirname: スクリプトを置くディレクトリ
+    :return: スクリプトのパスを返す．
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(dirname, 'cdcl_minisat')
+    with open(path, 'wt') as fout:
+        fout.write('#! /bin/sh\n')
+        fout.write(f'PYTHONPATH="{root}" exec "{sys.executable}" -m sat.cdclsolver "$@"\n')
+    os.chmod(path, 0o755)
+    return path
+
+
+def run(problem, width, height, satprog, repeat):
+    """solve_adc2019() を repeat 回実行して平均時間を求める．
+    :return: (平均時間, 解) を返す．
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        stat, ans = solve_adc2019(problem, width, height, satprog)
+    return (time.perf_counter() - start) / repeat, ans
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--satprog', type=str,
+                        help='specify the SAT program')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='specify the repeat count')
+    parser.add_argument('input', type=str, nargs='*',
+                        help='problem filename')
+    args = parser.parse_args()
+
+    problem_list = []
+    if args.input:
+        for ifile in args.input:
+            with open(ifile, 'rt') as fin:
+                problem = Adc2019Parser().read_problem(fin)
+                if not problem:
+                    print(f'{ifile}: read failed.')
+                    exit(-1)
+                problem_list.append((ifile, problem))
+    else:
+        for param in default_param_list:
+            w, h, nb, nl, seed = param
+            name = f'gen{w}x{h}_b{nb}_l{nl}_s{seed}'
+            problem_list.append((name, gen_problem(w, h, nb, nl, seed=seed)))
+
+    with tempfile.TemporaryDirectory() as dirname:
+        satprog = args.satprog
+        if satprog is None:
+            satprog = make_cdcl_command(dirname)
+
+        print(f'{"problem":<24} {"size":>7} {"result":>6} {"subprocess":>11} {"cdcl":>11} {"ratio":>6}')
+        for name, problem in problem_list:
+            width = problem.max_width
+            height = problem.max_height
+            t1, ans1 = run(problem, width, height, satprog, args.repeat)
+            t2, ans2 = run(problem, width, height, 'cdcl', args.repeat)
+            assert (ans1 is None) == (ans2 is None)
+            result = 'UNSAT' if ans2 is None else 'SAT'
+            size = f'{width}x{height}'
+            print(f'{name:<24} {size:>7} {result:>6} {t1:>10.3f}s {t2:>10.3f}s {t1 / t2:>6.2f}')
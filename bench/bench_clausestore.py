@@ -0,0 +1,118 @@
+#! /usr/bin/env python3
+
+"""SatSolver の節の保持方法によるメモリ使用量と速度の比較を行うプログラム
+:file: bench_clausestore.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_clausestore
+生成した問題をエンコードし，節をリストのリストで保持する従来の方法(list)と
+array('i') で保持する方法(array)の以下の値を比較する．
+- エンコード後のメモリ使用量
+- エンコードの時間(list に対する比率も出力する)
+- DIMACS 形式での書き出し時間
+tracemalloc はメモリの確保ごとに時間がかかり，エンコードの時間を歪めるので，
+メモリ使用量は時間とは別にもう一度エンコードして計測する．
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from sat.satsolver import SatSolver
+from sat.adc2019enc import Adc2019Enc
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+default_param_list = [
+    (10, 10, 8, 6, 2),
+    (16, 16, 16, 10, 3),
+    (20, 20, 24, 14, 4),
+]
+
+
+class ListSatSolver(SatSolver):
+    """節をリストのリストで保持する(従来の) SatSolver"""
+
+    def __init__(self, satprog):
+        super().__init__(satprog)
+        self._clause_list = []
+
+    def add_clause(self, *args):
+        tmp_list = []
+        for arg in args:
+            if isinstance(arg, int):
+                lit = arg
+                if self._check_lit(lit):
+                    tmp_list.append(lit)
+            else:
+                for lit in arg:
+                    if not self._check_lit(lit):
+                        return
+                    tmp_list.append(lit)
+        self._clause_list.append(tmp_list)
+        self._clause_num += 1
+
+    def write_dimacs(self, fout, assumption_list=[]):
+        clause_num = len(self._clause_list) + len(assumption_list)
+        fout.write(f'p cnf {self._var_count} {clause_num}\n')
+        for lit_list in self._clause_list:
+            for lit in lit_list:
+                fout.write(f' {lit}')
+            fout.write(' 0\n')
+        for lit in assumption_list:
+            fout.write(f' {lit} 0\n')
+
+
+def encode(solver_class, problem, width, height):
+    """エンコードを行う．
+    :return: 節を保持した SAT ソルバを返す．
+    """
+    solver = solver_class('dummy')
+    enc = Adc2019Enc(solver, problem, width, height)
+    enc.gen_placement_constraint()
+    enc.gen_routing_constraint()
+    return solver
+
+
+def measure(solver_class, problem, width, height):
+    """エンコードと書き出しを行って計測する．
+    :return: (節数, メモリ使用量, エンコード時間, 書き出し時間) を返す．
+    """
+    tracemalloc.start()
+    solver = encode(solver_class, problem, width, height)
+    mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del solver
+
+    start = time.perf_counter()
+    solver = encode(solver_class, problem, width, height)
+    enc_time = time.perf_counter() - start
+
+    (fh, dimacs_file) = tempfile.mkstemp()
+    with os.fdopen(fh, 'w') as fout:
+        start = time.perf_counter()
+        solver.write_dimacs(fout)
+        write_time = time.perf_counter() - start
+    os.remove(dimacs_file)
+    return solver._clause_num, mem, enc_time, write_time
+
+
+if __name__ == '__main__':
+
+    print(f'{"size":>7} {"clauses":>9} {"store":>6} {"memory":>10} {"encode":>9}'
+          f' {"ratio":>6} {"write":>9}')
+    for w, h, nb, nl, seed in default_param_list:
+        problem = gen_problem(w, h, nb, nl, seed=seed)
+        size = f'{w}x{h}'
+        base_time = None
+        for name, solver_class in (('list', ListSatSolver), ('array', SatSolver)):
+            nc, mem, enc_time, write_time = measure(solver_class, problem, w, h)
+            if base_time is None:
+                base_time = enc_time
+            ratio = enc_time / base_time * 100.0
+            print(f'{size:>7} {nc:>9} {name:>6} {mem / 1e6:>8.2f}MB {enc_time:>8.3f}s'
+                  f' {ratio:>5.1f}% {write_time:>8.3f}s')
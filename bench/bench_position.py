@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+"""Position の基本操作とエンコードの時間を計測するプログラム
+:file: bench_position.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_position [-n <盤面の大きさ>] [-r <繰り返し回数>]
+エンコーダの内側のループで用いられる以下の操作の時間(繰り返しの最小値)を出力する．
+- new      : 盤面の全てのグリッドの Position を作る．
+- add      : アンカーとブロック内の位置の加算
+- adjacent : 全てのグリッドの4方向の隣の位置を求める．
+- dict     : (Position, 線分番号) をキーとする辞書を作って全てのキーを引く．
+- encode   : bench.genproblem で生成した問題を n x n の盤面でエンコードする．
+また，n x n の盤面の Position のハッシュ値の衝突の数を出力する．
+"""
+
+import argparse
+import time
+from core.position import Position
+from sat.satsolver import SatSolver
+from sat.adc2019enc import Adc2019Enc
+from bench.genproblem import gen_problem
+
+
+# 線分番号の数
+LINE_NUM = 8
+
+
+def best_time(func, repeat):
+    """func() を repeat 回実行した時間の最小値を返す．"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        t = time.perf_counter() - start
+        if best is None or t < best:
+            best = t
+    return best
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--size', type=int, default=60,
+                        help='specify the board size [default: 60]')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='specify the number of repetitions [default: 5]')
+    args = parser.parse_args()
+    n = args.size
+
+    pos_list = [Position(x, y) for y in range(n) for x in range(n)]
+    offset_list = [Position(x, y) for y in range(3) for x in range(3)]
+    key_list = [(pos, line_id) for pos in pos_list for line_id in range(1, LINE_NUM + 1)]
+
+    def do_new():
+        for y in range(n):
+            for x in range(n):
+                Position(x, y)
+
+    def do_add():
+        for anchor in pos_list:
+            for offset in offset_list:
+                anchor + offset
+
+    def do_adjacent():
+        for pos in pos_list:
+            for dir in ('n', 'e', 's', 'w'):
+                pos.adjacent_pos(dir)
+
+    def do_dict():
+        var_dict = {key: i for i, key in enumerate(key_list)}
+        for pos in pos_list:
+            for line_id in range(1, LINE_NUM + 1):
+                var_dict[pos, line_id]
+
+    problem = gen_problem(10, 10, 8, 6, seed=2)
+
+    def do_encode():
+        solver = SatSolver('dummy')
+        enc = Adc2019Enc(solver, problem, n, n)
+        enc.gen_placement_constraint()
+        enc.gen_routing_constraint()
+
+    collisions = len(pos_list) - len(set(hash(pos) for pos in pos_list))
+    print(f'board {n}x{n}, hash collisions: {collisions}')
+    for name, func, repeat in (('new', do_new, args.repeat),
+                               ('add', do_add, args.repeat),
+                               ('adjacent', do_adjacent, args.repeat),
+                               ('dict', do_dict, args.repeat),
+                               ('encode', do_encode, 1)):
+        print(f'{name:<10} {best_time(func, repeat):>8.4f}s')
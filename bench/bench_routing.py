@@ -0,0 +1,308 @@
+#! /usr/bin/env python3
+
+"""枝に関する制約の生成方法の比較を行うプログラム
+:file: bench_routing.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_routing [<問題ファイル名> ...]
+- 問題ファイルを省略した場合は bench.genproblem で生成した問題を用いる．
+Adc2019Enc は枝に関する制約('degree', 'equality', 'uturn')を Board の枝と
+2x2 の窓の配列を順に走査して作る(array)．
+このプログラムはグリッドと方向ごとに隣接関係をたどって作る基準の方法(loop)を持ち，
+各問題について以下の条件を変えながら両者の CNF を作って比較する．
+- 盤面の大きさ(問題の最大の大きさの SCALE_LIST 倍の盤面と
+  SHRINK_LIST だけ縮めた盤面)
+- 配線領域の有無(なしの場合は全てのグリッドを全ての線分の配線領域とする)
+  配線領域が盤面全体より狭くなるのは空きグリッドの少ない盤面に限られるので，
+  縮めた盤面を用いる．
+- size_activation の有無
+- 'edge' の One-Hot 制約の符号化方法(EDGE_AMO_LIST)
+条件ごとに以下の値を出力する．
+- 配線領域に含まれる (グリッド, 線分) の組の割合(配線領域なしの場合は 100%)
+- 'degree', 'equality', 'uturn' の節数の合計と生成時間
+- 全体のエンコード時間
+- 両者の CNF の変数の数と節の集合(節内のリテラルを昇順に並べたもの)が一致するか
+一致しないものがあった場合は終了コード 1 で終了する．
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from core.adc2019parser import Adc2019Parser
+from core.board import get_board, DIR_LIST
+from sat.satsolver import SatSolver
+from sat.adc2019enc import Adc2019Enc
+from sat.adc2019domain import Adc2019Domain
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+# 最初の2つは縮めた盤面で配線領域が狭くなる問題
+default_param_list = [
+    (5, 4, 3, 2, 0),
+    (6, 5, 4, 3, 1),
+    (6, 6, 4, 3, 1),
+    (10, 10, 8, 6, 2),
+    (16, 8, 10, 6, 3),
+]
+
+# 試す盤面の大きさの倍率(問題の最大の大きさに対する倍率)
+SCALE_LIST = (1, 2)
+
+# 試す縮めた盤面(問題の最大の大きさから減らす (幅, 高さ))
+SHRINK_LIST = ((0, 1), (1, 1), (2, 2))
+
+# 試す 'edge' の One-Hot 制約の符号化方法
+EDGE_AMO_LIST = ('pairwise', 'seqcounter')
+
+# 比較する制約の種類
+EDGE_FAMILY_LIST = ('degree', 'equality', 'uturn')
+
+
+def _attr(enc, name):
+    """Adc2019Enc のプライベートな属性を返す．
+    :param Adc2019Enc enc: エンコーダ
+    :param str name: 属性名(先頭の '__' を除いたもの)
+    基準の方法はエンコーダの内部の変数を直接参照するので，このプログラムに限って用いる．
+    """
+    return getattr(enc, '_Adc2019Enc__' + name)
+
+
+def _gen_edge_constraint_loop(enc):
+    """枝に関する制約('degree', 'equality', 'uturn')を基準の方法で作る．
+    :param Adc2019Enc enc: エンコーダ
+    グリッドと方向ごとに隣接関係をたどって節を作る．
+    'equality' の節は枝の両端のグリッドから2回ずつ作られる．
+    """
+    solver = _attr(enc, 'solver')
+    board = _attr(enc, 'board')
+    e_var_list = _attr(enc, 'e_var_list')
+    t_var_list = _attr(enc, 't_var_list')
+    b_var_list = _attr(enc, 'b_var_list')
+    line_var = _attr(enc, 'line_var')
+    set_stats_family = _attr(enc, 'set_stats_family')
+    width = _attr(enc, 'width')
+    height = _attr(enc, 'height')
+
+    def edge_var(index, dir):
+        # 盤面の外側の場合と変数が作られなかった場合は None を返す．
+        edge = board.edge_index(index, dir)
+        if edge == -1:
+            return None
+        return e_var_list[edge]
+
+    # 各グリッドに接続する枝に関する制約を作る．
+    set_stats_family('degree')
+    for index in range(board.grid_num):
+        var_list = list()
+        for dir in DIR_LIST:
+            var = edge_var(index, dir)
+            if var is None:
+                continue
+            var_list.append(var)
+
+        # 端子が置かれない(ブロックに覆われない)グリッドでは None となる．
+        t_var = t_var_list[index]
+        b_var = b_var_list[index]
+
+        # pos が線分の端子の場合
+        # 1個の変数が選ばれる．
+        if t_var is not None:
+            _attr(enc, 'amo_encoder_dict')['edge'].gen_one_hot(var_list, t_var)
+
+        # pos が端子以外のブロックの場合，
+        # 変数は選ばれない．
+        if b_var is not None:
+            t_lits = [] if t_var is None else [t_var]
+            for var in var_list:
+                solver.add_clause(-b_var, t_lits, -var)
+
+        # pos がそれ以外の場合
+        # 0 個か 2 個の変数が選ばれる．
+        cond = None if b_var is None else -b_var
+        _attr(enc, 'gen_zero_or_two_hot_constraints_with_cond')(var_list, cond)
+
+    # 枝が選択されている時にその両端のグリッドの線分番号が等しくなるという制約
+    set_stats_family('equality')
+    for index1 in range(board.grid_num):
+        for dir in DIR_LIST:
+            e_var = edge_var(index1, dir)
+            if e_var is None:
+                continue
+
+            index2 = board.adjacent_index(index1, dir)
+            for line_id in _attr(enc, 'line_id_list'):
+                # 配線領域に含まれないグリッドの変数は None となる．
+                # その場合はもう一方のラベルも line_id とならない．
+                l1_var = line_var(index1, line_id)
+                l2_var = line_var(index2, line_id)
+                if l1_var is None and l2_var is None:
+                    continue
+                elif l1_var is None:
+                    solver.add_clause(-e_var, -l2_var)
+                elif l2_var is None:
+                    solver.add_clause(-e_var, -l1_var)
+                else:
+                    solver.add_clause(-e_var,  l1_var, -l2_var)
+                    solver.add_clause(-e_var, -l1_var,  l2_var)
+
+    # コの字制約を作る．
+    # 作られなかった枝は選ばれないので None として扱う．
+    set_stats_family('uturn')
+    for index, pos in enumerate(board.pos_list):
+        if pos.x == width - 1 or pos.y == height - 1:
+            continue
+        e1_var = edge_var(index, 's')
+        e2_var = edge_var(index, 'e')
+        index2 = board.adjacent_index(index, 's')
+        e3_var = edge_var(index2, 'e')
+        index3 = board.adjacent_index(index, 'e')
+        e4_var = edge_var(index3, 's')
+
+        # e1, e2, e3, e4 のうち3つ以上同時に true にならない．
+        # None を含む組み合わせは常に成り立つ．
+        for var_list in ((e1_var, e2_var, e3_var),
+                         (e1_var, e2_var, e4_var),
+                         (e1_var, e3_var, e4_var),
+                         (e2_var, e3_var, e4_var)):
+            if None not in var_list:
+                solver.add_clause([-var for var in var_list])
+
+
+class _LoopEnc(Adc2019Enc):
+    """枝に関する制約を基準の方法で作る Adc2019Enc
+    Adc2019Enc.__gen_edge_constraint_array() を _gen_edge_constraint_loop() で置き換える．
+    """
+
+    def _Adc2019Enc__gen_edge_constraint_array(self):
+        _gen_edge_constraint_loop(self)
+
+
+class _FullRegionDomain(Adc2019Domain):
+    """全てのグリッドを全ての線分の配線領域とする Adc2019Domain
+    配線領域で枝や線分ラベルの変数が省かれない場合の比較に用いる．
+    """
+
+    def __init__(self, problem, width, height):
+        super().__init__(problem, width, height)
+        self.__region = set(get_board(width, height).pos_list)
+
+    def is_routable(self, pos, line_id):
+        return pos in self.__region
+
+    def region(self, line_id):
+        return self.__region
+
+
+def board_size_list(problem):
+    """試す盤面の大きさのリストを返す．
+    :param Problem problem: 問題
+    :return: (幅, 高さ) のリストを返す．
+    """
+    w = problem.max_width
+    h = problem.max_height
+    size_list = [(w * scale, h * scale) for scale in SCALE_LIST]
+    size_list += [(w - dw, h - dh) for dw, dh in SHRINK_LIST if w - dw > 0 and h - dh > 0]
+    return size_list
+
+
+def routable_ratio(problem, width, height, region):
+    """配線領域に含まれる (グリッド, 線分) の組の割合を返す．
+    :param bool region: 配線領域を用いる時 True にする．
+    """
+    domain_class = Adc2019Domain if region else _FullRegionDomain
+    domain = domain_class(problem, width, height)
+    n = sum(len(domain.region(line_id)) for line_id in problem.line_id_list)
+    return n / (width * height * problem.line_num)
+
+
+def encode(problem, width, height, loop, region, enc_options):
+    """エンコードを行う．
+    :param bool loop: 基準の方法で枝に関する制約を作る時 True にする．
+    :param bool region: 配線領域を用いる時 True にする．
+    :param dict enc_options: エンコーダのオプション
+    :return: (変数の数, 節の集合, 枝に関する制約の節数, 枝に関する制約の生成時間, 全体の時間)
+    を返す．節はリテラルを昇順に並べたタプルで表す．
+    """
+    start = time.perf_counter()
+    solver = SatSolver('dummy')
+    enc_class = _LoopEnc if loop else Adc2019Enc
+    enc = enc_class(solver, problem, width, height, collect_stats=True, **enc_options)
+    if not region:
+        # 変数を作る前に配線領域の解析結果を差し替える．
+        setattr(enc, '_Adc2019Enc__domain', _FullRegionDomain(problem, width, height))
+    enc.gen_placement_constraint()
+    enc.gen_routing_constraint()
+    enc_time = time.perf_counter() - start
+    stats = enc.stats()
+    nc = sum(stats[family]['clauses'] for family in EDGE_FAMILY_LIST)
+    edge_time = sum(stats[family]['time'] for family in EDGE_FAMILY_LIST)
+
+    clause_set = set()
+    clause = []
+    solver._flush_lits()
+    for lit in solver._lit_array:
+        if lit == 0:
+            clause_set.add(tuple(sorted(clause)))
+            clause = []
+        else:
+            clause.append(lit)
+    return solver._var_count, clause_set, nc, edge_time, enc_time
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', type=str, nargs='*',
+                        help='problem filename')
+    args = parser.parse_args()
+
+    problem_list = []
+    if args.input:
+        for ifile in args.input:
+            with open(ifile, 'rt') as fin:
+                problem = Adc2019Parser().read_problem(fin)
+                if not problem:
+                    print(f'{ifile}: read failed.')
+                    exit(-1)
+                problem_list.append((ifile, problem))
+    else:
+        for param in default_param_list:
+            w, h, nb, nl, seed = param
+            name = f'gen{w}x{h}_b{nb}_l{nl}_s{seed}'
+            problem_list.append((name, gen_problem(w, h, nb, nl, seed=seed)))
+
+    print(f'{"problem":<24} {"size":>7} {"region":>6} {"act":>5} {"edge-amo":<10}'
+          f' {"method":<6} {"routable":>8} {"clauses":>9} {"edge":>9} {"encode":>9} {"same":>5}')
+    ok = True
+    # 配線領域が盤面全体より狭くなった条件の数
+    restricted_num = 0
+    for name, problem in problem_list:
+        for (width, height), region, size_activation, edge_amo in itertools.product(
+                board_size_list(problem), (True, False), (False, True), EDGE_AMO_LIST):
+            size = f'{width}x{height}'
+            ratio = routable_ratio(problem, width, height, region)
+            if ratio < 1.0:
+                restricted_num += 1
+            enc_options = {'size_activation': size_activation,
+                           'amo_encoding': {'edge': edge_amo}}
+            result_list = [(method, encode(problem, width, height, method == 'loop',
+                                           region, enc_options))
+                           for method in ('array', 'loop')]
+            nv0, clause_set0 = result_list[0][1][:2]
+            same = all(nv == nv0 and clause_set == clause_set0
+                       for _, (nv, clause_set, _, _, _) in result_list)
+            ok = ok and same
+            for method, (_, _, nc, edge_time, enc_time) in result_list:
+                print(f'{name:<24} {size:>7} {str(region):>6} {str(size_activation):>5}'
+                      f' {edge_amo:<10} {method:<6} {ratio * 100.0:>7.1f}% {nc:>9}'
+                      f' {edge_time:>8.3f}s {enc_time:>8.3f}s {str(same):>5}')
+    if restricted_num == 0:
+        print('warning: routing regions never restricted the board.')
+    if not ok:
+        print('mismatch found.')
+        sys.exit(1)
@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+
+"""CNF の簡単化による大きさの変化を計測するプログラム
+:file: bench_simplify.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_simplify [<問題ファイル名> ...]
+- 問題ファイルを省略した場合は bench.genproblem で生成した問題を用いる．
+- 盤面の大きさは問題の max_width x max_height とする．
+問題ごとに簡単化の前後の変数の数，節数，リテラル数とその比率，
+簡単化の時間を出力する．
+SAT ソルバは起動せずに CnfSimplifier が内部のソルバに渡す CNF のみを数える．
+現在の Adc2019Enc の生成する CNF ではすべての比率が 100% になる．
+"""
+
+import argparse
+from core.adc2019parser import Adc2019Parser
+from sat.satsolver import SatSolver
+from sat.cnfsimplifier import CnfSimplifier
+from sat.adc2019enc import Adc2019Enc
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+default_param_list = [
+    (8, 8, 6, 4, 2),
+    (10, 10, 8, 6, 2),
+    (11, 11, 10, 8, 1),
+    (16, 8, 10, 6, 3),
+]
+
+
+def measure_simplify(problem, width, height):
+    """エンコードした CNF を簡単化して大きさを計測する．
+    :return: CnfSimplifier.stats() の辞書を返す．
+    """
+    simplifier = CnfSimplifier(SatSolver('dummy'))
+    enc = Adc2019Enc(simplifier, problem, width, height)
+    enc.gen_placement_constraint()
+    enc.gen_routing_constraint()
+    # solve() を呼ばずに簡単化のみを行う．
+    simplifier._flush()
+    return simplifier.stats()
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', type=str, nargs='*',
+                        help='problem filename')
+    args = parser.parse_args()
+
+    problem_list = []
+    if args.input:
+        for ifile in args.input:
+            with open(ifile, 'rt') as fin:
+                problem = Adc2019Parser().read_problem(fin)
+                if not problem:
+                    print(f'{ifile}: read failed.')
+                    exit(-1)
+                problem_list.append((ifile, problem))
+    else:
+        for param in default_param_list:
+            w, h, nb, nl, seed = param
+            name = f'gen{w}x{h}_b{nb}_l{nl}_s{seed}'
+            problem_list.append((name, gen_problem(w, h, nb, nl, seed=seed)))
+
+    def ratio(a, b):
+        return 100.0 * a / b if b > 0 else 0.0
+
+    print(f'{"problem":<24} {"vars":>15} {"clauses":>17} {"literals":>17}'
+          f' {"vars%":>6} {"cls%":>6} {"lits%":>6} {"time":>9}')
+    for name, problem in problem_list:
+        stats = measure_simplify(problem, problem.max_width, problem.max_height)
+        nv0, nv = stats['orig_vars'], stats['vars']
+        nc0, nc = stats['orig_clauses'], stats['clauses']
+        nl0, nl = stats['orig_literals'], stats['literals']
+        print(f'{name:<24} {nv0:>7}/{nv:<7} {nc0:>8}/{nc:<8} {nl0:>8}/{nl:<8}'
+              f' {ratio(nv, nv0):>5.1f}% {ratio(nc, nc0):>5.1f}% {ratio(nl, nl0):>5.1f}%'
+              f' {stats["time"]:>8.3f}s')
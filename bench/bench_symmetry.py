@@ -0,0 +1,118 @@
+#! /usr/bin/env python3
+
+"""対称性除去の制約の有無による比較を行うプログラム
+:file: bench_symmetry.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+使用方法: python3 -m bench.bench_symmetry [-s <SATプログラム名>] [-t <時間の上限>] [<問題ファイル名> ...]
+- 問題ファイルを省略した場合は bench.genproblem で生成した問題を用いる．
+  交換可能なブロックが現れるように線分数に比べてブロック数を多くしている．
+- SATプログラムを省略した場合は組み込みの CdclSolver を用いる．
+最小面積の盤面を求めてからそれよりも面積の小さい(UNSAT となる)盤面の
+候補のうち面積の大きいものを試し，対称性除去の制約なし(off)とあり(on)の
+実行時間を出力する．
+UNSAT となる試行では解のない配置を対称なものの数だけ調べる必要がなくなるので
+速くなることが期待される．
+"""
+
+import argparse
+import time
+from core.adc2019parser import Adc2019Parser
+from sat.satbool3 import SatBool3
+from sat.adc2019enc import solve_adc2019
+from sat.adc2019minimize import candidate_list, minimize_adc2019_incremental
+from sat.adc2019sym import interchangeable_block_classes, reflection_block_map
+from bench.genproblem import gen_problem
+
+
+# 生成する問題のパラメータ (幅, 高さ, ブロック数, 線分数, 乱数の種)
+default_param_list = [
+    (7, 7, 8, 2, 3),
+    (8, 8, 10, 3, 4),
+    (9, 9, 12, 3, 1),
+]
+
+# 1つの問題で試す盤面の数
+PROBE_NUM = 3
+
+
+def run(problem, width, height, satprog, symmetry_breaking, time_limit):
+    """solve_adc2019() を実行して時間を計測する．
+    :return: (結果, 実行時間) を返す．
+    """
+    enc_options = {'symmetry_breaking': symmetry_breaking}
+    start = time.perf_counter()
+    stat, ans = solve_adc2019(problem, width, height, satprog,
+                              time_limit=time_limit, enc_options=enc_options)
+    return stat, time.perf_counter() - start
+
+
+def result_str(stat):
+    """結果を表す文字列を返す．"""
+    if stat == SatBool3.TRUE:
+        return 'SAT'
+    elif stat == SatBool3.FALSE:
+        return 'UNSAT'
+    else:
+        return 'UNKNOWN'
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--satprog', type=str, default='cdcl',
+                        help='specify the SAT program')
+    parser.add_argument('-t', '--time-limit', type=float, default=60.0,
+                        help='specify the time limit of each solve [default: 60]')
+    parser.add_argument('input', type=str, nargs='*',
+                        help='problem filename')
+    args = parser.parse_args()
+
+    problem_list = []
+    if args.input:
+        for ifile in args.input:
+            with open(ifile, 'rt') as fin:
+                problem = Adc2019Parser().read_problem(fin)
+                if not problem:
+                    print(f'{ifile}: read failed.')
+                    exit(-1)
+                problem_list.append((ifile, problem))
+    else:
+        for param in default_param_list:
+            w, h, nb, nl, seed = param
+            name = f'gen{w}x{h}_b{nb}_l{nl}_s{seed}'
+            problem_list.append((name, gen_problem(w, h, nb, nl, seed=seed)))
+
+    print(f'{"problem":<24} {"sym":>9} {"size":>7} {"result":>7}'
+          f' {"off":>9} {"on":>9} {"ratio":>6}')
+    for name, problem in problem_list:
+        # 見つかった対称性を表す文字列
+        # c<n> は交換可能なブロックのクラス数，h/v は左右/上下の鏡映
+        sym = f'c{len(interchangeable_block_classes(problem))}'
+        if reflection_block_map(problem, horizontal=True) is not None:
+            sym += 'h'
+        if reflection_block_map(problem, horizontal=False) is not None:
+            sym += 'v'
+        ans, _ = minimize_adc2019_incremental(problem, args.satprog,
+                                              time_limit=args.time_limit)
+        if ans is None:
+            print(f'{name:<24} {sym:>9} (no answer found)')
+            continue
+        area = ans.width * ans.height
+        size_list = [(w, h) for w, h in candidate_list(problem, problem.max_width,
+                                                        problem.max_height)
+                     if w * h < area]
+        for width, height in size_list[-PROBE_NUM:]:
+            stat1, t1 = run(problem, width, height, args.satprog, False, args.time_limit)
+            stat2, t2 = run(problem, width, height, args.satprog, True, args.time_limit)
+            if stat1 == SatBool3.X or stat2 == SatBool3.X:
+                result = 'UNKNOWN'
+            else:
+                assert stat1 == stat2
+                result = result_str(stat1)
+            size = f'{width}x{height}'
+            print(f'{name:<24} {sym:>9} {size:>7} {result:>7}'
+                  f' {t1:>8.3f}s {t2:>8.3f}s {t1 / t2:>6.2f}')
@@ -0,0 +1,155 @@
+#! /usr/bin/env python3
+
+"""ベンチマーク用の ADC2019 の問題を生成するプログラム
+:file: genproblem.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import random
+from collections import deque
+from core.problem import Problem
+from core.position import Position
+
+
+# ブロックの形状(モノミノとテトロミノ)
+shape_list = [
+    [(0, 0)],
+    [(0, 0), (0, 1), (0, 2), (0, 3)],
+    [(0, 0), (1, 0), (2, 0), (3, 0)],
+    [(0, 0), (1, 0), (0, 1), (1, 1)],
+    [(1, 0), (0, 1), (1, 1), (2, 1)],
+    [(0, 0), (1, 0), (2, 0), (1, 1)],
+    [(1, 0), (1, 1), (0, 2), (1, 2)],
+    [(0, 0), (0, 1), (0, 2), (1, 2)],
+    [(1, 0), (2, 0), (0, 1), (1, 1)],
+    [(0, 0), (1, 0), (1, 1), (2, 1)],
+]
+
+
+def gen_problem(width, height, block_num, line_num, *, seed=0):
+    """問題を生成する．
+    :param int width: 盤面の幅
+    :param int height: 盤面の高さ
+    :param int block_num: ブロック数
+    :param int line_num: 線分数(の上限)
+    :param int seed: 乱数の種
+    :return: Problem を返す．
+    実際に width x height の盤面上でブロックを配置し，
+    端子間を配線しながら問題を作るので，生成された問題は
+    少なくともこの大きさの盤面では解を持つ．
+    配線できなかった線分は作られない．
+    """
+    rng = random.Random(seed)
+
+    # ブロックを配置する．
+    used = set()
+    cell_list_list = []
+    while len(cell_list_list) < block_num:
+        for _ in range(1000):
+            shape = rng.choice(shape_list)
+            w = max(x for x, y in shape) + 1
+            h = max(y for x, y in shape) + 1
+            if w > width or h > height:
+                continue
+            x0 = rng.randrange(width - w + 1)
+            y0 = rng.randrange(height - h + 1)
+            cell_list = [(x0 + x, y0 + y) for x, y in shape]
+            if any(cell in used for cell in cell_list):
+                continue
+            used.update(cell_list)
+            cell_list_list.append(cell_list)
+            break
+        else:
+            # これ以上置けない．
+            break
+
+    # 端子を選んで配線する．
+    label_dict_list = [dict() for _ in cell_list_list]
+    line_id = 0
+    for _ in range(line_num * 10):
+        if line_id == line_num:
+            break
+        i1, i2 = rng.sample(range(len(cell_list_list)), 2)
+        free1 = [cell for cell in cell_list_list[i1] if cell not in label_dict_list[i1]]
+        free2 = [cell for cell in cell_list_list[i2] if cell not in label_dict_list[i2]]
+        if not free1 or not free2:
+            continue
+        start = rng.choice(free1)
+        goal = rng.choice(free2)
+        route = find_route(start, goal, used, width, height)
+        if route is None:
+            continue
+        line_id += 1
+        label_dict_list[i1][start] = line_id
+        label_dict_list[i2][goal] = line_id
+        used.update(route)
+
+    # Problem を作る．
+    problem = Problem(width, height)
+    for i, cell_list in enumerate(cell_list_list):
+        x0 = min(x for x, y in cell_list)
+        y0 = min(y for x, y in cell_list)
+        pos_list = []
+        label_dict = dict()
+        for cell in cell_list:
+            x, y = cell
+            pos = Position(x - x0, y - y0)
+            pos_list.append(pos)
+            label_dict[pos] = label_dict_list[i].get(cell, 0)
+        problem.add_block(i + 1, pos_list, label_dict)
+    problem.freeze()
+    return problem
+
+
+def find_route(start, goal, used, width, height):
+    """幅優先探索で経路を求める．
+    :param (int, int) start, goal: 始点と終点
+    :param set used: 使用済みのグリッドの集合
+    :param int width, height: 盤面のサイズ
+    :return: 始点と終点を除いた経路上のグリッドのリストを返す．
+    経路がない場合は None を返す．
+    """
+    prev_dict = {start: None}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        x, y = cell
+        for cell1 in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            x1, y1 = cell1
+            if not (0 <= x1 < width and 0 <= y1 < height):
+                continue
+            if cell1 in prev_dict:
+                continue
+            if cell1 == goal:
+                route = []
+                while cell != start:
+                    route.append(cell)
+                    cell = prev_dict[cell]
+                return route
+            if cell1 in used:
+                continue
+            prev_dict[cell1] = cell
+            queue.append(cell1)
+    return None
+
+
+# テストプログラム
+# 生成した問題を標準出力に出力する．
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 5:
+        print(f'USAGE: {sys.argv[0]} <width> <height> <block-num> <line-num> [<seed>]')
+        exit(1)
+
+    width = int(sys.argv[1])
+    height = int(sys.argv[2])
+    block_num = int(sys.argv[3])
+    line_num = int(sys.argv[4])
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+
+    problem = gen_problem(width, height, block_num, line_num, seed=seed)
+    problem.print()
@@ -74,8 +74,9 @@ class Adc2019Parser:
             # それ以外はエラー
             self.error('syntax error')
 
-        # エラーがなければ Problem を返す．
+        # エラーがなければ内容を確定させて Problem を返す．
         if self.__nerr == 0:
+            self.__problem.freeze()
             return self.__problem
         # エラーの時は None を返す．
         return None
@@ -156,6 +157,11 @@ class Adc2019Parser:
                 pos = Position(x, y)
                 pos_list.append(pos)
                 label_dict[pos] = label
+        if pos_list:
+            # ブロックの位置は左上隅で表すので先頭の行と列は空であってはならない．
+            if min(pos.x for pos in pos_list) > 0 or min(pos.y for pos in pos_list) > 0:
+                self.error("Empty leading row or column in the block pattern.")
+                return True
         self.__problem.add_block(block_id, pos_list, label_dict)
 
         return True
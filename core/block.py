@@ -9,110 +9,16 @@ All rights reserved.
 """
 
 import sys
-from core.position import Position
+from core.shape import get_shape
 
 
 def block_type(pat):
-    """ブロックの形状を調べる．"""
-    I_pat_list = [[Position(0, 0),
-                   Position(0, 1),
-                   Position(0, 2),
-                   Position(0, 3)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(2, 0),
-                   Position(3, 0)]]
-    O_pat_list = [[Position(0, 0),
-                   Position(1, 0),
-                   Position(0, 1),
-                   Position(1, 1)]]
-    T_pat_list = [[Position(1, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(2, 1)],
-                  [Position(1, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(1, 2)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(2, 0),
-                   Position(1, 1)],
-                  [Position(0, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(0, 2)]]
-    J_pat_list = [[Position(1, 0),
-                   Position(1, 1),
-                   Position(0, 2),
-                   Position(1, 2)],
-                  [Position(0, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(2, 1)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(0, 1),
-                   Position(0, 2)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(2, 0),
-                   Position(2, 1)]]
-    L_pat_list = [[Position(0, 0),
-                   Position(0, 1),
-                   Position(0, 2),
-                   Position(1, 2)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(2, 0),
-                   Position(0, 1)],
-                  [Position(0, 0),
-                   Position(1, 0),
-                   Position(1, 1),
-                   Position(1, 2)],
-                  [Position(2, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(2, 1)]]
-    S_pat_list = [[Position(1, 0),
-                   Position(2, 0),
-                   Position(0, 1),
-                   Position(1, 1)],
-                  [Position(0, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(1, 2)]]
-    Z_pat_list = [[Position(0, 0),
-                   Position(1, 0),
-                   Position(1, 1),
-                   Position(2, 1)],
-                  [Position(1, 0),
-                   Position(0, 1),
-                   Position(1, 1),
-                   Position(0, 2)]]
-
-    for I_pat in I_pat_list:
-        if pat == I_pat:
-            return 'I'
-    for O_pat in O_pat_list:
-        if pat == O_pat:
-            return 'O'
-    for T_pat in T_pat_list:
-        if pat == T_pat:
-            return 'T'
-    for J_pat in J_pat_list:
-        if pat == J_pat:
-            return 'J'
-    for L_pat in L_pat_list:
-        if pat == L_pat:
-            return 'L'
-    for S_pat in S_pat_list:
-        if pat == S_pat:
-            return 'S'
-    for Z_pat in Z_pat_list:
-        if pat == Z_pat:
-            return 'Z'
-    return 'X'
+    """ブロックの形状を調べる．
+    :param list[Position] pat: ブロックの占める位置のリスト
+    :return: テトロミノの場合はその名前('I', 'O', 'T', 'J', 'L', 'S', 'Z')，
+    それ以外は 'X' を返す．
+    """
+    return get_shape(pat).name
 
 
 class Block:
@@ -123,29 +29,21 @@ class Block:
     :param dict label_dict: ブロック上のラベル値の辞書．キーは位置
     - label_dict はラベルを持たない位置の値として0を持つ．
     - label_dict はブロックの領域外の位置の値は持たない．
+    - pos_list の X座標/Y座標の最小値は 0 でなければならない．
+    内容は変更されないので占める位置と端子のタプルは最初に一度だけ作る．
+    形状(幅と高さ，種類，外周など)は core.shape の形状の表のものを共有する．
     """
     def __init__(self, block_id, pos_list, label_dict):
         self.__block_id = block_id
-        self.__pos_list = list(pos_list)
+        self.__pos_list = tuple(pos_list)
         self.__label_dict = dict(label_dict)
-
-        # 幅と高さを求める．
-        x_max = 0
-        y_max = 0
-        for pos in self.__pos_list:
-            x = pos.x
-            if x_max < x:
-                x_max = x
-            y = pos.y
-            if y_max < y:
-                y_max = y
-        w = x_max + 1
-        h = y_max + 1
-        self.__width = w
-        self.__height = h
-
-        # ブロックの種類を調べる．
-        self.__type = block_type(self.__pos_list)
+        self.__pos_label_list = tuple((pos, label) for pos, label in self.__label_dict.items()
+                                      if label > 0)
+        if self.__pos_list:
+            # 形状は左上を (0, 0) に正規化するので位置もそれに合わせる．
+            assert min(pos.x for pos in self.__pos_list) == 0
+            assert min(pos.y for pos in self.__pos_list) == 0
+        self.__shape = get_shape(self.__pos_list)
 
     @property
     def block_id(self):
@@ -154,12 +52,10 @@ class Block:
 
     @property
     def pos_list(self):
-        """ブロックの占めている位置のリストを返す．
+        """ブロックの占めている位置のタプルを返す．
         - ブロックの左上隅の座標を (0, 0) とする．
-        - 正確にはジェネレータを返す．
         """
-        for pos in self.__pos_list:
-            yield pos
+        return self.__pos_list
 
     def label(self, pos):
         """指定された位置のラベルを返す．
@@ -175,25 +71,27 @@ class Block:
 
     @property
     def pos_label_list(self):
-        """位置とラベルのリストを返す．
-        - 正確にはジェネレータを返す．
+        """位置とラベルのタプルを返す．
         - ラベルを持たない位置は含まない．
         """
-        for pos, label in self.__label_dict.items():
-            if label > 0:
-                yield pos, label
+        return self.__pos_label_list
+
+    @property
+    def shape(self):
+        """形状(Shape)を返す．"""
+        return self.__shape
 
     @property
     def width(self):
         """幅を返す．"""
-        return self.__width
+        return self.__shape.width
 
     @property
     def height(self):
         """高さを返す．"""
-        return self.__height
+        return self.__shape.height
 
     @property
     def type(self):
         """ブロックの種類を返す．"""
-        return self.__type
+        return self.__shape.name
@@ -0,0 +1,152 @@
+#! /usr/bin/env python3
+
+"""Board の実装ファイル
+:file: board.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from core.position import Position
+
+
+# 方向を表す文字列のリスト
+DIR_LIST = ('n', 'e', 's', 'w')
+
+
+class Board:
+    """盤面の形状(グリッドと枝の番号付け)を表すクラス
+    :param int width: 幅
+    :param int height: 高さ
+
+    グリッド (x, y) には番号 y * width + x を付ける．
+    枝(隣接する2つのグリッドの組)には縦方向の枝 (x, y)-(x, y + 1) に
+    x, y の順に，続いて横方向の枝 (x, y)-(x + 1, y) に y, x の順に番号を付ける．
+    隣接関係は番号のリストで持つので辞書を引かずにたどることができる．
+    内容は変更されないので同じ大きさの盤面は get_board() で共有する．
+    """
+
+    def __init__(self, width, height):
+        self.__width = width
+        self.__height = height
+        n = width * height
+        self.__pos_list = tuple(Position(x, y) for y in range(height) for x in range(width))
+
+        # 枝の両端のグリッド番号のリスト
+        # 1つ目のグリッドから見て s もしくは e 方向の枝となる．
+        edge_list = []
+        # 方向ごとのグリッド番号で引く隣のグリッド番号と枝番号のリスト
+        # 盤面の外側の場合は -1 となる．
+        self.__adjacent_dict = {dir: [-1] * n for dir in DIR_LIST}
+        self.__edge_dict = {dir: [-1] * n for dir in DIR_LIST}
+        for dir1, dir2, pair_list in (
+                ('s', 'n', [(y * width + x, (y + 1) * width + x)
+                            for x in range(width) for y in range(height - 1)]),
+                ('e', 'w', [(y * width + x, y * width + x + 1)
+                            for y in range(height) for x in range(width - 1)])):
+            for index1, index2 in pair_list:
+                edge = len(edge_list)
+                edge_list.append((index1, index2))
+                self.__adjacent_dict[dir1][index1] = index2
+                self.__adjacent_dict[dir2][index2] = index1
+                self.__edge_dict[dir1][index1] = edge
+                self.__edge_dict[dir2][index2] = edge
+        self.__edge_list = tuple(edge_list)
+
+        # グリッド番号で引く接続する枝の (方向, 枝番号) のリスト
+        # 方向は DIR_LIST の順に並ぶ．
+        self.__cell_edge_list = tuple(
+            tuple((dir, self.__edge_dict[dir][index]) for dir in DIR_LIST
+                  if self.__edge_dict[dir][index] >= 0)
+            for index in range(n))
+
+        # 2x2 のグリッドの窓の4つの枝番号のリスト
+        # 左上のグリッドを i とすると (i の s, i の e, i の下の e, i の右の s) となる．
+        s_list = self.__edge_dict['s']
+        e_list = self.__edge_dict['e']
+        self.__window_list = tuple(
+            (s_list[index], e_list[index], e_list[index + width], s_list[index + 1])
+            for index in range(n - width) if index % width < width - 1)
+
+    @property
+    def width(self):
+        """幅を返す．"""
+        return self.__width
+
+    @property
+    def height(self):
+        """高さを返す．"""
+        return self.__height
+
+    @property
+    def grid_num(self):
+        """グリッド数を返す．"""
+        return len(self.__pos_list)
+
+    @property
+    def edge_num(self):
+        """枝の数を返す．"""
+        return len(self.__edge_list)
+
+    @property
+    def pos_list(self):
+        """グリッド番号で引く Position のリストを返す．"""
+        return self.__pos_list
+
+    @property
+    def edge_list(self):
+        """枝番号で引く両端のグリッド番号のペアのリストを返す．"""
+        return self.__edge_list
+
+    @property
+    def window_list(self):
+        """2x2 の窓の枝番号のリストを返す．
+        各要素は左上のグリッドから見て (s, e, 下の e, 右の s) の枝番号となる．
+        """
+        return self.__window_list
+
+    def index(self, pos):
+        """グリッド番号を返す．
+        :param Position pos: 位置
+        """
+        return pos.y * self.__width + pos.x
+
+    def adjacent_index(self, index, dir):
+        """隣のグリッド番号を返す．
+        :param int index: グリッド番号
+        :param str dir: 方向を表す文字列 ('n', 'e', 's', 'w')
+        :return: 盤面の外側の場合は -1 を返す．
+        """
+        return self.__adjacent_dict[dir][index]
+
+    def edge_index(self, index, dir):
+        """グリッドから dir 方向の枝番号を返す．
+        :param int index: グリッド番号
+        :param str dir: 方向を表す文字列 ('n', 'e', 's', 'w')
+        :return: 盤面の外側の場合は -1 を返す．
+        """
+        return self.__edge_dict[dir][index]
+
+    def cell_edge_list(self, index):
+        """グリッドに接続する枝の (方向, 枝番号) のリストを返す．
+        :param int index: グリッド番号
+        方向は 'n', 'e', 's', 'w' の順に並ぶ．
+        """
+        return self.__cell_edge_list[index]
+
+
+# (幅, 高さ) をキーとして Board を持つ辞書
+_board_dict = dict()
+
+
+def get_board(width, height):
+    """width x height の Board を返す．
+    :param int width: 幅
+    :param int height: 高さ
+    同じ大きさの場合は同じオブジェクトを返す．
+    """
+    key = width, height
+    if key not in _board_dict:
+        _board_dict[key] = Board(width, height)
+    return _board_dict[key]
@@ -8,104 +8,86 @@ Copyright (C) 2019, 2020 Yusuke Matsunaga
 All rights reserved.
 """
 
+from operator import itemgetter
 
-class Position:
+
+# tuple のコンストラクタ
+# Position.__new__() を経由せずにオブジェクトを作るために用いる．
+_tuple_new = tuple.__new__
+
+# 方向を表す文字列をキーとして隣の位置との差分を持つ辞書
+_DIR_DELTA = {
+    'n': ( 0, -1),
+    'e': ( 1,  0),
+    's': ( 0,  1),
+    'w': (-1,  0),
+}
+
+
+class Position(tuple):
     """位置を表すクラス
     内容はただの (x, y) のタプル
-    ただし +/- や +=/-= の演算を定義している．
-    また，メンバ変数は初期化時に設定された後は
-    +=/-=演算以外では変更されない．
+    ただし +/- の演算を定義している．
+    tuple を継承しているので変更できず，ハッシュ関数と比較演算は
+    tuple のもの(大小は x, y の順の辞書式順序)を用いる．
+    +=/-= は新しいオブジェクトを作って代入する．
 
     :param int x, y: 座標
     """
 
-    def __init__(self, x=0, y=0):
-        self.__x = x
-        self.__y = y
+    __slots__ = ()
 
-    def copy(self):
-        """複製する．"""
-        return Position(self.x, self.y)
+    def __new__(cls, x=0, y=0):
+        return _tuple_new(cls, (x, y))
+
+    def __getnewargs__(self):
+        """pickle で用いる引数を返す．"""
+        return tuple(self)
 
-    @property
-    def x(self):
-        """X座標を返す．"""
-        return self.__x
+    # X座標を返す．
+    x = property(itemgetter(0))
 
-    @property
-    def y(self):
-        """Y座標を返す．"""
-        return self.__y
+    # Y座標を返す．
+    y = property(itemgetter(1))
+
+    def copy(self):
+        """複製する．
+        変更できないので自分自身を返す．
+        """
+        return self
 
     def is_in_range(self, width, height):
         """範囲内のときに True を返す．
         :param int width: 幅
         :param int height: 高さ
         """
-        if 0 <= self.x < width and 0 <= self.y < height:
-            return True
-        else:
-            return False
+        x, y = self
+        return 0 <= x < width and 0 <= y < height
 
     def adjacent_pos(self, dir):
         """隣の位置を返す．
         :param str dir: 方向を表す文字列 ('n', 'e', 's', 'w')
         """
-        if dir == 'n':
-            return Position(self.x, self.y - 1)
-        elif dir == 'e':
-            return Position(self.x + 1, self.y)
-        elif dir == 's':
-            return Position(self.x, self.y + 1)
-        elif dir == 'w':
-            return Position(self.x - 1, self.y)
-        else:
-            assert False
+        x, y = self
+        dx, dy = _DIR_DELTA[dir]
+        return _tuple_new(Position, (x + dx, y + dy))
 
     def __add__(self, right):
         """位置の加算を行う．"""
-        return Position(self.x + right.x, self.y + right.y)
-
-    def __iadd__(self, right):
-        """加算付き代入"""
-        self.__x += right.x
-        self.__y += right.y
-        return self
+        x1, y1 = self
+        x2, y2 = right
+        return _tuple_new(Position, (x1 + x2, y1 + y2))
 
     def __sub__(self, right):
         """位置の減算を行う．"""
-        return Position(self.x - right.x, self.y - right.y)
-
-    def __isub__(self, right):
-        """減算付き代入"""
-        self.__x -= right.x
-        self.__y -= right.y
-        return self
-
-    def __eq__(self, right):
-        """等価比較演算"""
-        return self.x == right.x and self.y == right.y
-
-    def __lt__(self, right):
-        """小なり比較演算"""
-        if self.x < right.x:
-            return True
-        elif self.x == right.x and self.y < right.y:
-            return True
-        return False
-
-    def __le__(self, right):
-        """小なりイコール比較演算"""
-        if self.x < right.x:
-            return True
-        elif self.x == right.x and self.y <= right.y:
-            return True
-        return False
-
-    def __hash__(self):
-        """ハッシュ関数"""
-        return self.x * 37 + self.y
+        x1, y1 = self
+        x2, y2 = right
+        return _tuple_new(Position, (x1 - x2, y1 - y2))
 
     def __str__(self):
         """str 演算"""
-        return f'({self.x},{self.y})'
+        return f'({self[0]},{self[1]})'
+
+    def __repr__(self):
+        """repr 演算"""
+        return f'Position({self[0]}, {self[1]})'
@@ -43,9 +43,16 @@ class Problem:
     """ADC2019の問題を表すクラス
     :param int width: 最大幅
     :param int height: 最大高さ
+
+    set_size() と add_block() で内容を設定した後に freeze() を呼ぶと
+    ブロックのタプル，ブロック番号からブロックリスト中の位置への辞書，
+    線分番号(昇順)のタプルと各線分の端子のペアを一度だけ作る．
+    それ以降は内容を変更できない．
+    freeze() を呼ぶ前に参照用のメソッドを呼んだ場合は自動的に freeze() する．
     """
 
     def __init__(self, width, height):
+        self.__frozen = False
         self.set_size(width, height)
 
     def set_size(self, width, height):
@@ -54,6 +61,7 @@ class Problem:
         :param int height: 最大高さ
         以前の内容は消去される．
         """
+        assert not self.__frozen
         self.__max_width = width
         self.__max_height = height
         self.__block_list = []
@@ -67,6 +75,7 @@ class Problem:
         - label_dict はラベルを持たない位置の値として0を持つ．
         - label_dict はブロックの領域外の位置の値は持たない．
         """
+        assert not self.__frozen
         self.__block_list.append(Block(block_id, pos_list, label_dict))
         for pos, label in label_dict.items():
             if label > 0:
@@ -74,6 +83,26 @@ class Problem:
                     self.__terminals_dict[label] = []
                 self.__terminals_dict[label].append((block_id, pos))
 
+    def freeze(self):
+        """内容を確定させて参照用の表を作る．
+        すでに確定している場合は何もしない．
+        """
+        if self.__frozen:
+            return
+        self.__frozen = True
+        self.__block_list = tuple(self.__block_list)
+        self.__block_id_list = tuple(block.block_id for block in self.__block_list)
+        # ブロック番号をキーとしてブロックリスト中の位置を持つ辞書
+        self.__block_index_dict = {block_id: i for i, block_id in enumerate(self.__block_id_list)}
+        self.__line_id_list = tuple(sorted(self.__terminals_dict.keys()))
+        self.__terminals_dict = {line_id: tuple(self.__terminals_dict[line_id])
+                                 for line_id in self.__line_id_list}
+
+    @property
+    def is_frozen(self):
+        """内容が確定していたら True を返す．"""
+        return self.__frozen
+
     def is_valid(self):
         """内容が設定されていたら True を返す．"""
         return self.max_width > 0
@@ -95,42 +124,46 @@ class Problem:
 
     @property
     def block_id_list(self):
-        """ブロック番号のリストを返す．
-        正確にはブロックリストのジェネレーターを返す．
-        """
-        for block in self.__block_list:
-            yield block.block_id
+        """ブロック番号のタプルを返す．"""
+        self.freeze()
+        return self.__block_id_list
 
     @property
     def block_list(self):
-        """ブロックのリストを返す．
-        正確にはブロックリストのジェネレーターを返す．
-        """
-        for block in self.__block_list:
-            yield block
+        """ブロックのタプルを返す．"""
+        self.freeze()
+        return self.__block_list
 
     def block(self, block_id):
         """ブロックを取り出す．
         :param int block_id: ブロック番号
         """
-        assert 0 < block_id <= self.block_num
-        block = self.__block_list[block_id - 1]
-        assert block.block_id == block_id
-        return block
+        return self.__block_list[self.block_index(block_id)]
+
+    def block_index(self, block_id):
+        """ブロックリスト中の位置を返す．
+        :param int block_id: ブロック番号
+        """
+        self.freeze()
+        return self.__block_index_dict[block_id]
 
     @property
     def line_id_list(self):
-        """線分番号のリストを返す．
-        正確にはジェネレーターを返す．
-        """
-        for line_id in sorted(self.__terminals_dict.keys()):
-            yield line_id
+        """線分番号のタプル(昇順)を返す．"""
+        self.freeze()
+        return self.__line_id_list
+
+    @property
+    def line_num(self):
+        """線分数を返す．"""
+        return len(self.line_id_list)
 
     def terminals(self, line_id):
         """端子の情報を返す．
         :param int line_id: 線分番号
-        :return: (block_id, pos) のリスト(要素数は常に2)を返す．
+        :return: (block_id, pos) のタプル(要素数は常に2)を返す．
         """
+        self.freeze()
         return self.__terminals_dict[line_id]
 
     def print(self, *, fout=sys.stdout):
@@ -0,0 +1,260 @@
+#! /usr/bin/env python3
+
+"""Shape の実装ファイル
+:file: shape.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from core.position import Position
+
+
+# 基本となるテトロミノの名前と形状のリスト
+# 各形状の回転させたものも同じ名前(同じクラス)となる．
+# 鏡像どうし(J と L，S と Z)は回転では移らないので別のクラスとなる．
+_TETROMINO_LIST = (
+    ('I', ((0, 0), (0, 1), (0, 2), (0, 3))),
+    ('O', ((0, 0), (1, 0), (0, 1), (1, 1))),
+    ('T', ((1, 0), (0, 1), (1, 1), (2, 1))),
+    ('J', ((1, 0), (1, 1), (0, 2), (1, 2))),
+    ('L', ((0, 0), (0, 1), (0, 2), (1, 2))),
+    ('S', ((1, 0), (2, 0), (0, 1), (1, 1))),
+    ('Z', ((0, 0), (1, 0), (1, 1), (2, 1))),
+)
+
+# テトロミノ以外の形状の名前
+OTHER_NAME = 'X'
+
+# 外周の辺の向きを表す文字列のリスト
+# 形状を右回りにたどる時の右に曲がった向きが次の要素となる．
+_EDGE_DIR_LIST = ('n', 'e', 's', 'w')
+
+
+class Shape:
+    """ブロックの形状を表すクラス
+    :param tuple key: 正規化した形状を表すキー(_make_key() の値)
+    :param int shape_id: 形状番号
+    :param int class_id: 回転で移り合う形状のクラス番号
+    :param str name: 名前(テトロミノの場合は 'I', 'O', 'T', 'J', 'L', 'S', 'Z'，
+    それ以外は OTHER_NAME)
+
+    形状は平行移動で移り合うものを同一視して左上を (0, 0) に正規化したもので，
+    get_shape() で得る．同じ形状に対しては常に同じオブジェクトを返すので
+    形状が等しいかどうかは shape_id もしくは is で比較できる．
+    空の形状も扱えるが，その幅と高さは(以前の Block と同じく) 1 とする．
+    """
+
+    def __init__(self, key, shape_id, class_id, name):
+        self.__key = key
+        self.__shape_id = shape_id
+        self.__class_id = class_id
+        self.__name = name
+        self.__pos_list = tuple(Position(x, y) for x, y in key)
+        self.__width = max((x for x, _ in key), default=0) + 1
+        self.__height = max((y for _, y in key), default=0) + 1
+        # 外周のリスト(描画にしか使わないので outline_list で初めて作る)
+        self.__outline_list = None
+        # 左右/上下の鏡映の形状(mirror() で作る)
+        self.__mirror_dict = dict()
+
+    def __reduce__(self):
+        """pickle で用いる．
+        復元先の形状の表の同じ形状を用いるために get_shape() で作り直す．
+        """
+        return get_shape, (self.__key,)
+
+    @property
+    def key(self):
+        """形状を表すキー((x, y) のタプルを (y, x) の順に並べたタプル)を返す．"""
+        return self.__key
+
+    @property
+    def shape_id(self):
+        """形状番号を返す．"""
+        return self.__shape_id
+
+    @property
+    def class_id(self):
+        """回転で移り合う形状のクラス番号を返す．"""
+        return self.__class_id
+
+    @property
+    def name(self):
+        """名前を返す．"""
+        return self.__name
+
+    @property
+    def pos_list(self):
+        """占めている位置のタプルを (y, x) の順に並べて返す．"""
+        return self.__pos_list
+
+    @property
+    def width(self):
+        """幅を返す．"""
+        return self.__width
+
+    @property
+    def height(self):
+        """高さを返す．"""
+        return self.__height
+
+    @property
+    def outline_list(self):
+        """外周をたどるセグメントのリストのリストを返す．
+        各リストは1つの閉路を表し，要素は (頂点の位置, 角の向き('ne', 'se', 'sw', 'nw'))
+        となる．頂点の位置はグリッドの左上隅の座標で表す．
+        通常は1つの閉路のみだが，離れた部分や穴がある場合は複数の閉路となる．
+        """
+        if self.__outline_list is None:
+            self.__outline_list = _make_outline_list(self.__pos_list)
+        return self.__outline_list
+
+    def mirror(self, horizontal):
+        """鏡映させた形状を返す．
+        :param bool horizontal: 左右反転の時 True, 上下反転の時 False にする．
+        """
+        if horizontal not in self.__mirror_dict:
+            w = self.__width
+            h = self.__height
+            if horizontal:
+                pos_list = [(w - 1 - x, y) for x, y in self.__key]
+            else:
+                pos_list = [(x, h - 1 - y) for x, y in self.__key]
+            self.__mirror_dict[horizontal] = get_shape(pos_list)
+        return self.__mirror_dict[horizontal]
+
+
+# 形状を表すキーをキーとして Shape を持つ辞書
+_shape_dict = dict()
+
+# 回転で移り合う形状の代表のキーをキーとして (クラス番号, 名前) を持つ辞書
+_class_dict = dict()
+
+
+def get_shape(pos_list):
+    """形状を返す．
+    :param pos_list: 占めている位置((x, y) もしくは Position)のリスト
+    位置の並び順と平行移動は無視する．
+    """
+    key = _make_key(pos_list)
+    shape = _shape_dict.get(key)
+    if shape is None:
+        class_key = _class_key(key)
+        if class_key not in _class_dict:
+            _class_dict[class_key] = len(_class_dict), OTHER_NAME
+        class_id, name = _class_dict[class_key]
+        shape = Shape(key, len(_shape_dict), class_id, name)
+        _shape_dict[key] = shape
+    return shape
+
+
+def _make_key(pos_list):
+    """左上を (0, 0) に移して (y, x) の順に並べたタプルを返す．
+    :param pos_list: 位置のリスト
+    """
+    x0 = min((x for x, _ in pos_list), default=0)
+    y0 = min((y for _, y in pos_list), default=0)
+    return tuple(sorted(((x - x0, y - y0) for x, y in pos_list),
+                        key=lambda pos: (pos[1], pos[0])))
+
+
+def _class_key(key):
+    """回転で移り合う形状の代表のキーを返す．
+    :param tuple key: 形状を表すキー
+    4通りの回転のキーのうち最小のものを代表とする．
+    """
+    key_list = [key]
+    for _ in range(3):
+        key = _make_key([(-y, x) for x, y in key])
+        key_list.append(key)
+    return min(key_list)
+
+
+def _make_dir(label1, label2):
+    """2つの辺の向きから角の向きを表す文字列を作る．
+    :param str label1, label2: 辺の向き('n', 'e', 's', 'w')
+    同じ向きの場合(角でない場合)は None を返す．
+    """
+    if label1 == label2:
+        return None
+    dir = {'n', 'e', 's', 'w'} & {label1, label2}
+    assert len(dir) == 2
+    for d in ('ne', 'se', 'sw', 'nw'):
+        if set(d) == dir:
+            return d
+    assert False
+
+
+def _make_outline_list(pos_list):
+    """位置のリストで表された形状を囲むセグメントのリストのリストを作る．
+    :param tuple[Position] pos_list: 占めている位置のリスト
+    各グリッドの辺のうち形状の外側に面するものを右回りの向きでつなげて閉路を作る．
+    角だけで接するグリッドの頂点からは2本の辺が出るので，右に曲がる辺を優先し
+    使った辺は取り除く．各頂点の出る辺と入る辺の数は等しいので，
+    たどれる辺がなくなるのは出発点に戻った時であり，必ず停止する．
+    """
+    grid_set = set(pos_list)
+
+    # 各辺の始点をキーとして (終点, 辺の向き) のリストを持つ辞書
+    edge_dict = dict()
+    for pos in pos_list:
+        pos_n = pos.adjacent_pos('n')
+        pos_e = pos.adjacent_pos('e')
+        pos_s = pos.adjacent_pos('s')
+        pos_w = pos.adjacent_pos('w')
+        pos_se = pos_s.adjacent_pos('e')
+        if pos_n not in grid_set:
+            edge_dict.setdefault(pos, []).append((pos_e, 'n'))
+        if pos_e not in grid_set:
+            edge_dict.setdefault(pos_e, []).append((pos_se, 'e'))
+        if pos_s not in grid_set:
+            edge_dict.setdefault(pos_se, []).append((pos_s, 's'))
+        if pos_w not in grid_set:
+            edge_dict.setdefault(pos_s, []).append((pos, 'w'))
+
+    outline_list = []
+    for start_pos, out_list in edge_dict.items():
+        while out_list:
+            # 閉路上の (辺の始点, 辺の向き) のリスト
+            edge_list = []
+            pos = start_pos
+            dlabel = None
+            while edge_dict[pos]:
+                cand_list = edge_dict[pos]
+                i = 0
+                if dlabel is not None and len(cand_list) > 1:
+                    right = _EDGE_DIR_LIST[(_EDGE_DIR_LIST.index(dlabel) + 1) % 4]
+                    for j, (_, dlabel1) in enumerate(cand_list):
+                        if dlabel1 == right:
+                            i = j
+                            break
+                next_pos, dlabel = cand_list.pop(i)
+                edge_list.append((pos, dlabel))
+                pos = next_pos
+            assert pos == start_pos
+
+            # 向きの変わる頂点を角とする．
+            segment_list = []
+            for k, (pos1, dlabel1) in enumerate(edge_list):
+                d = _make_dir(edge_list[k - 1][1], dlabel1)
+                if d is not None:
+                    segment_list.append((pos1, d))
+            outline_list.append(tuple(segment_list))
+    return tuple(outline_list)
+
+
+def _init_tetromino_shapes():
+    """テトロミノのクラスを登録し，全ての回転の形状を作る．
+    テトロミノのクラス番号と形状番号は _TETROMINO_LIST の順に 0 から付く．
+    """
+    for name, pos_list in _TETROMINO_LIST:
+        key = _make_key(pos_list)
+        _class_dict[_class_key(key)] = len(_class_dict), name
+        for _ in range(4):
+            get_shape(key)
+            key = _make_key([(-y, x) for x, y in key])
+
+
+_init_tetromino_shapes()
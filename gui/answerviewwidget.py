@@ -12,6 +12,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 from gui.viewwidget import ViewWidget
+from core.board import get_board
 
 
 class AnswerViewWidget(ViewWidget):
@@ -43,6 +44,9 @@ class AnswerViewWidget(ViewWidget):
         self.__Problem = problem
         self.__Answer = answer
         self.set_size(answer.width, answer.height)
+        self.__board = get_board(answer.width, answer.height)
+        # グリッド番号で引くラベルのリスト
+        self.__label_list = [answer.label(pos) for pos in self.__board.pos_list]
         self.__terminal_set = set()
         for block in problem.block_list:
             block_id = block.block_id
@@ -69,17 +73,20 @@ class AnswerViewWidget(ViewWidget):
         # 線分の描画
         painter.save()
         painter.setPen(self.__WirePen)
-        for x in range(self.col_num - 1):
-            for y in range(self.row_num):
-                x0, y0 = x,     y
-                x1, y1 = x + 1, y
-                val0 = self.__Answer.label(x0, y0)
-                val1 = self.__Answer.label(x1, y1)
-
-                if val0 != val1 or val0 == 0:
-                    continue
-
-                pos0 = self.pos_to_local(x0, y0) + self.base_pos
+        # 両端のラベルが等しい枝を描画する．
+        pos_list = self.__board.pos_list
+        for index0, index1 in self.__board.edge_list:
+            val0 = self.__label_list[index0]
+            val1 = self.__label_list[index1]
+
+            if val0 != val1 or val0 == 0:
+                continue
+
+            x0, y0 = pos_list[index0]
+            x1, y1 = pos_list[index1]
+            pos0 = self.pos_to_local(x0, y0) + self.base_pos
+            if y0 == y1:
+                # 横方向の枝
                 cx0 = pos0.x() + self.grid_size / 2
                 cx1 = cx0 + self.grid_size
                 cy = pos0.y() + self.grid_size / 2
@@ -91,18 +98,8 @@ class AnswerViewWidget(ViewWidget):
                     cx1 = pos0.x() + dx
 
                 painter.drawLine(cx0, cy, cx1, cy)
-
-        for y in range(self.row_num - 1):
-            for x in range(self.col_num):
-                x0, y0 = x, y
-                x1, y1 = x, y + 1
-                val0 = self.__Answer.label(x0, y0)
-                val1 = self.__Answer.label(x1, y1)
-
-                if val0 != val1 or val0 == 0:
-                    continue
-
-                pos0 = self.pos_to_local(x0, y0) + self.base_pos
+            else:
+                # 縦方向の枝
                 cx = pos0.x() + self.grid_size / 2
                 cy0 = pos0.y() + self.grid_size / 2
                 cy1 = cy0 + self.grid_size
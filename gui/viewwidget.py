@@ -15,96 +15,6 @@ from PyQt5.QtWidgets import *
 from core.position import Position
 
 
-def make_dir(label1, label2):
-    """向きを表す文字列を正規化する．
-    """
-    if label1 == 'n':
-        if label2 == 'e':
-            return 'ne'
-        if label2 == 'w':
-            return 'nw'
-        if label2 == 'n':
-            return None
-        assert False
-    if label1 == 'e':
-        if label2 == 'n':
-            return 'ne'
-        if label2 == 's':
-            return 'se'
-        if label2 == 'e':
-            return None
-        assert False
-    if label1 == 's':
-        if label2 == 'e':
-            return 'se'
-        elif label2 == 'w':
-            return 'sw'
-        elif label2 == 's':
-            return None
-        assert False
-    if label1 == 'w':
-        if label2 == 'n':
-            return 'nw'
-        elif label2 == 's':
-            return 'sw'
-        elif label2 == 'w':
-            return None
-        assert False
-    assert False
-
-
-def make_segment_list(block):
-    """ブロックを囲むセグメントのリストを作る．
-    :param Block block: ブロック
-    """
-
-    grid_set = set()
-    for pos in block.pos_list:
-        grid_set.add(pos)
-
-    segment_dict = dict()
-    dpos_n = Position( 0, -1)
-    dpos_e = Position( 1,  0)
-    dpos_s = Position( 0,  1)
-    dpos_w = Position(-1,  0)
-    dpos_se = Position( 1,  1)
-    for pos in block.pos_list:
-        pos_n = pos.adjacent_pos('n')
-        pos_e = pos.adjacent_pos('e')
-        pos_s = pos.adjacent_pos('s')
-        pos_w = pos.adjacent_pos('w')
-        pos_se = pos_s.adjacent_pos('e')
-        if pos_n not in grid_set:
-            segment_dict[pos] = (pos_e, 'n')
-        if pos_e not in grid_set:
-            segment_dict[pos_e] = (pos_se, 'e')
-        if pos_s not in grid_set:
-            segment_dict[pos_se] = (pos_s, 's')
-        if pos_w not in grid_set:
-            segment_dict[pos_s] = (pos, 'w')
-
-    # segment_dict の要素を一つ取り出す．
-    for first_pos, (last_pos, dlabel) in segment_dict.items():
-        break
-    else:
-        assert False
-
-    segment_list = list()
-    dlabel0 = dlabel
-    while True:
-        pos1, dlabel1 = segment_dict[last_pos]
-        d = make_dir(dlabel, dlabel1)
-        if d is not None:
-            segment_list.append( (last_pos, d) )
-        if pos1 == first_pos:
-            break
-        last_pos = pos1
-        dlabel = dlabel1
-    d = make_dir(dlabel0, dlabel1)
-    segment_list.append( (first_pos, d) )
-    return segment_list
-
-
 class ViewWidget(QWidget):
     """ブロックを描画するウィジェットの基底クラス"""
 
@@ -254,12 +164,14 @@ class ViewWidget(QWidget):
         :param Block block: 対象のブロック
         :param Position pos0: ブロックの左上隅の座標
         """
-        polygon = QPolygonF()
-        for pos1, d1 in make_segment_list(block) :
-            lpos = self.block_pos(pos1, d1) + pos0
-            polygon << lpos
         path = QPainterPath()
-        path.addPolygon(polygon)
+        for segment_list in block.shape.outline_list:
+            polygon = QPolygonF()
+            for pos1, d1 in segment_list:
+                lpos = self.block_pos(pos1, d1) + pos0
+                polygon << lpos
+            path.addPolygon(polygon)
+            path.closeSubpath()
         if block.type == 'I':
             painter.fillPath(path, self.__I_BlockColor)
         elif block.type == 'O':
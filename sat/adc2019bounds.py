@@ -0,0 +1,163 @@
+#! /usr/bin/env python3
+
+"""ADC2019 の問題の盤面の大きさの下界を求めるクラス
+:file: adc2019bounds.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from core.position import Position
+
+
+# 下界の種類のリスト
+# - 'dimension' : 盤面に置けない(端子から枝を出せない)ブロックがある．
+# - 'area'      : 面積がブロックの占めるマス目の数の合計より小さい．
+# - 'wire'      : 面積がブロックの占めるマス目と配線に最低限必要な
+#                 マス目の数の合計より小さい．
+BOUND_LIST = ('dimension', 'area', 'wire')
+
+
+class Adc2019Bounds:
+    """盤面の大きさの下界を求めるクラス
+    :param Problem problem: 問題
+
+    check() で与えられた大きさの盤面に明らかに解がないかを調べる．
+    エンコードせずに問題だけから求まる簡単なもののみを扱う．
+    """
+
+    def __init__(self, problem):
+        # ブロックの占めるマス目の数の合計
+        self.__block_area = 0
+        for block in problem.block_list:
+            self.__block_area += len(block.pos_list)
+
+        # 配線に最低限必要なマス目の数
+        # - 両端の端子が同じブロックにある線分は端子間の距離は変わらないので
+        #   そのブロックを避けた最短経路の長さ - 1 だけ空きマス目を用いる．
+        # - 異なるブロックにある線分は端子同士を隣接させられない場合は
+        #   1つ以上の空きマス目を用いる．
+        self.__wire_area = 0
+        for line_id in problem.line_id_list:
+            (block_id1, pos1), (block_id2, pos2) = problem.terminals(line_id)
+            block1 = problem.block(block_id1)
+            block2 = problem.block(block_id2)
+            if block_id1 == block_id2:
+                self.__wire_area += _terminal_distance(block1, pos1, pos2) - 1
+            elif not _can_touch(block1, pos1, block2, pos2):
+                self.__wire_area += 1
+
+        # ブロックを置ける盤面の大きさの辞書のリスト
+        # 各辞書は (幅, 高さ) をキーとして置ける時に True を持つ．
+        # 幅と高さはブロックの幅と高さ + 2 までを調べれば十分である．
+        self.__block_list = problem.block_list
+        self.__fit_dict_list = [dict() for _ in self.__block_list]
+
+    @property
+    def block_area(self):
+        """ブロックの占めるマス目の数の合計を返す．"""
+        return self.__block_area
+
+    @property
+    def wire_area(self):
+        """配線に最低限必要なマス目の数を返す．"""
+        return self.__wire_area
+
+    def check(self, width, height):
+        """width x height の盤面に明らかに解がないかを調べる．
+        :param int width: 幅
+        :param int height: 高さ
+        :return: 解がないことがわかった下界の種類(BOUND_LIST のいずれか)を返す．
+        わからなかった場合は None を返す．
+        """
+        area = width * height
+        if area < self.__block_area:
+            return 'area'
+        for block, fit_dict in zip(self.__block_list, self.__fit_dict_list):
+            key = min(width, block.width + 2), min(height, block.height + 2)
+            if key not in fit_dict:
+                fit_dict[key] = _block_fits(block, *key)
+            if not fit_dict[key]:
+                return 'dimension'
+        if area < self.__block_area + self.__wire_area:
+            return 'wire'
+        return None
+
+
+def _block_fits(block, width, height):
+    """block を width x height の盤面に置けるか調べる．
+    :param Block block: ブロック
+    :param int width: 幅
+    :param int height: 高さ
+    盤面からはみ出さず，全ての端子から盤面内の
+    (自分のブロックに覆われない)隣接したマス目に枝を出せる位置があれば True を返す．
+    """
+    for y in range(height - block.height + 1):
+        for x in range(width - block.width + 1):
+            for pos1, label in block.pos_label_list:
+                for dir in ('n', 'e', 's', 'w'):
+                    pos2 = pos1.adjacent_pos(dir)
+                    if not (Position(x, y) + pos2).is_in_range(width, height):
+                        continue
+                    label2 = block.label(pos2)
+                    if label2 == -1 or label2 == label:
+                        break
+                else:
+                    break
+            else:
+                return True
+    return False
+
+
+def _can_touch(block1, pos1, block2, pos2):
+    """異なるブロックの2つの端子を隣接させられるか調べる．
+    :param Block block1, block2: ブロック
+    :param Position pos1, pos2: 端子の位置
+    pos1 の外側の隣に pos2 が来るように block2 を置いた時に
+    2つのブロックが重ならない方向があれば True を返す．
+    """
+    for dir in ('n', 'e', 's', 'w'):
+        pos3 = pos1.adjacent_pos(dir)
+        if block1.label(pos3) != -1:
+            continue
+        # block1 の左上を原点とした block2 の左上の位置
+        offset = pos3 - pos2
+        for pos4 in block2.pos_list:
+            if block1.label(offset + pos4) != -1:
+                break
+        else:
+            return True
+    return False
+
+
+def _terminal_distance(block, pos1, pos2):
+    """同じブロックの2つの端子の間のブロックを避けた最短距離を求める．
+    :param Block block: ブロック
+    :param Position pos1, pos2: 端子の位置
+    ブロックの外周を1マス広げた範囲で探索する．
+    それより外側を通る経路はこの範囲の境界に射影しても長くならない．
+    """
+    def is_free(pos):
+        if not (-1 <= pos.x <= block.width and -1 <= pos.y <= block.height):
+            return False
+        return pos == pos2 or block.label(pos) == -1
+
+    dist = {pos1: 0}
+    queue = [pos1]
+    while queue:
+        next_queue = []
+        for pos in queue:
+            d = dist[pos] + 1
+            for dir in ('n', 'e', 's', 'w'):
+                pos3 = pos.adjacent_pos(dir)
+                if pos3 in dist or not is_free(pos3):
+                    continue
+                if pos3 == pos2:
+                    return d
+                dist[pos3] = d
+                next_queue.append(pos3)
+        queue = next_queue
+    # 端子がブロックに囲まれていて到達できない．
+    # このブロックは置けないので 'dimension' で検出される．
+    return 1
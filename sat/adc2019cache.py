@@ -0,0 +1,214 @@
+#! /usr/bin/env python3
+
+"""ADC2019 の問題の解を保存しておくキャッシュ
+:file: adc2019cache.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from core.adc2019parser import Adc2019Parser
+from sat.satbool3 import SatBool3
+
+
+# キャッシュの大きさの上限のデフォルト値(バイト)
+DEFAULT_MAX_SIZE = 256 << 20
+
+# 結果のファイルの拡張子
+RESULT_SUFFIX = '.result'
+
+# CNF のファイルの拡張子
+CNF_SUFFIX = '.cnf.gz'
+
+
+def make_key(problem, width, height, enc_options=None):
+    """キャッシュのキーを作る．
+    :param Problem problem: 問題
+    :param int width: 幅
+    :param int height: 高さ
+    :param dict enc_options: エンコーダのオプション
+    :return: 問題の内容と盤面の大きさとオプションから計算した
+    SHA-256 のハッシュ値(16進数の文字列)を返す．
+    """
+    buff = io.StringIO()
+    problem.print(fout=buff)
+    buff.write(f'BOARD {width}X{height}\n')
+    if enc_options:
+        buff.write('OPTIONS ')
+        buff.write(json.dumps(enc_options, sort_keys=True))
+        buff.write('\n')
+    return hashlib.sha256(buff.getvalue().encode()).hexdigest()
+
+
+class Adc2019Cache:
+    """solve_adc2019() の結果を保存しておくキャッシュ
+    キャッシュは1つのディレクトリで，キー(make_key() の値)ごとに
+    - '<key>.result' : 結果('SAT' もしくは 'UNSAT')と ADC2019 形式の解
+    - '<key>.cnf.gz' : 生成した CNF (DIMACS 形式を gzip で圧縮したもの)
+    のファイルを持つ．
+    CNF は SAT ソルバが write_dimacs() を持つ場合のみ保存する．
+    確定した結果(SAT/UNSAT)のみ保存し，上限に達した場合は保存しない．
+
+    全てのファイルの大きさの合計が max_size を超えた場合は
+    最後に参照された時刻('<key>.result' の更新時刻)の古いものから削除する．
+    複数のプロセスで同じディレクトリを共有できるように
+    ファイルは一時ファイルに書いてから置き換える．
+
+    :param str cache_dir: キャッシュのディレクトリ名
+    :param int max_size: 大きさの上限(バイト)
+    """
+
+    def __init__(self, cache_dir, *, max_size=DEFAULT_MAX_SIZE):
+        self.__cache_dir = cache_dir
+        self.__max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self):
+        """キャッシュのディレクトリ名を返す．"""
+        return self.__cache_dir
+
+    def lookup(self, problem, width, height, enc_options=None):
+        """結果を探す．
+        :param Problem problem: 問題
+        :param int width: 幅
+        :param int height: 高さ
+        :param dict enc_options: エンコーダのオプション
+        :return: (stat, ans) を返す．
+        見つからなかった場合は None を返す．
+        返り値の形式は solve_adc2019() と同じ
+        """
+        key = make_key(problem, width, height, enc_options)
+        path = self.__path(key, RESULT_SUFFIX)
+        try:
+            with open(path, 'rt') as fin:
+                verdict = fin.readline().strip()
+                if verdict == 'SAT':
+                    parser = Adc2019Parser()
+                    ans = parser.read_answer(fin, problem.block_num)
+                    if ans is None:
+                        return None
+                    result = SatBool3.TRUE, ans
+                elif verdict == 'UNSAT':
+                    result = SatBool3.FALSE, None
+                else:
+                    return None
+            # LRU のために参照時刻を更新する．
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return result
+
+    def store(self, problem, width, height, stat, ans, *, solver=None, enc_options=None):
+        """結果を保存する．
+        :param Problem problem: 問題
+        :param int width: 幅
+        :param int height: 高さ
+        :param SatBool3 stat: 結果
+        :param Answer ans: 解
+        :param solver: CNF を保持している SAT ソルバ(キーワード引数)
+        :param dict enc_options: エンコーダのオプション(キーワード引数)
+        stat が SatBool3.X の時は何もしない．
+        """
+        if stat == SatBool3.X:
+            return
+        key = make_key(problem, width, height, enc_options)
+
+        if solver is not None and hasattr(solver, 'write_dimacs'):
+            def write_cnf(fout):
+                with gzip.open(fout, 'wt', compresslevel=1) as gzout:
+                    solver.write_dimacs(gzout)
+            self.__write_file(key, CNF_SUFFIX, 'wb', write_cnf)
+
+        def write_result(fout):
+            if stat == SatBool3.TRUE:
+                fout.write('SAT\n')
+                ans.print(fout=fout)
+            else:
+                fout.write('UNSAT\n')
+        # 結果のファイルを最後に書くことで CNF だけが残らないようにする．
+        self.__write_file(key, RESULT_SUFFIX, 'wt', write_result)
+
+        self.__evict()
+
+    def cnf_file(self, problem, width, height, enc_options=None):
+        """保存されている CNF のファイル名を返す．
+        :param Problem problem: 問題
+        :param int width: 幅
+        :param int height: 高さ
+        :param dict enc_options: エンコーダのオプション
+        :return: ファイル名を返す．保存されていない場合は None を返す．
+        """
+        key = make_key(problem, width, height, enc_options)
+        path = self.__path(key, CNF_SUFFIX)
+        if not os.path.exists(path):
+            return None
+        return path
+
+    def clear(self):
+        """全ての内容を削除する．"""
+        shutil.rmtree(self.__cache_dir, ignore_errors=True)
+        os.makedirs(self.__cache_dir, exist_ok=True)
+
+    def __path(self, key, suffix):
+        """ファイル名を返す．"""
+        return os.path.join(self.__cache_dir, key + suffix)
+
+    def __write_file(self, key, suffix, mode, writer):
+        """ファイルを書き込む．
+        :param str key: キー
+        :param str suffix: 拡張子
+        :param str mode: ファイルのモード
+        :param writer: ファイルオブジェクトを引数にとって内容を書き込む関数
+        """
+        (fh, tmp_file) = tempfile.mkstemp(dir=self.__cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fh, mode) as fout:
+                writer(fout)
+            os.replace(tmp_file, self.__path(key, suffix))
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+
+    def __evict(self):
+        """大きさの上限を超えていたら古いものから削除する．"""
+        total_size = 0
+        # キーをキーとして (参照時刻, 大きさの合計) を持つ辞書
+        entry_dict = {}
+        with os.scandir(self.__cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(RESULT_SUFFIX):
+                    key = entry.name[:-len(RESULT_SUFFIX)]
+                elif entry.name.endswith(CNF_SUFFIX):
+                    key = entry.name[:-len(CNF_SUFFIX)]
+                else:
+                    continue
+                try:
+                    file_stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                mtime, size = entry_dict.get(key, (0.0, 0))
+                if entry.name.endswith(RESULT_SUFFIX):
+                    mtime = file_stat.st_mtime
+                entry_dict[key] = mtime, size + file_stat.st_size
+                total_size += file_stat.st_size
+        if total_size <= self.__max_size:
+            return
+        for key, (mtime, size) in sorted(entry_dict.items(), key=lambda x: x[1][0]):
+            for suffix in (RESULT_SUFFIX, CNF_SUFFIX):
+                try:
+                    os.remove(self.__path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            total_size -= size
+            if total_size <= self.__max_size:
+                break
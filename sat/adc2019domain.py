@@ -0,0 +1,290 @@
+#! /usr/bin/env python3
+
+"""ADC2019 の問題の配置可能な領域を求めるクラス
+:file: adc2019domain.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from core.position import Position
+
+
+class Adc2019Domain:
+    """ブロックの配置可能な位置と，そこから決まる
+    各ブロック・各端子の届くグリッドを求めるクラス
+    :param Problem problem: 問題
+    :param int width: 幅
+    :param int height: 高さ
+
+    ブロックの左上の座標(アンカー)は以下の条件を満たすものに限られる．
+    - ブロックが盤面からはみ出さない．
+    - 各端子は盤面内の隣接したグリッドのうち，自分のブロックに覆われていないもの
+      (もしくは同じ線分の端子)を少なくとも1つ持つ．
+      端子からは必ず1本の枝が出るため．
+    どちらも解の存在とは無関係に成り立つので，これ以外の位置の変数を
+    作らなくても解は失われない．
+
+    また，各線分の通る可能性のあるグリッド(配線領域)を以下のように求める．
+    - あるブロックが全てのアンカーで覆うグリッドは，そこに来る可能性の
+      ある端子の線分以外は通れない．
+    - 配線領域は両方の端子の置かれる可能性のあるグリッドから，
+      通れるグリッドをたどって到達できる範囲の共通部分とする．
+    - 経路が端子以外に使うグリッドはブロックに覆われないグリッドである．
+      その数は盤面の面積からブロックの面積の和を引いたもの(空きグリッド数)
+      から，他の線分が最低限使う数を引いたもの以下となる．
+      端子から pos までの距離を d1, pos からもう一方の端子までの距離を d2
+      とすると pos を通る経路は d1 + d2 - 1 個の空きグリッドを使うので，
+      これが上限を超えるグリッドは配線領域に含めない．
+    - 端子以外の経路上のグリッドは経路上の隣接グリッドを2つ持つので，
+      配線領域内の隣接グリッドが2つ未満(端子の場合は1つ未満)の
+      グリッドは取り除く．
+    解の経路は常に配線領域に含まれるので，これ以外のグリッドに
+    線分ラベルの変数を作らなくても解は失われない．
+    ただし，迂回する経路も解となるため，空きグリッドの多い盤面では
+    配線領域はほぼ盤面全体となる．
+    """
+
+    def __init__(self, problem, width, height):
+        self.__width = width
+        self.__height = height
+        # ブロック番号をキーとしてアンカーのリストを持つ辞書
+        self.__anchor_list_dict = dict()
+        # ブロック番号をキーとしてアンカーの集合を持つ辞書
+        self.__anchor_set_dict = dict()
+        # グリッドをキーとして (ブロック番号, アンカー) のリストを持つ辞書
+        # そのアンカーに置かれた時にブロックがグリッドを覆う．
+        self.__cover_list_dict = dict()
+        # (グリッド, 線分番号) をキーとして (ブロック番号, アンカー) のリストを持つ辞書
+        # そのアンカーに置かれた時に線分の端子がグリッドに来る．
+        self.__terminal_list_dict = dict()
+
+        for block in problem.block_list:
+            anchor_list = []
+            for y in range(height - block.height + 1):
+                for x in range(width - block.width + 1):
+                    anchor = Position(x, y)
+                    if self.__check_terminals(block, anchor):
+                        anchor_list.append(anchor)
+            self.__anchor_list_dict[block.block_id] = anchor_list
+            self.__anchor_set_dict[block.block_id] = set(anchor_list)
+            for anchor in anchor_list:
+                for pos1 in block.pos_list:
+                    pos = anchor + pos1
+                    if pos not in self.__cover_list_dict:
+                        self.__cover_list_dict[pos] = []
+                    self.__cover_list_dict[pos].append((block.block_id, anchor))
+                for pos1, label in block.pos_label_list:
+                    key = anchor + pos1, label
+                    if key not in self.__terminal_list_dict:
+                        self.__terminal_list_dict[key] = []
+                    self.__terminal_list_dict[key].append((block.block_id, anchor))
+
+        # グリッドをキーとしてそこを通れる可能性のある線分番号の集合を持つ辞書
+        # 全てのアンカーで覆われるグリッドのみを持つ．
+        self.__label_set_dict = dict()
+        for block in problem.block_list:
+            anchor_list = self.__anchor_list_dict[block.block_id]
+            if not anchor_list:
+                # 配置できないブロックは考えない．
+                continue
+            count_dict = dict()
+            label_set_dict = dict()
+            for anchor in anchor_list:
+                for pos1 in block.pos_list:
+                    pos = anchor + pos1
+                    count_dict[pos] = count_dict.get(pos, 0) + 1
+                    if pos not in label_set_dict:
+                        label_set_dict[pos] = set()
+                    label_set_dict[pos].add(block.label(pos1))
+            for pos, count in count_dict.items():
+                if count < len(anchor_list):
+                    continue
+                if pos in self.__label_set_dict:
+                    self.__label_set_dict[pos] &= label_set_dict[pos]
+                else:
+                    self.__label_set_dict[pos] = label_set_dict[pos]
+
+        free_num = width * height
+        for block in problem.block_list:
+            free_num -= len(block.pos_list)
+        line_id_list = problem.line_id_list
+
+        # 線分番号をキーとして配線領域を持つ辞書
+        self.__region_dict = dict()
+
+        # 通れないグリッドがなく，どの線分も最長の経路を取れるだけの
+        # 空きグリッドがある場合は配線領域は盤面全体となるので計算を省略する．
+        # 2つのグリッドの距離は max_dist 以下となる．
+        max_dist = width + height - 2
+        if not self.__label_set_dict and width > 1 and height > 1 and \
+           free_num - len(line_id_list) * (max_dist - 1) >= 2 * max_dist - 1:
+            region = set(Position(x, y) for y in range(height) for x in range(width))
+            for line_id in line_id_list:
+                self.__region_dict[line_id] = region
+            return
+
+        # 線分番号をキーとして各端子の置かれる可能性のあるグリッドから
+        # の距離の辞書のペアを持つ辞書
+        dist_dict = dict()
+        for line_id in line_id_list:
+            dist_dict[line_id] = tuple(
+                self.__gen_distance(set(anchor + pos1 for anchor in
+                                        self.__anchor_list_dict[block_id]),
+                                    line_id)
+                for block_id, pos1 in problem.terminals(line_id))
+
+        # 各線分が最低限使う空きグリッド数
+        # 端子間の距離 - 1 となる．
+        # 端子が到達できない場合は解がないので 0 としておく．
+        min_free_dict = dict()
+        for line_id, (dist1, dist2) in dist_dict.items():
+            min_free_dict[line_id] = min((d + dist2[pos] - 1
+                                          for pos, d in dist1.items() if pos in dist2),
+                                         default=0)
+        total_min_free = sum(min_free_dict.values())
+
+        for line_id, (dist1, dist2) in dist_dict.items():
+            # この線分が使える空きグリッド数の上限
+            limit = free_num - (total_min_free - min_free_dict[line_id])
+            region = set(pos for pos, d in dist1.items()
+                         if pos in dist2 and d + dist2[pos] - 1 <= limit)
+            self.__region_dict[line_id] = self.__prune_region(problem, line_id, region)
+
+    def anchor_list(self, block_id):
+        """ブロックのアンカーのリストを返す．
+        :param int block_id: ブロック番号
+        """
+        return self.__anchor_list_dict[block_id]
+
+    def is_anchor(self, block_id, pos):
+        """pos がブロックのアンカーの時 True を返す．
+        :param int block_id: ブロック番号
+        :param Position pos: 位置
+        """
+        return pos in self.__anchor_set_dict[block_id]
+
+    def x_list(self, block_id):
+        """ブロックのアンカーのX座標のリストを昇順に返す．
+        :param int block_id: ブロック番号
+        """
+        return sorted(set(anchor.x for anchor in self.__anchor_list_dict[block_id]))
+
+    def y_list(self, block_id):
+        """ブロックのアンカーのY座標のリストを昇順に返す．
+        :param int block_id: ブロック番号
+        """
+        return sorted(set(anchor.y for anchor in self.__anchor_list_dict[block_id]))
+
+    def cover_list(self, pos):
+        """グリッドを覆う可能性のあるブロックとアンカーのリストを返す．
+        :param Position pos: グリッドの位置
+        :return: (ブロック番号, アンカー) のリストを返す．
+        """
+        return self.__cover_list_dict.get(pos, [])
+
+    def terminal_list(self, pos, line_id):
+        """グリッドに線分の端子を置く可能性のあるブロックとアンカーのリストを返す．
+        :param Position pos: グリッドの位置
+        :param int line_id: 線分番号
+        :return: (ブロック番号, アンカー) のリストを返す．
+        """
+        return self.__terminal_list_dict.get((pos, line_id), [])
+
+    def is_routable(self, pos, line_id):
+        """pos が線分の配線領域に含まれる時 True を返す．
+        :param Position pos: グリッドの位置
+        :param int line_id: 線分番号
+        """
+        return pos in self.__region_dict[line_id]
+
+    def region(self, line_id):
+        """線分の配線領域を返す．
+        :param int line_id: 線分番号
+        :return: グリッドの位置の集合を返す．
+        """
+        return self.__region_dict[line_id]
+
+    def __gen_distance(self, start_set, line_id):
+        """線分の通れるグリッドをたどった start_set からの距離を求める．
+        :param set[Position] start_set: 始点の集合
+        :param int line_id: 線分番号
+        :return: グリッドの位置をキーとして距離を値とする辞書を返す．
+        到達できないグリッドは含まない．
+        """
+        dist = dict()
+        queue = []
+        for pos in start_set:
+            if self.__is_passable(pos, line_id):
+                dist[pos] = 0
+                queue.append(pos)
+        # 幅優先探索を行う．
+        while queue:
+            next_queue = []
+            for pos in queue:
+                d = dist[pos] + 1
+                for pos1 in self.__neighbors(pos):
+                    if pos1 not in dist and self.__is_passable(pos1, line_id):
+                        dist[pos1] = d
+                        next_queue.append(pos1)
+            queue = next_queue
+        return dist
+
+    def __prune_region(self, problem, line_id, region):
+        """経路上の隣接グリッドを持てないグリッドを配線領域から取り除く．
+        :param Problem problem: 問題
+        :param int line_id: 線分番号
+        :param set[Position] region: 配線領域(内容は変更される)
+        :return: region を返す．
+        """
+        terminal_set = set()
+        for block_id, pos1 in problem.terminals(line_id):
+            for anchor in self.__anchor_list_dict[block_id]:
+                terminal_set.add(anchor + pos1)
+        # 取り除いたグリッドの隣も調べ直す．
+        queue = list(region)
+        while queue:
+            pos = queue.pop()
+            if pos not in region:
+                continue
+            n = sum(1 for pos1 in self.__neighbors(pos) if pos1 in region)
+            if n < (1 if pos in terminal_set else 2):
+                region.discard(pos)
+                queue.extend(pos1 for pos1 in self.__neighbors(pos) if pos1 in region)
+        return region
+
+    def __is_passable(self, pos, line_id):
+        """pos を線分が通れる可能性がある時 True を返す．
+        :param Position pos: グリッドの位置
+        :param int line_id: 線分番号
+        """
+        label_set = self.__label_set_dict.get(pos)
+        return label_set is None or line_id in label_set
+
+    def __neighbors(self, pos):
+        """盤面内の隣接グリッドを返す．
+        :param Position pos: グリッドの位置
+        正確にはジェネレータを返す．
+        """
+        for dir in ('n', 'e', 's', 'w'):
+            pos1 = pos.adjacent_pos(dir)
+            if pos1.is_in_range(self.__width, self.__height):
+                yield pos1
+
+    def __check_terminals(self, block, anchor):
+        """block を anchor に置いた時に全ての端子から枝が出せる時 True を返す．
+        :param Block block: ブロック
+        :param Position anchor: アンカー
+        """
+        for pos1, label in block.pos_label_list:
+            for dir in ('n', 'e', 's', 'w'):
+                pos2 = pos1.adjacent_pos(dir)
+                if not (anchor + pos2).is_in_range(self.__width, self.__height):
+                    continue
+                label2 = block.label(pos2)
+                if label2 == -1 or label2 == label:
+                    break
+            else:
+                return False
+        return True
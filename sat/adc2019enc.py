@@ -8,10 +8,42 @@ Copyright (C) 2020 Yusuke Matsunaga
 All rights reserved.
 """
 
+import sys
+import time
 from core.answer import Answer
 from core.position import Position
+from core.board import get_board
 from sat.satbool3 import SatBool3
-from sat.satsolver import SatSolver
+from sat.satmodel import SatModel
+from sat.solverfactory import new_solver
+from sat.cnfsimplifier import CnfSimplifier
+from sat.amoencoder import AmoEncoder
+from sat.adc2019sym import interchangeable_block_classes, reflection_block_map
+from sat.adc2019domain import Adc2019Domain
+from sat.adc2019bounds import Adc2019Bounds
+
+
+# At-Most-One/One-Hot 制約の種類のリスト
+# - 'block' : 各ブロックのX座標/Y座標の変数の One-Hot 制約
+# - 'grid'  : 各グリッドのブロック番号の変数の At-Most-One 制約
+# - 'line'  : 各グリッドの線分番号の変数の At-Most-One 制約
+# - 'edge'  : 端子のグリッドに接続する枝の変数の条件付き One-Hot 制約
+AMO_FAMILY_LIST = ('block', 'grid', 'line', 'edge')
+
+# 統計情報を記録する制約の種類のリスト
+# - 'domain'   : 配置可能な領域と配線領域の解析(時間のみ)
+# - 'size'     : 盤面の大きさを制限する変数(size_activation=True の時のみ)
+# - 'coord'    : ブロックの座標の変数とその制約
+# - 'grid'     : グリッドのブロック番号の変数とブロックの形状の制約
+# - 'symmetry' : 対称性を除去する制約
+# - 'label'    : グリッドの線分番号の変数とその At-Most-One 制約
+# - 'terminal' : 端子の変数とその制約
+# - 'edge'     : 枝の変数
+# - 'degree'   : 各グリッドに接続する枝の数の制約
+# - 'equality' : 枝の両端の線分番号が等しいという制約
+# - 'uturn'    : コの字制約
+STATS_FAMILY_LIST = ('domain', 'size', 'coord', 'grid', 'symmetry', 'label', 'terminal',
+                     'edge', 'degree', 'equality', 'uturn')
 
 
 class Adc2019Enc:
@@ -20,152 +52,292 @@ class Adc2019Enc:
     :param Problem problem: 問題
     :param int width: 幅
     :param int height: 高さ
+    :param bool size_activation: 盤面を縮める活性化変数を作る時 True にする．
+    :param amo_encoding: At-Most-One/One-Hot 制約の符号化方法
+    文字列の場合は全ての種類に用いる．
+    辞書の場合は制約の種類(AMO_FAMILY_LIST)をキーとして符号化方法
+    (sat.amoencoder.AMO_METHOD_LIST)を持つ．省略された種類は 'pairwise' となる．
+    :param bool symmetry_breaking: 対称性を除去する制約を作る時 True にする．
+    :param bool collect_stats: 制約の種類ごとの統計情報を集める時 True にする．
+
+    size_activation が True の場合，width x height の盤面に対して
+    「幅が c 以下」「高さが c 以下」を表す変数を作る．
+    これらの変数は size_assumptions() で得られる仮定として用いることで
+    同じ CNF のまま小さな盤面の問題を解くことができる．
+
+    変数と節は Adc2019Domain で求めたブロックの配置可能な位置と
+    そこから届くグリッドの範囲でのみ作る．
+    そのため変数の辞書は疎になり，ブロックに比べて大きな盤面では CNF も小さくなる．
+    変数はキーごとの辞書ではなく，ブロック番号，座標，グリッド番号，線分の順番，
+    枝番号から計算した位置で引く平坦なリスト(変数がない要素は None)で管理する．
+    変数は作った順に番号が付くので，作る順序は変数の持ち方によらない．
+    線分ラベルの変数も Adc2019Domain で求めた各線分の配線領域の中にのみ作り，
+    枝の変数はその両端を同じ線分が通れる場合にのみ作る．
+
+    symmetry_breaking が True の場合，gen_placement_constraint() で
+    交換可能なブロックの位置に辞書式順序を課し，
+    盤面の鏡映が問題の対称性となっている場合はあるブロックを盤面の左(上)半分に置く．
+    盤面の鏡映は size_activation が True の場合は用いない．
+
+    collect_stats が True の場合，制約の種類(STATS_FAMILY_LIST)ごとに
+    作った変数の数，節数，リテラル数と時間を数える．
+    結果は stats() と print_stats() で得られる．
     """
-    def __init__(self, solver, problem, width, height):
+    def __init__(self, solver, problem, width, height, *, size_activation=False,
+                 amo_encoding=None, symmetry_breaking=True,
+                 collect_stats=False):
+        if collect_stats:
+            # 変数と節を数えるために solver を包む．
+            solver = _StatsSolver(solver)
+            self.__stats = {family: {'vars': 0, 'clauses': 0, 'literals': 0, 'time': 0.0}
+                            for family in STATS_FAMILY_LIST}
+        else:
+            self.__stats = None
+        # 統計情報を記録している制約の種類と開始時刻
+        self.__stats_family = None
+        self.__stats_start = None
         self.__solver = solver
         self.__problem = problem
         self.__width = width
         self.__height = height
-        self.__gridpos_list = list()
-        for y in range(self.__height):
-            for x in range(self.__width):
-                self.__gridpos_list.append(Position(x, y))
-        self.__x_var_dict = dict()
-        self.__y_var_dict = dict()
-        self.__g_var_dict = dict()
-        self.__b_var_dict = dict()
-        self.__l_var_dict = dict()
-        self.__t_var_dict = dict()
-        self.__e_var_dict = dict()
+        self.__size_activation = size_activation
+        self.__symmetry_breaking = symmetry_breaking
+        if amo_encoding is None or isinstance(amo_encoding, str):
+            amo_encoding = {family: amo_encoding or 'pairwise' for family in AMO_FAMILY_LIST}
+        for family in amo_encoding:
+            if family not in AMO_FAMILY_LIST:
+                raise ValueError(f'{family}: unknown constraint family')
+        self.__amo_encoder_dict = dict()
+        for family in AMO_FAMILY_LIST:
+            method = amo_encoding.get(family, 'pairwise')
+            self.__amo_encoder_dict[family] = AmoEncoder(solver, method)
+        self.__board = get_board(width, height)
+        self.__set_stats_family('domain')
+        self.__domain = Adc2019Domain(problem, width, height)
+        self.__set_stats_family(None)
+        n = self.__board.grid_num
+        nb = problem.block_num
+        # 線分番号のリストと線分番号をキーとしてその中の位置を持つ辞書
+        self.__line_id_list = problem.line_id_list
+        self.__line_pos_dict = {line_id: i for i, line_id in enumerate(self.__line_id_list)}
+        nl = len(self.__line_id_list)
+        # ブロックのX座標/Y座標の変数のリスト
+        # ブロックリスト中の位置 * width + x (Y座標は height と y)の位置に持つ．
+        # ブロック番号は 1 から連続しているとは限らないので，
+        # ブロックリスト中の位置は Problem.block_index() で求める．
+        self.__x_var_list = [None] * (nb * width)
+        self.__y_var_list = [None] * (nb * height)
+        # グリッドのブロック番号の変数のリスト
+        # グリッド番号 * ブロック数 + ブロックリスト中の位置 に持つ．
+        self.__g_var_list = [None] * (n * nb)
+        # グリッド番号で引くブロックに覆われる/端子が置かれる変数のリスト
+        self.__b_var_list = [None] * n
+        self.__t_var_list = [None] * n
+        # 線分ラベルの変数のリスト
+        # グリッド番号 * 線分数 + 線分の順番 の位置に持つので
+        # 1つのグリッドの変数は連続した範囲となる．
+        self.__l_var_list = [None] * (n * nl)
+        # 枝番号で引く枝の変数のリスト
+        self.__e_var_list = [None] * self.__board.edge_num
+        # 幅/高さが c 以下であることを表す変数のリスト
+        # c = 0 の要素は使わない．
+        self.__x_cut_var_list = [None]
+        self.__y_cut_var_list = [None]
+
+    def size_assumptions(self, width, height):
+        """盤面を width x height に制限する仮定を返す．
+        :param int width: 幅
+        :param int height: 高さ
+        :return: solve() に渡す仮定のリストを返す．
+        size_activation=True で作られている必要がある．
+        """
+        assert self.__size_activation
+        assert 1 <= width <= self.__width
+        assert 1 <= height <= self.__height
+        assumption_list = []
+        if width < self.__width:
+            assumption_list.append(self.__x_cut_var_list[width])
+        if height < self.__height:
+            assumption_list.append(self.__y_cut_var_list[height])
+        return assumption_list
+
+    def stats(self):
+        """統計情報を返す．
+        :return: 制約の種類(STATS_FAMILY_LIST)をキーとして以下の値の
+        辞書を持つ辞書を返す．collect_stats=False の場合は None を返す．
+        - 'vars'     : 変数の数
+        - 'clauses'  : 節数
+        - 'literals' : リテラル数
+        - 'time'     : 生成にかかった時間(秒)
+        """
+        if self.__stats is None:
+            return None
+        return {family: dict(stats) for family, stats in self.__stats.items()}
+
+    def print_stats(self, fout=sys.stdout):
+        """統計情報を出力する．
+        :param FILE fout: 出力先のファイルオブジェクト
+        collect_stats=True で作られている必要がある．
+        """
+        assert self.__stats is not None
+        fout.write(f'CNF encoding ({self.__width} x {self.__height}):\n')
+        fout.write(f'  {"family":10s} {"vars":>10s} {"clauses":>10s}'
+                   f' {"literals":>10s} {"time":>10s}\n')
+        total = {'vars': 0, 'clauses': 0, 'literals': 0, 'time': 0.0}
+        for family, stats in self.__stats.items():
+            fout.write(f'  {family:10s} {stats["vars"]:10d} {stats["clauses"]:10d}'
+                       f' {stats["literals"]:10d} {stats["time"]:9.3f}s\n')
+            for key in total:
+                total[key] += stats[key]
+        fout.write(f'  {"total":10s} {total["vars"]:10d} {total["clauses"]:10d}'
+                   f' {total["literals"]:10d} {total["time"]:9.3f}s\n')
 
     def gen_placement_constraint(self):
         """配置制約を作る．
         """
+        if self.__size_activation:
+            # 盤面の大きさを制限する変数を作る．
+            self.__set_stats_family('size')
+            # 順序符号化なので「c 以下」ならば「c + 1 以下」となる．
+            for var_list, size in ((self.__x_cut_var_list, self.__width),
+                                   (self.__y_cut_var_list, self.__height)):
+                for c in range(1, size):
+                    var = self.__solver.new_variable()
+                    if c > 1:
+                        self.__solver.add_clause(-var_list[c - 1], var)
+                    var_list.append(var)
+
         # 各ブロックの左上の座標を表す変数を作る．
         # ここでは One-Hot 符号化を用いる．
-        # 各ブロックに付き width 個と height 個の変数を用意する．
-        # 作った変数はブロック番号とx/y座標のペアをキーにした
-        # 辞書で管理する．
+        # 座標が x であることを表す変数を各ブロックに付き
+        # 配置可能なX座標とY座標の数だけ用意する．
+        # 作った変数はブロック番号とx/y座標から位置を計算する
+        # リストで管理する．
+        self.__set_stats_family('coord')
         for block in self.__problem.block_list:
+            block_id = block.block_id
             # block のX座標を表す変数を作る．
-            var_list = []
-            for x in range(self.__width):
-                var = self.__solver.new_variable()
-                key = block.block_id, x
-                self.__x_var_dict[key] = var
-                if x + block.width >= self.__width:
-                    # 右端からはみ出るので置けない．
-                    self.__solver.add_clause(-var)
-                else:
-                    var_list.append(var)
-            self.__gen_one_hot_constraint(var_list)
+            x_list = self.__domain.x_list(block_id)
+            self.__gen_coord_vars(block_id, x_list, block.width,
+                                  self.__x_var_list, self.__width, self.__add_x_cut_clause)
 
             # block のY座標を表す変数を作る．
-            var_list = []
-            for y in range(self.__height):
-                var = self.__solver.new_variable()
-                key = block.block_id, y
-                self.__y_var_dict[key] = var
-                if y + block.height >= self.__height:
-                    # 下端からはみ出るので置けない．
-                    self.__solver.add_clause(-var)
-                else:
-                    var_list.append(var)
-            self.__gen_one_hot_constraint(var_list)
+            y_list = self.__domain.y_list(block_id)
+            self.__gen_coord_vars(block_id, y_list, block.height,
+                                  self.__y_var_list, self.__height, self.__add_y_cut_clause)
+
+            # X座標とY座標の組み合わせで配置できないものを禁止する．
+            for y in y_list:
+                for x in x_list:
+                    if not self.__domain.is_anchor(block_id, Position(x, y)):
+                        x_var = self.__block_x_var(block_id, x)
+                        y_var = self.__block_y_var(block_id, y)
+                        self.__solver.add_clause(-x_var, -y_var)
 
         # 盤面の各グリッドがどのブロックに使用されているか
         # を表す変数．
-        # 各グリッド毎に nblock 個の変数を用意する．
+        # 各グリッド毎にそのグリッドを覆う可能性のあるブロックの数だけ
+        # 変数を用意する．
         # こちらは At-Most-One 符号化を用いる．
-        for pos in self.__gridpos_list:
+        self.__set_stats_family('grid')
+        for index, pos in enumerate(self.__board.pos_list):
+            cover_list = self.__domain.cover_list(pos)
+            if not cover_list:
+                # どのブロックにも覆われない．
+                continue
             var_list = []
             # このグリッドがいずれかのブロックで使われている時に
             # True となる変数を作る．
             b_var = self.__solver.new_variable()
-            self.__b_var_dict[pos] = b_var
-            for block in self.__problem.block_list:
+            self.__b_var_list[index] = b_var
+            for block_index, block in enumerate(self.__problem.block_list):
+                anchor_list = [anchor for block_id, anchor in cover_list
+                               if block_id == block.block_id]
+                if not anchor_list:
+                    continue
                 # このグリッドが block で使われている時に
                 # True となる変数
                 var = self.__solver.new_variable()
-                key = pos, block.block_id
-                self.__g_var_dict[key] = var
-                # var1_list = list()
-                for pos1 in block.pos_list:
-                    pos2 = pos - pos1
-                    if pos2.is_in_range(self.__width, self.__height):
-                        x_var = self.__block_x_var(block.block_id, pos2.x)
-                        y_var = self.__block_y_var(block.block_id, pos2.y)
-                        self.__solver.add_clause(-x_var, -y_var, var)
-                        self.__solver.add_clause(-x_var, -y_var, b_var)
-                        # var1 = self.__solver.new_variable()
-                        # self.__solver.add_clause(-x_var, -y_var,  var1)
-                        # self.__solver.add_clause( x_var,         -var1)
-                        # self.__solver.add_clause(         y_var, -var1)
-                        # var1_list.append(var1)
-                        # self.__solver.add_clause(-var1, var)
-                # self.__solver.add_clause(-var, var1_list)
+                self.__g_var_list[index * self.__problem.block_num + block_index] = var
+                for anchor in anchor_list:
+                    # block が anchor に置かれた時に pos を覆う．
+                    x_var = self.__block_x_var(block.block_id, anchor.x)
+                    y_var = self.__block_y_var(block.block_id, anchor.y)
+                    self.__solver.add_clause(-x_var, -y_var, var)
+                    self.__solver.add_clause(-x_var, -y_var, b_var)
                 var_list.append(var)
-                # self.__solver.add_clause(-var, b_var)
-            self.__gen_at_most_one_constraint(var_list)
+            self.__amo_encoder_dict['grid'].gen_at_most_one(var_list)
             # 実は add_clause は変数とリストの混在もかける．
             self.__solver.add_clause(-b_var, var_list)
 
-        # ブロック位置の変数と盤面のラベルの変数の間の関係
-        # を表す制約を作る．
-        for pos in self.__gridpos_list:
-            for block in self.__problem.block_list:
-                # pos のグリッドを block が占めている時の条件を作る．
-                for pos1 in block.pos_list:
-                    pos0 = pos - pos1
-                    if pos0.is_in_range(self.__width, self.__height):
-                        # block が pos0 に置かれた時に pos1 の位置がちょうど pos になる．
-                        # ので pos のラベルを block_id にする．
-                        x_var = self.__block_x_var(block.block_id, pos0.x)
-                        y_var = self.__block_y_var(block.block_id, pos0.y)
-                        g_var = self.__grid_var(pos, block.block_id)
-                        self.__solver.add_clause(-x_var, -y_var, g_var)
+        if self.__symmetry_breaking:
+            # 対称性を除去する制約を作る．
+            self.__set_stats_family('symmetry')
+            self.__gen_symmetry_breaking_constraint()
+        self.__set_stats_family(None)
 
     def gen_routing_constraint(self):
         """配線制約を作る．"""
         # 盤面上の線分ラベルを表す変数を作る．
-        # 一つのグリッドに対して線分数の数だけ用意する．
-        for pos in self.__gridpos_list:
-            var_list = []
-            for line_id in self.__problem.line_id_list:
+        # 一つのグリッドに対してそこを配線領域に含む線分の数だけ用意する．
+        self.__set_stats_family('label')
+        nl = len(self.__line_id_list)
+        for index, pos in enumerate(self.__board.pos_list):
+            l_var_list = []
+            for i, line_id in enumerate(self.__line_id_list):
+                if not self.__domain.is_routable(pos, line_id):
+                    continue
                 var = self.__solver.new_variable()
-                key = pos, line_id
-                self.__l_var_dict[key] = var
-                var_list.append(var)
+                self.__l_var_list[index * nl + i] = var
+                l_var_list.append(var)
             # 一つのグリッド上では高々1つの線分しか選ばれない．
             # 一つも選ばれない場合もあるので one-hot ではない．
-            self.__gen_at_most_one_constraint(var_list)
+            self.__amo_encoder_dict['line'].gen_at_most_one(l_var_list)
+
+            # 制限された盤面の外側では線分は選ばれない．
+            for l_var in l_var_list:
+                self.__add_x_cut_clause(pos.x, -l_var)
+                self.__add_y_cut_clause(pos.y, -l_var)
+
+        # 端子に関する制約を作る．
+        self.__set_stats_family('terminal')
+        for index, pos in enumerate(self.__board.pos_list):
+            # pos の線分ラベルを表す変数のリスト
+            l_var_list = [var for var in self.__l_var_list[index * nl:(index + 1) * nl]
+                          if var is not None]
 
             # このグリッドがブロックに覆われている(線分として使えない)時に
             # True となる変数．
-            b_var = self.__b_var_dict[pos]
+            # どのブロックにも覆われない場合は None となる．
+            b_var = self.__b_var_list[index]
+
+            # pos に端子を置く可能性のある線分のリスト
+            t_line_list = [line_id for line_id in self.__line_id_list
+                           if self.__domain.terminal_list(pos, line_id)]
+            if not t_line_list:
+                # 端子は置かれないので線分ラベルは 0 となる．
+                if b_var is not None:
+                    for l_var in l_var_list:
+                        self.__solver.add_clause(-b_var, -l_var)
+                continue
 
             # pos にいずれかの端子が置かれる時に True になる変数．
             t_all_var = self.__solver.new_variable()
-            self.__t_var_dict[pos] = t_all_var
+            self.__t_var_list[index] = t_all_var
             t_var_list = []
-            for line_id in self.__problem.line_id_list:
+            for line_id in t_line_list:
                 # pos に line_id の端子が置かれる時に True になる変数
                 t1_var = self.__solver.new_variable()
-                key = pos, line_id
                 xyvar_list = []
-                for block_id, pos1 in self.__problem.terminals(line_id):
-                    pos0 = pos - pos1
-                    if pos0.is_in_range(self.__width, self.__height):
-                        # block_id のブロックが pos0 に置かれた時に
-                        # pos のグリッドが line_id の線分の端子となる．
-                        x_var = self.__block_x_var(block_id, pos0.x)
-                        y_var = self.__block_y_var(block_id, pos0.y)
-                        xyvar_list.append((x_var, y_var))
+                for block_id, anchor in self.__domain.terminal_list(pos, line_id):
+                    # block_id のブロックが anchor に置かれた時に
+                    # pos のグリッドが line_id の線分の端子となる．
+                    x_var = self.__block_x_var(block_id, anchor.x)
+                    y_var = self.__block_y_var(block_id, anchor.y)
+                    xyvar_list.append((x_var, y_var))
 
                 n = len(xyvar_list)
-                if n == 0:
-                    self.__solver.add_clause(-t1_var)
-                elif n == 1:
+                if n == 1:
                     x_var, y_var = xyvar_list[0]
                     self.__solver.add_clause(-x_var, -y_var,  t1_var)
                     self.__solver.add_clause( x_var,         -t1_var)
@@ -184,8 +356,12 @@ class Adc2019Enc:
                     self.__solver.add_clause( var1,  var2, -t1_var)
 
                 # t1_var が True の時には線分番号 line_id のラベルがつく．
-                l_var = self.__line_var(pos, line_id)
-                self.__solver.add_clause(-t1_var, l_var)
+                # pos が配線領域に含まれない場合は t1_var は True にならない．
+                l_var = self.__line_var(index, line_id)
+                if l_var is None:
+                    self.__solver.add_clause(-t1_var)
+                else:
+                    self.__solver.add_clause(-t1_var, l_var)
 
                 # t1_var が True の時には pos に端子が置かれる．
                 self.__solver.add_clause(-t1_var, t_all_var)
@@ -194,126 +370,120 @@ class Adc2019Enc:
             self.__solver.add_clause(-t_all_var, t_var_list)
 
             # t_all_var が False で b_var が True の場合線分ラベルは 0 となる．
-            for line_id in self.__problem.line_id_list:
-                l_var = self.__line_var(pos, line_id)
+            for l_var in l_var_list:
                 self.__solver.add_clause(t_all_var, -b_var, -l_var)
 
         # グリッド間の枝を表す変数を作る．
-        self.__e_var_dict = {}
-
-        # 縦方向の枝
-        for x in range(self.__width):
-            for y in range(self.__height - 1):
-                var = self.__solver.new_variable()
-
-                # (x, y) から s 方向の枝という意味
-                key = Position(x, y), 's'
-                self.__e_var_dict[key] = var
-
-                # (x, y + 1) から n 方向の枝という意味
-                key = Position(x, y + 1), 'n'
-                self.__e_var_dict[key] = var
-
-        # 横方向の枝
-        for y in range(self.__height):
-            for x in range(self.__width - 1):
-                var = self.__solver.new_variable()
-
-                # (x, y) から e 方向の枝という意味
-                key = Position(x, y), 'e'
-                self.__e_var_dict[key] = var
-
-                # (x + 1, y) から w 方向の枝という意味
-                key = Position(x + 1, y), 'w'
-                self.__e_var_dict[key] = var
+        # Board の枝番号の順(縦方向の枝，横方向の枝の順)に作る．
+        self.__set_stats_family('edge')
+        pos_list = self.__board.pos_list
+        for edge, (index1, index2) in enumerate(self.__board.edge_list):
+            # 両端を同じ線分が通れない枝は選ばれないので変数を作らない．
+            pos1 = pos_list[index1]
+            pos2 = pos_list[index2]
+            if not self.__is_routable_edge(pos1, pos2):
+                continue
+            var = self.__solver.new_variable()
+            self.__e_var_list[edge] = var
+
+            # 制限された盤面の外側に出る枝は選ばれない．
+            # pos2 は pos1 の下もしくは右となる．
+            self.__add_x_cut_clause(pos2.x, -var)
+            self.__add_y_cut_clause(pos2.y, -var)
+
+        self.__gen_edge_constraint_array()
+        self.__set_stats_family(None)
+
+    def __gen_edge_constraint_array(self):
+        """枝に関する制約('degree', 'equality', 'uturn')を作る．
+        Board のグリッドごとの枝のリスト，枝のリストと 2x2 の窓のリストを
+        順に走査し，変数は枝番号とグリッド番号でリストを引くだけで節を作る．
+        'equality' の節は枝ごとに1回のみ作る．
+        """
+        board = self.__board
+        e_var_list = self.__e_var_list
+        add_clause = self.__solver.add_clause
 
         # 各グリッドに接続する枝に関する制約を作る．
-        for pos in self.__gridpos_list:
-            var_list = list()
-            for dir in ('n', 'e', 's', 'w'):
-                key = pos, dir
-                if key not in self.__e_var_dict:
-                    continue
-
-                var = self.__e_var_dict[key]
-                var_list.append(var)
-
-            t_var = self.__t_var_dict[pos]
-            b_var = self.__b_var_dict[pos]
-
-            # pos が線分の端子の場合
-            # 1個の変数が選ばれる．
-            self.__gen_one_hot_constraints_with_cond(var_list, t_var)
-
-            # pos が端子以外のブロックの場合，
-            # 変数は選ばれない．
-            for var in var_list:
-                self.__solver.add_clause(-b_var, t_var, -var)
-
-            # pos がそれ以外の場合
-            # 0 個か 2 個の変数が選ばれる．
-            self.__gen_zero_or_two_hot_constraints_with_cond(var_list, -b_var)
+        self.__set_stats_family('degree')
+        edge_encoder = self.__amo_encoder_dict['edge']
+        for index in range(board.grid_num):
+            # n, e, s, w の順に並ぶ．
+            var_list = [e_var_list[edge] for _, edge in board.cell_edge_list(index)
+                        if e_var_list[edge]]
+            t_var = self.__t_var_list[index]
+            b_var = self.__b_var_list[index]
+            if t_var:
+                edge_encoder.gen_one_hot(var_list, t_var)
+            if b_var:
+                t_lits = [t_var] if t_var else []
+                for var in var_list:
+                    add_clause(-b_var, t_lits, -var)
+            self.__gen_zero_or_two_hot_constraints_with_cond(var_list,
+                                                             -b_var if b_var else None)
 
         # 枝が選択されている時にその両端のグリッドの線分番号が等しくなるという制約
-        for pos1 in self.__gridpos_list:
-            for dir in ('n', 'e', 's', 'w'):
-                key = pos1, dir
-                if key not in self.__e_var_dict:
-                    continue
-
-                e_var = self.__e_var_dict[key]
-                pos2 = pos1.adjacent_pos(dir)
-                for line_id in self.__problem.line_id_list:
-                    l1_var = self.__line_var(pos1, line_id)
-                    l2_var = self.__line_var(pos2, line_id)
-                    self.__solver.add_clause(-e_var,  l1_var, -l2_var)
-                    self.__solver.add_clause(-e_var, -l1_var,  l2_var)
+        self.__set_stats_family('equality')
+        # 線分ラベルの変数は両端のグリッドの先頭の位置 + 線分の順番 で引く．
+        l_var_list = self.__l_var_list
+        nl = len(self.__line_id_list)
+        edge_list = [(var, index1 * nl, index2 * nl)
+                     for var, (index1, index2) in zip(e_var_list, board.edge_list) if var]
+        for i in range(nl):
+            for e_var, base1, base2 in edge_list:
+                l1_var = l_var_list[base1 + i]
+                l2_var = l_var_list[base2 + i]
+                if l1_var and l2_var:
+                    add_clause(-e_var,  l1_var, -l2_var)
+                    add_clause(-e_var, -l1_var,  l2_var)
+                elif l1_var:
+                    add_clause(-e_var, -l1_var)
+                elif l2_var:
+                    add_clause(-e_var, -l2_var)
 
         # コの字制約を作る．
-        for pos in self.__gridpos_list:
-            key1 = pos, 's'
-            if key1 not in self.__e_var_dict:
-                continue
-            e1_var = self.__e_var_dict[key1]
-
-            key2 = pos, 'e'
-            if key2 not in self.__e_var_dict:
-                continue
-            e2_var = self.__e_var_dict[key2]
-
-            pos2 = pos + Position(0, 1)
-            key3 = pos2, 'e'
-            e3_var = self.__e_var_dict[key3]
-
-            pos3 = pos + Position(1, 0)
-            key4 = pos3, 's'
-            e4_var = self.__e_var_dict[key4]
-
-            # e1, e2, e3, e4 のうち3つ以上同時に true にならない．
-            self.__solver.add_clause(-e1_var, -e2_var, -e3_var         )
-            self.__solver.add_clause(-e1_var, -e2_var,          -e4_var)
-            self.__solver.add_clause(-e1_var,          -e3_var, -e4_var)
-            self.__solver.add_clause(         -e2_var, -e3_var, -e4_var)
-
-    def get_answer(self, model):
+        self.__set_stats_family('uturn')
+        for window in board.window_list:
+            e1_var, e2_var, e3_var, e4_var = [e_var_list[edge] for edge in window]
+            for var_list in ((e1_var, e2_var, e3_var),
+                             (e1_var, e2_var, e4_var),
+                             (e1_var, e3_var, e4_var),
+                             (e2_var, e3_var, e4_var)):
+                if all(var_list):
+                    add_clause([-var for var in var_list])
+
+    def get_answer(self, model, width=None, height=None):
         """解を作る．
-        :param Model model: SAT問題の解
+        :param SatModel model: SAT問題の解
+        :param int width: 解の盤面の幅(省略時はエンコードした幅)
+        :param int height: 解の盤面の高さ(省略時はエンコードした高さ)
+        SatBool3 のリストの場合は SatModel に変換する．
+        width と height は size_assumptions() で盤面を制限して
+        解いた場合に用いる．
         """
+        if not isinstance(model, SatModel):
+            model = SatModel.from_list(model)
+        # 以降は SatBool3 を介さずに値の配列を直接参照する．
+        values = model.values
 
-        ans = Answer(self.__width, self.__height)
+        if width is None:
+            width = self.__width
+        if height is None:
+            height = self.__height
+        ans = Answer(width, height)
 
         # ブロック位置を得る．
         for block_id in self.__problem.block_id_list:
-            for x in range(self.__width):
+            for x in self.__domain.x_list(block_id):
                 var = self.__block_x_var(block_id, x)
-                if model[var] == SatBool3.TRUE:
+                if values[var] == 1:
                     break
             else:
                 assert False
 
-            for y in range(self.__height):
+            for y in self.__domain.y_list(block_id):
                 var = self.__block_y_var(block_id, y)
-                if model[var] == SatBool3.TRUE:
+                if values[var] == 1:
                     break
             else:
                 assert False
@@ -321,134 +491,266 @@ class Adc2019Enc:
             ans.set_block_pos(block_id, Position(x, y))
 
         # 線分ラベルを得る．
-        # 基本的には self.__l_var_dict に入っている線分番号用の
+        # 基本的には self.__l_var_list に入っている線分番号用の
         # 変数の値を読めばよいが，SAT問題の都合上，線分でない
         # 部分にも非0の値がつくことがあるので端子間を結ぶ
         # 線分を取り出す．
+        board = self.__board
         for line_id in self.__problem.line_id_list:
             t1, t2 = self.__problem.terminals(line_id)
             (block_id1, pos1) = t1
             (block_id2, pos2) = t2
-            gpos1 = ans.block_pos(block_id1) + pos1
-            gpos2 = ans.block_pos(block_id2) + pos2
-            route = self.__get_route(model, gpos1, gpos2, line_id)
-            for pos in route:
-                key = pos, line_id
-                var = self.__l_var_dict[key]
-                assert model[var] == SatBool3.TRUE
-                ans.set_label(pos, line_id)
+            index1 = board.index(ans.block_pos(block_id1) + pos1)
+            index2 = board.index(ans.block_pos(block_id2) + pos2)
+            route = self.__get_route(values, index1, index2, line_id)
+            for index in route:
+                var = self.__line_var(index, line_id)
+                assert values[var] == 1
+                ans.set_label(board.pos_list[index], line_id)
 
         return ans
 
-    def __get_route(self, model, pos1, pos2, line_id):
-        """経路を求める．"""
-        key1 = pos1, line_id
-        var1 = self.__l_var_dict[key1]
-        assert model[var1] == SatBool3.TRUE
-
-        key2 = pos2, line_id
-        var2 = self.__l_var_dict[key2]
-        assert model[var2] == SatBool3.TRUE
+    def __get_route(self, values, index1, index2, line_id):
+        """経路を求める．
+        :param array values: SAT問題の解の値の配列
+        :param int index1, index2: 端子のグリッド番号
+        :param int line_id: 線分番号
+        :return: 経路上のグリッド番号のリストを返す．
+        """
+        assert values[self.__line_var(index1, line_id)] == 1
+        assert values[self.__line_var(index2, line_id)] == 1
 
-        pos = pos1
+        board = self.__board
+        index = index1
         route = []
-        prev_pos = None
+        prev_index = None
         while True:
-            route.append(pos)
-            if pos == pos2:
+            route.append(index)
+            if index == index2:
                 break
-            for dir in ('n', 'e', 's', 'w'):
-                key = pos, dir
-                if key not in self.__e_var_dict:
-                    continue
-                e_var = self.__e_var_dict[key]
-                if model[e_var] == SatBool3.TRUE:
-                    next_pos = pos.adjacent_pos(dir)
-                    if prev_pos is not None and next_pos == prev_pos:
+            for dir, edge in board.cell_edge_list(index):
+                e_var = self.__e_var_list[edge]
+                if e_var is not None and values[e_var] == 1:
+                    next_index = board.adjacent_index(index, dir)
+                    if next_index == prev_index:
                         continue
                     break
             else:
                 assert False
-            prev_pos = pos
-            pos = next_pos
+            prev_index = index
+            index = next_index
 
         return route
 
-    def __gen_at_most_one_constraint(self, var_list):
-        """At-Most-One 制約を作る．
-        :param list[int] var_list: 対象の変数のリスト
+    def __gen_symmetry_breaking_constraint(self):
+        """対称性を除去する制約を作る．"""
+        # 交換可能なブロックはブロック番号の順に (Y座標, X座標) の
+        # 辞書式順序で並べる．
+        # 任意の解はクラス内のブロックを入れ替えてこの順序にできる．
+        class_list = interchangeable_block_classes(self.__problem)
+        for block_class in class_list:
+            for block_id1, block_id2 in zip(block_class, block_class[1:]):
+                self.__gen_lex_constraint(block_id1, block_id2)
+
+        if self.__size_activation:
+            # 制限された盤面は最大の盤面の鏡映で自分自身に移らない．
+            return
+
+        # 盤面の鏡映で自分自身に移り，交換可能なブロックを持たないブロックを
+        # 盤面の左(上)半分に置く．
+        # 左右の鏡映を適用した後に上下の鏡映を適用しても左右の制約が
+        # 崩れないように，左右の制約を課すブロックは上下の鏡映でも
+        # 自分自身に移るものとする．
+        # 交換可能なブロックの並べ替えは最後に行うのでこれらの制約とは矛盾しない．
+        class_member_set = set()
+        for block_class in class_list:
+            class_member_set.update(block_class)
+        h_map = reflection_block_map(self.__problem, horizontal=True)
+        v_map = reflection_block_map(self.__problem, horizontal=False)
+        for block in self.__problem.block_list:
+            block_id = block.block_id
+            if h_map is None or block_id in class_member_set:
+                continue
+            if h_map[block_id] != block_id:
+                continue
+            if v_map is not None and v_map[block_id] != block_id:
+                continue
+            max_x = (self.__width - block.width) // 2
+            for x in self.__domain.x_list(block_id):
+                if x > max_x:
+                    self.__solver.add_clause(-self.__block_x_var(block_id, x))
+            break
+        for block in self.__problem.block_list:
+            block_id = block.block_id
+            if v_map is None or block_id in class_member_set:
+                continue
+            if v_map[block_id] != block_id:
+                continue
+            max_y = (self.__height - block.height) // 2
+            for y in self.__domain.y_list(block_id):
+                if y > max_y:
+                    self.__solver.add_clause(-self.__block_y_var(block_id, y))
+            break
+
+    def __gen_lex_constraint(self, block_id1, block_id2):
+        """2つのブロックの位置の辞書式順序の制約を作る．
+        :param int block_id1, block_id2: ブロック番号
+        block_id1 の (Y座標, X座標) が block_id2 のもの以下となる．
         """
-        # 単純に O(n^2) の節を作っている．
-        nv = len(var_list)
-        for i1 in range(0, nv - 1):
-            v1 = var_list[i1]
-            for i2 in range(i1 + 1, nv):
-                v2 = var_list[i2]
-                self.__solver.add_clause(-v1, -v2)
-
-    def __gen_one_hot_constraint(self, var_list):
-        """One-Hot 制約を作る．
-        :param list[int] 対象の変数のリスト
+        # lt_list[v] は block_id2 の座標が v 未満の時に True となる変数
+        # 逆方向の含意は必要ない．
+        # 配置できない座標の変数は作られていないので var_list を直接参照する．
+        def gen_lt_list(var_list, size):
+            base = self.__problem.block_index(block_id2) * size
+            lt_list = [None]
+            for v in range(1, size):
+                var = self.__solver.new_variable()
+                var2 = var_list[base + v - 1]
+                if var2 is not None:
+                    self.__solver.add_clause(-var2, var)
+                if v > 1:
+                    self.__solver.add_clause(-lt_list[v - 1], var)
+                lt_list.append(var)
+            return lt_list
+
+        # block_id1 の Y座標は block_id2 の Y座標以下
+        y_lt_list = gen_lt_list(self.__y_var_list, self.__height)
+        for y in self.__domain.y_list(block_id1):
+            if y > 0:
+                self.__solver.add_clause(-self.__block_y_var(block_id1, y), -y_lt_list[y])
+
+        # Y座標が等しい時は block_id1 の X座標は block_id2 の X座標以下
+        eq_var = self.__solver.new_variable()
+        for y in self.__domain.y_list(block_id1):
+            var2 = self.__y_var_list[self.__problem.block_index(block_id2) * self.__height + y]
+            if var2 is not None:
+                self.__solver.add_clause(-self.__block_y_var(block_id1, y), -var2, eq_var)
+        x_lt_list = gen_lt_list(self.__x_var_list, self.__width)
+        for x in self.__domain.x_list(block_id1):
+            if x > 0:
+                self.__solver.add_clause(-eq_var, -self.__block_x_var(block_id1, x), -x_lt_list[x])
+
+    def __gen_coord_vars(self, block_id, value_list, block_size, var_array, size,
+                         add_cut_clause):
+        """ブロックの座標を表す変数を作る．
+        :param int block_id: ブロック番号
+        :param list[int] value_list: 配置可能な座標のリスト(昇順)
+        :param int block_size: ブロックの幅(高さ)
+        :param list var_array: ブロックリスト中の位置 * size + 座標 の位置に変数を持つリスト
+        :param int size: 盤面の幅(高さ)
+        :param add_cut_clause: 盤面の制限に関する節を作る関数
         """
+        # 座標ごとの変数を作る．
+        base = self.__problem.block_index(block_id) * size
+        var_list = []
+        for v in value_list:
+            var = self.__solver.new_variable()
+            var_array[base + v] = var
+            var_list.append(var)
+
+        if not var_list:
+            # どこにも置けない．
+            self.__solver.add_clause([])
+            return
+
+        # One-Hot 符号化を用いる．
+        self.__amo_encoder_dict['block'].gen_one_hot(var_list)
+        for v, var in zip(value_list, var_list):
+            # 盤面が端の座標以下に制限されている時は置けない．
+            add_cut_clause(v + block_size - 1, -var)
+
+    def __add_x_cut_clause(self, x, lit):
+        """幅が x 以下に制限されている時に lit が成り立つという節を作る．
+        :param int x: X座標
+        :param int lit: リテラル
+        size_activation が False の時と x が 0 の時は何もしない．
+        """
+        if self.__size_activation and x > 0:
+            self.__solver.add_clause(-self.__x_cut_var_list[x], lit)
 
-        # 2つの変数が同時に True にならないという制約
-        self.__gen_at_most_one_constraint(var_list)
-
-        # 最低1つの変数が True になるという制約
-        self.__solver.add_clause(var_list)
-
-    def __gen_one_hot_constraints_with_cond(self, var_list, cond):
-        """条件付きの One-Hot 制約を作る．
-        :param list[int] var_list: 対象の変数のリスト
-        :param int cond: 条件となるリテラル
+    def __add_y_cut_clause(self, y, lit):
+        """高さが y 以下に制限されている時に lit が成り立つという節を作る．
+        :param int y: Y座標
+        :param int lit: リテラル
+        size_activation が False の時と y が 0 の時は何もしない．
         """
-        # 単純に O(n^2) の節を作っている．
-        nv = len(var_list)
-        for i1 in range(0, nv - 1):
-            v1 = var_list[i1]
-            for i2 in range(i1 + 1, nv):
-                v2 = var_list[i2]
-                self.__solver.add_clause(-cond, -v1, -v2)
-        self.__solver.add_clause(-cond, var_list)
+        if self.__size_activation and y > 0:
+            self.__solver.add_clause(-self.__y_cut_var_list[y], lit)
 
     def __gen_zero_or_two_hot_constraints_with_cond(self, var_list, cond):
         """条件付きの 0 or 2 Hot 制約を作る．
         :param list[int] var_list: 対象の変数のリスト
-        :param int cond: 条件となるリテラル
+        :param int cond: 条件となるリテラル(None の時は無条件)
         """
         # たかだか4つなので全てのパタンを列挙する．
         # 対称性があるのでわかりやすい．
+        # 各節の先頭に置くリテラルのリスト
+        pre = [] if cond is None else [-cond]
         nv = len(var_list)
-        if nv < 2:
-            assert False
+        if nv == 0:
+            pass
+        elif nv == 1:
+            # 配線領域の外側の枝が作られなかった場合．
+            # 1つだけ True となるパタンを禁止する．
+            v1, = var_list
+            self.__solver.add_clause(pre, -v1)
         elif nv == 2:
             # どちらか一方だけ True のパタンを禁止する．
             v1, v2 = var_list
-            self.__solver.add_clause(-cond, -v1,  v2)
-            self.__solver.add_clause(-cond,  v1, -v2)
+            self.__solver.add_clause(pre, -v1,  v2)
+            self.__solver.add_clause(pre,  v1, -v2)
         elif nv == 3:
             v1, v2, v3 = var_list
             # 一つの変数のみ True となるパタンを禁止する．
-            self.__solver.add_clause(-cond, -v1,  v2,  v3)
-            self.__solver.add_clause(-cond,  v1, -v2,  v3)
-            self.__solver.add_clause(-cond,  v1,  v2, -v3)
+            self.__solver.add_clause(pre, -v1,  v2,  v3)
+            self.__solver.add_clause(pre,  v1, -v2,  v3)
+            self.__solver.add_clause(pre,  v1,  v2, -v3)
             # 3つの変数が True となるパタンを禁止する．
-            self.__solver.add_clause(-cond, -v1, -v2, -v3)
+            self.__solver.add_clause(pre, -v1, -v2, -v3)
         elif nv == 4:
             v1, v2, v3, v4 = var_list
             # 一つの変数のみ True となるパタンを禁止する．
-            self.__solver.add_clause(-cond, -v1,  v2,  v3,  v4)
-            self.__solver.add_clause(-cond,  v1, -v2,  v3,  v4)
-            self.__solver.add_clause(-cond,  v1,  v2, -v3,  v4)
-            self.__solver.add_clause(-cond,  v1,  v2,  v3, -v4)
+            self.__solver.add_clause(pre, -v1,  v2,  v3,  v4)
+            self.__solver.add_clause(pre,  v1, -v2,  v3,  v4)
+            self.__solver.add_clause(pre,  v1,  v2, -v3,  v4)
+            self.__solver.add_clause(pre,  v1,  v2,  v3, -v4)
             # 3つ以上の変数が True となるパタンを禁止する．
-            self.__solver.add_clause(-cond, -v1, -v2, -v3     )
-            self.__solver.add_clause(-cond, -v1, -v2,      -v4)
-            self.__solver.add_clause(-cond, -v1,      -v3, -v4)
-            self.__solver.add_clause(-cond,      -v2, -v3, -v4)
+            self.__solver.add_clause(pre, -v1, -v2, -v3     )
+            self.__solver.add_clause(pre, -v1, -v2,      -v4)
+            self.__solver.add_clause(pre, -v1,      -v3, -v4)
+            self.__solver.add_clause(pre,      -v2, -v3, -v4)
         else:
             assert False
 
+    def __set_stats_family(self, family):
+        """統計情報を記録する制約の種類を切り替える．
+        :param str family: 制約の種類(None の時は記録を終える)
+        collect_stats=False の時は何もしない．
+        """
+        if self.__stats is None:
+            return
+        now = time.perf_counter()
+        if self.__stats_family is not None:
+            stats = self.__stats[self.__stats_family]
+            for key, value in self.__solver.pop_counts().items():
+                stats[key] += value
+            stats['time'] += now - self.__stats_start
+        else:
+            # 他の制約の種類の間に作られた変数と節は数えない．
+            self.__solver.pop_counts()
+        self.__stats_family = family
+        self.__stats_start = now
+
+    def __is_routable_edge(self, pos1, pos2):
+        """pos1 と pos2 の両方を配線領域に含む線分がある時 True を返す．
+        :param Position pos1, pos2: グリッドの位置
+        """
+        for line_id in self.__line_id_list:
+            if self.__domain.is_routable(pos1, line_id) and \
+               self.__domain.is_routable(pos2, line_id):
+                return True
+        return False
+
     def __block_x_var(self, block_id, x):
         """ブロックのX座標を表す変数を返す．
         :param int block_id: ブロック番号
@@ -456,8 +758,7 @@ class Adc2019Enc:
         :return: 対象の変数(SatLiteral)を返す．
         この変数が True の時，このブロックのX座標はxとなっている．
         """
-        key = block_id, x
-        return self.__x_var_dict[key]
+        return self.__x_var_list[self.__problem.block_index(block_id) * self.__width + x]
 
     def __block_y_var(self, block_id, y):
         """ブロックのY座標を表す変数を返す．
@@ -466,43 +767,126 @@ class Adc2019Enc:
         :return: 対象の変数(SatLiteral)を返す．
         この変数が True の時，このブロックのY座標はyとなっている．
         """
-        key = block_id, y
-        return self.__y_var_dict[key]
+        return self.__y_var_list[self.__problem.block_index(block_id) * self.__height + y]
 
-    def __grid_var(self, pos, block_id):
+    def __grid_var(self, index, block_id):
         """グリッドのブロック番号を表す変数を返す．
-        :param Position pos: グリッドの位置
+        :param int index: グリッド番号
         :param int block_id: ブロック番号
         :return: 対象の変数(SatLiteral)を返す．
         この変数が True の時，このグリッドは block_id のブロックに使用されている．
         """
-        key = pos, block_id
-        return self.__g_var_dict[key]
+        return self.__g_var_list[index * self.__problem.block_num
+                                 + self.__problem.block_index(block_id)]
 
-    def __line_var(self, pos, line_id):
+    def __line_var(self, index, line_id):
         """グリッドの線分番号を表す変数を返す．
-        :param Position pos: グリッドの位置
+        :param int index: グリッド番号
         :param int line_id: 線分番号
         :return: 対象の変数(SatLiteral)を返す．
         この変数が True の時，このグリッドは line_id の線分に使用されている．
+        配線領域に含まれない場合は None を返す．
         """
-        key = pos, line_id
-        return self.__l_var_dict[key]
+        nl = len(self.__line_id_list)
+        return self.__l_var_list[index * nl + self.__line_pos_dict[line_id]]
 
 
-def solve_adc2019(problem, width, height, satprog):
+class _StatsSolver:
+    """作られた変数と節を数えるために SAT ソルバを包むクラス
+    :param solver: SAT ソルバ
+    Adc2019Enc の用いる new_variable() と add_clause() のみを持つ．
+    """
+
+    def __init__(self, solver):
+        self.__solver = solver
+        self.__vars = 0
+        self.__clauses = 0
+        self.__literals = 0
+
+    def new_variable(self):
+        """変数を作る．"""
+        self.__vars += 1
+        return self.__solver.new_variable()
+
+    def add_clause(self, *args):
+        """節を追加する．"""
+        self.__clauses += 1
+        for arg in args:
+            self.__literals += 1 if isinstance(arg, int) else len(arg)
+        self.__solver.add_clause(*args)
+
+    def pop_counts(self):
+        """前回の呼び出しから数えた値を返してリセットする．
+        :return: 'vars', 'clauses', 'literals' をキーとする辞書を返す．
+        """
+        counts = {'vars': self.__vars, 'clauses': self.__clauses,
+                  'literals': self.__literals}
+        self.__vars = 0
+        self.__clauses = 0
+        self.__literals = 0
+        return counts
+
+
+def solve_adc2019(problem, width, height, satprog, *, stream=False, pipe=False,
+                  time_limit=None, conflict_limit=None, portfolio_stats=None,
+                  cache=None, simplify=False, stats_out=None, enc_options=None,
+                  enc_stats=False):
     """ADC2019 問題を解く
     :param Problem problem: 問題
     :param int width: 幅
     :param int height: 高さ
+    :param str satprog: SATソルバのプログラム名(リストの場合はポートフォリオ)
+    :param bool stream: SatSolver をストリーミングモードにする時 True にする．
+    :param bool pipe: SatSolver をパイプモードにする時 True にする．
+    :param float time_limit: SAT ソルバの時間の上限(秒)
+    :param int conflict_limit: SAT ソルバの衝突回数の上限
+    :param str portfolio_stats: ポートフォリオの統計情報のファイル名
+    :param Adc2019Cache cache: 結果のキャッシュ
+    :param bool simplify: CNF を簡単化してから SAT ソルバに渡す時 True にする．
+    現在の Adc2019Enc の生成する CNF は簡単化しても小さくならない．
+    :param FILE stats_out: 統計情報の出力先(None の時は出力しない)
+    :param dict enc_options: Adc2019Enc に渡すキーワード引数(amo_encoding など)
+    :param bool enc_stats: エンコードの統計情報を stats_out に出力する時 True にする．
+    :return: (stat, ans) を返す．
+    - stat は SatBool3
+      解けなかった(UNSAT)場合は SatBool3.FALSE，
+      上限に達して判定できなかった場合は SatBool3.X となる．
+    - ans は Answer (stat が SatBool3.TRUE 以外の時は None)
     problem の幅と高さではなく
     与えられた幅と高さの盤面で
     答を求める．
+    satprog に 'cdcl' を指定すると外部プログラムを用いずに
+    組み込みの CdclSolver で解く．
+    satprog に複数のコマンド行のリストを指定すると
+    PortfolioSolver を用いて並列に解く．
+    cache が指定された場合は以前の結果があればそれを返し，
+    なければ解いた結果を保存する．
+    Adc2019Bounds の下界で明らかに解がない場合はエンコードせずに
+    SatBool3.FALSE を返す．その場合は用いた下界を stats_out に出力する．
     """
 
-    solver = SatSolver(satprog)
+    bound = Adc2019Bounds(problem).check(width, height)
+    if bound is not None:
+        if stats_out is not None:
+            stats_out.write(f'{width} x {height}: UNSAT by the {bound} bound\n')
+        return SatBool3.FALSE, None
+
+    if cache is not None:
+        result = cache.lookup(problem, width, height, enc_options)
+        if result is not None:
+            return result
+
+    base_solver = new_solver(satprog, stream=stream, pipe=pipe,
+                             portfolio_stats=portfolio_stats)
+    if simplify:
+        solver = CnfSimplifier(base_solver)
+    else:
+        solver = base_solver
 
-    enc = Adc2019Enc(solver, problem, width, height)
+    if enc_options is None:
+        enc_options = dict()
+    enc = Adc2019Enc(solver, problem, width, height, collect_stats=enc_stats,
+                     **enc_options)
 
     # 配置制約を作る．
     enc.gen_placement_constraint()
@@ -510,13 +894,24 @@ def solve_adc2019(problem, width, height, satprog):
     # 配線制約を作る．
     enc.gen_routing_constraint()
 
+    if enc_stats and stats_out is not None:
+        enc.print_stats(stats_out)
+
     # SAT問題を解く
-    stat, model = solver.solve()
+    stat, model = solver.solve(time_limit=time_limit,
+                               conflict_limit=conflict_limit)
 
+    if simplify and stats_out is not None:
+        solver.print_stats(stats_out)
+
+    ans = None
     if stat == SatBool3.TRUE:
         # 答を作る．
         ans = enc.get_answer(model)
-        return ans
-    else:
-        print('UNSAT')
-        return None
+
+    if cache is not None:
+        # 簡単化した場合は簡単化後の CNF を保存する．
+        cache.store(problem, width, height, stat, ans, solver=base_solver,
+                    enc_options=enc_options)
+
+    return stat, ans
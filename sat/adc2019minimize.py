@@ -0,0 +1,384 @@
+#! /usr/bin/env python3
+
+"""ADC2019 の問題の最小の盤面を求めるプログラム
+:file: adc2019minimize.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import os
+import signal
+import sys
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+
+from sat.satbool3 import SatBool3
+from sat.adc2019enc import Adc2019Enc, solve_adc2019
+from sat.solverfactory import new_solver
+from sat.cnfsimplifier import CnfSimplifier
+from sat.adc2019bounds import Adc2019Bounds, BOUND_LIST
+
+
+# 未確定
+_UNDEF = 0
+# 配置配線可能
+_SAT = 1
+# 配置配線不可能
+_UNSAT = 2
+# 上限に達するなどして判定できなかった
+_UNKNOWN = 3
+
+
+class Probe:
+    """1回の試行(ある大きさの盤面で solve_adc2019() を呼んだ結果)を表すクラス
+    :param int width: 幅
+    :param int height: 高さ
+    :param str result: 結果
+    - 'SAT'       : 解が見つかった
+    - 'UNSAT'     : 解がないことがわかった
+    - 'UNKNOWN'   : 上限に達して判定できなかった
+    - 'CANCELLED' : 他の試行の結果から不要になったので中断した
+    - 'ERROR'     : 試行のプロセスが異常終了した
+    :param float time: 実行時間(秒)
+    """
+
+    def __init__(self, width, height, result, time):
+        self.__width = width
+        self.__height = height
+        self.__result = result
+        self.__time = time
+
+    @property
+    def width(self):
+        """幅を返す．"""
+        return self.__width
+
+    @property
+    def height(self):
+        """高さを返す．"""
+        return self.__height
+
+    @property
+    def area(self):
+        """面積を返す．"""
+        return self.__width * self.__height
+
+    @property
+    def result(self):
+        """結果を返す．"""
+        return self.__result
+
+    @property
+    def time(self):
+        """実行時間を返す．"""
+        return self.__time
+
+
+def candidate_list(problem, max_width, max_height, *, skip_dict=None):
+    """盤面の大きさの候補のリストを作る．
+    :param Problem problem: 問題
+    :param int max_width: 幅の上限
+    :param int max_height: 高さの上限
+    :param dict skip_dict: 除いた候補の数を記録する辞書
+    下界の種類(BOUND_LIST)をキーとして除いた候補の数を加える．
+    :return: (幅, 高さ) のリストを面積の小さい順に返す．
+    面積が等しい場合は正方形に近い順とする．
+    Adc2019Bounds の下界で明らかに配置できないものは除く．
+    """
+    bounds = Adc2019Bounds(problem)
+    ans_list = []
+    for w in range(1, max_width + 1):
+        for h in range(1, max_height + 1):
+            bound = bounds.check(w, h)
+            if bound is None:
+                ans_list.append((w, h))
+            elif skip_dict is not None:
+                skip_dict[bound] = skip_dict.get(bound, 0) + 1
+    ans_list.sort(key=lambda x: (x[0] * x[1], abs(x[0] - x[1]), x))
+    return ans_list
+
+
+def minimize_adc2019(problem, satprog, *, jobs=None,
+                     max_width=None, max_height=None, log_out=None, **kwargs):
+    """配置配線可能な最小面積の盤面を求める．
+    :param Problem problem: 問題
+    :param str satprog: SATソルバのプログラム名
+    :param int jobs: 同時に実行する試行の数(省略時は CPU 数)
+    :param int max_width: 幅の上限(省略時は問題の最大幅)
+    :param int max_height: 高さの上限(省略時は問題の最大高さ)
+    :param FILE log_out: 試行が終わるたびに結果を出力する先
+    :return: (ans, probe_list) を返す．
+    - ans は見つかった最小面積の解(Answer)．見つからなかった場合は None
+    - probe_list は試行(Probe)のリスト(終わった順)
+    その他のキーワード引数はそのまま solve_adc2019() に渡す．
+
+    候補の盤面を面積の小さい順に子プロセスで並列に試す．
+    (w, h) で解が見つかればそれを含む大きな盤面でも解があり，
+    (w, h) で解がなければそれに含まれる小さな盤面でも解はない
+    という単調性を用いて結果のわかっている候補は試さない．
+    他の試行の結果から不要になった試行は中断する．
+    試行が UNKNOWN の場合はその候補を確定できないので
+    返される解が最小とは限らない(probe_list から判断できる)．
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if max_width is None:
+        max_width = problem.max_width
+    if max_height is None:
+        max_height = problem.max_height
+
+    cand_list = _gen_candidate_list(problem, max_width, max_height, log_out)
+    state_list = [_UNDEF for _ in cand_list]
+    best_ans = None
+    best_area = None
+    probe_list = []
+    # 実行中の試行の辞書
+    # キーは受信用の Connection，値は (候補番号, Process, 開始時刻)
+    running_dict = {}
+
+    def is_needed(index):
+        """index 番目の候補を試す必要がある時 True を返す．"""
+        if state_list[index] != _UNDEF:
+            return False
+        w, h = cand_list[index]
+        return best_area is None or w * h < best_area
+
+    def add_probe(index, result, start):
+        w, h = cand_list[index]
+        probe = Probe(w, h, result, time.perf_counter() - start)
+        probe_list.append(probe)
+        if log_out is not None:
+            log_out.write(f'{w:4d} x {h:4d}: {result:9s} {probe.time:10.2f}s\n')
+            log_out.flush()
+
+    try:
+        while True:
+            # 空いている分だけ面積の小さい候補から試行を始める．
+            while len(running_dict) < jobs:
+                running_set = set(index for index, _, _ in running_dict.values())
+                index = next((i for i in range(len(cand_list))
+                              if i not in running_set and is_needed(i)), None)
+                if index is None:
+                    break
+                w, h = cand_list[index]
+                recv_conn, send_conn = Pipe(duplex=False)
+                proc = Process(target=_probe_main,
+                               args=(send_conn, problem, w, h, satprog, kwargs))
+                proc.start()
+                send_conn.close()
+                running_dict[recv_conn] = index, proc, time.perf_counter()
+
+            if not running_dict:
+                break
+
+            # いずれかの試行が終わるのを待つ．
+            for conn in wait(list(running_dict.keys())):
+                index, proc, start = running_dict.pop(conn)
+                try:
+                    stat, ans = conn.recv()
+                except EOFError:
+                    stat, ans = None, None
+                conn.close()
+                proc.join()
+                if stat is None:
+                    add_probe(index, 'ERROR', start)
+                    state_list[index] = _UNKNOWN
+                elif stat == SatBool3.TRUE:
+                    add_probe(index, 'SAT', start)
+                    _propagate(cand_list, state_list, index, _SAT)
+                    w, h = cand_list[index]
+                    if best_area is None or w * h < best_area:
+                        best_area = w * h
+                        best_ans = ans
+                elif stat == SatBool3.FALSE:
+                    add_probe(index, 'UNSAT', start)
+                    _propagate(cand_list, state_list, index, _UNSAT)
+                else:
+                    add_probe(index, 'UNKNOWN', start)
+                    state_list[index] = _UNKNOWN
+
+            # 不要になった試行を中断する．
+            # 中断された試行の結果は他の試行の結果から決まっているか，
+            # すでに見つかった解よりも大きいので不要である．
+            for conn, (index, proc, start) in list(running_dict.items()):
+                w, h = cand_list[index]
+                if state_list[index] == _UNDEF and \
+                   (best_area is None or w * h < best_area):
+                    continue
+                del running_dict[conn]
+                proc.terminate()
+                proc.join()
+                conn.close()
+                add_probe(index, 'CANCELLED', start)
+    finally:
+        for conn, (index, proc, start) in running_dict.items():
+            proc.terminate()
+            proc.join()
+            conn.close()
+
+    return best_ans, probe_list
+
+
+def minimize_adc2019_incremental(problem, satprog, *,
+                                 max_width=None, max_height=None, log_out=None,
+                                 stream=False, pipe=False,
+                                 time_limit=None, conflict_limit=None,
+                                 portfolio_stats=None, simplify=False, stats_out=None,
+                                 enc_options=None, enc_stats=False):
+    """1つの CNF を用いて配置配線可能な最小面積の盤面を求める．
+    :param Problem problem: 問題
+    :param str satprog: SATソルバのプログラム名
+    :param int max_width: 幅の上限(省略時は問題の最大幅)
+    :param int max_height: 高さの上限(省略時は問題の最大高さ)
+    :param FILE log_out: 試行が終わるたびに結果を出力する先
+    :return: (ans, probe_list) を返す．
+    返り値は minimize_adc2019() と同じ
+    その他のキーワード引数の意味は solve_adc2019() と同じ
+
+    最大の盤面で size_activation=True として1度だけエンコードし，
+    候補の盤面を size_assumptions() の仮定で指定して面積の小さい順に解く．
+    'cdcl' や 'cdcl-child' のようにインクリメンタルに解ける
+    SAT ソルバの場合は学習節が次の試行でも用いられる．
+    外部プログラムの場合は毎回 CNF を書き出して解き直すが
+    エンコードは1度で済む．
+    試行は逐次的に行うので jobs と cache は用いない．
+    """
+    if max_width is None:
+        max_width = problem.max_width
+    if max_height is None:
+        max_height = problem.max_height
+
+    cand_list = _gen_candidate_list(problem, max_width, max_height, log_out)
+    state_list = [_UNDEF for _ in cand_list]
+    best_ans = None
+    best_area = None
+    probe_list = []
+
+    solver = new_solver(satprog, stream=stream, pipe=pipe,
+                        portfolio_stats=portfolio_stats)
+    if simplify:
+        solver = CnfSimplifier(solver)
+
+    if enc_options is None:
+        enc_options = dict()
+    enc = Adc2019Enc(solver, problem, max_width, max_height, size_activation=True,
+                     collect_stats=enc_stats, **enc_options)
+    enc.gen_placement_constraint()
+    enc.gen_routing_constraint()
+    if enc_stats and stats_out is not None:
+        enc.print_stats(stats_out)
+
+    for index, (w, h) in enumerate(cand_list):
+        if state_list[index] != _UNDEF:
+            continue
+        if best_area is not None and w * h >= best_area:
+            break
+        start = time.perf_counter()
+        stat, model = solver.solve(enc.size_assumptions(w, h),
+                                   time_limit=time_limit,
+                                   conflict_limit=conflict_limit)
+        if stat == SatBool3.TRUE:
+            result = 'SAT'
+            _propagate(cand_list, state_list, index, _SAT)
+            best_area = w * h
+            best_ans = enc.get_answer(model, w, h)
+        elif stat == SatBool3.FALSE:
+            result = 'UNSAT'
+            _propagate(cand_list, state_list, index, _UNSAT)
+        else:
+            result = 'UNKNOWN'
+            state_list[index] = _UNKNOWN
+        probe = Probe(w, h, result, time.perf_counter() - start)
+        probe_list.append(probe)
+        if log_out is not None:
+            log_out.write(f'{w:4d} x {h:4d}: {result:9s} {probe.time:10.2f}s\n')
+            log_out.flush()
+
+    if simplify and stats_out is not None:
+        solver.print_stats(stats_out)
+
+    return best_ans, probe_list
+
+
+def is_optimal(ans, probe_list):
+    """minimize_adc2019() の結果が最小であることが保証されている時 True を返す．
+    :param Answer ans: 解
+    :param list[Probe] probe_list: 試行のリスト
+    解よりも小さな面積で UNKNOWN もしくは ERROR となった試行がなければ最小である．
+    ans が None の場合は上限までの全ての盤面で解がないことが
+    保証されている時 True を返す．
+    """
+    area = None if ans is None else ans.width * ans.height
+    for probe in probe_list:
+        if probe.result in ('UNKNOWN', 'ERROR') and \
+           (area is None or probe.area < area):
+            return False
+    return True
+
+
+def print_probe_list(probe_list, fout=sys.stdout):
+    """試行のリストを出力する．
+    :param list[Probe] probe_list: 試行のリスト
+    :param FILE fout: 出力先のファイルオブジェクト
+    """
+    total_time = 0.0
+    for probe in probe_list:
+        fout.write(f'{probe.width:4d} x {probe.height:4d}: {probe.result:9s} {probe.time:10.2f}s\n')
+        total_time += probe.time
+    fout.write(f'{len(probe_list)} probes, {total_time:.2f}s in total\n')
+
+
+def _gen_candidate_list(problem, max_width, max_height, log_out):
+    """候補のリストを作り，下界で除いた候補の数を log_out に出力する．
+    :param Problem problem: 問題
+    :param int max_width: 幅の上限
+    :param int max_height: 高さの上限
+    :param FILE log_out: 出力先(None の時は出力しない)
+    """
+    skip_dict = dict()
+    cand_list = candidate_list(problem, max_width, max_height, skip_dict=skip_dict)
+    if log_out is not None and skip_dict:
+        skip_str = ', '.join(f'{bound}: {skip_dict[bound]}'
+                             for bound in BOUND_LIST if bound in skip_dict)
+        log_out.write(f'{sum(skip_dict.values())} sizes skipped by bounds ({skip_str})\n')
+        log_out.flush()
+    return cand_list
+
+
+def _propagate(cand_list, state_list, index, state):
+    """単調性を用いて結果を他の候補に伝搬させる．
+    :param list[tuple[int, int]] cand_list: 候補のリスト
+    :param list[int] state_list: 各候補の状態のリスト
+    :param int index: 結果のわかった候補の番号
+    :param int state: 結果(_SAT もしくは _UNSAT)
+    """
+    w0, h0 = cand_list[index]
+    state_list[index] = state
+    for i, (w, h) in enumerate(cand_list):
+        if state_list[i] != _UNDEF:
+            continue
+        if state == _SAT and w >= w0 and h >= h0:
+            state_list[i] = _SAT
+        elif state == _UNSAT and w <= w0 and h <= h0:
+            state_list[i] = _UNSAT
+
+
+def _probe_main(conn, problem, width, height, satprog, kwargs):
+    """子プロセスで1回の試行を行う．
+    :param Connection conn: 結果を送る Connection
+    結果として solve_adc2019() の返り値を送る．
+    """
+    # terminate() で中断された時に SAT ソルバのプロセスも
+    # 終了させられるように SIGTERM を例外(SystemExit)にする．
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    result = solve_adc2019(problem, width, height, satprog, **kwargs)
+    conn.send(result)
+    conn.close()
+
+
+def _exit_on_sigterm(signum, frame):
+    """SIGTERM のハンドラ"""
+    sys.exit(1)
@@ -0,0 +1,162 @@
+#! /usr/bin/env python3
+
+"""ADC2019 の問題の対称性を調べる関数群
+:file: adc2019sym.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+ここでの対称性とは問題の自己同型，つまりブロックの置換 π と
+線分番号の置換 σ の組で，ある解に適用すると別の解になるものを指す．
+- 交換可能なブロック: 形状が等しく，互いに入れ替えても
+  (線分番号を付け替えれば)同じ問題になるブロック
+- 盤面の鏡映: 全てのブロックを左右(上下)反転させたものが
+  (ブロックと線分番号を付け替えれば)元の問題と一致する場合
+"""
+
+from core.position import Position
+
+
+# 鏡映の自己同型を探す時の探索の上限
+MAX_SEARCH_STEPS = 10000
+
+
+def interchangeable_block_classes(problem):
+    """交換可能なブロックのクラスを求める．
+    :param Problem problem: 問題
+    :return: ブロック番号のリストのリストを返す．
+    各リストは2つ以上のブロックを含み，ブロック番号の昇順に並んでいる．
+    同じクラスのどの2つのブロックを入れ替えても解は解のままとなる．
+    """
+    class_list = []
+    for block in problem.block_list:
+        for block_class in class_list:
+            # 代表との互換が自己同型ならばクラスの他の要素との互換も自己同型となる．
+            if _is_swappable(problem, problem.block(block_class[0]), block):
+                block_class.append(block.block_id)
+                break
+        else:
+            class_list.append([block.block_id])
+    return [block_class for block_class in class_list if len(block_class) > 1]
+
+
+def reflection_block_map(problem, *, horizontal):
+    """盤面の鏡映が自己同型となるようなブロックの対応を求める．
+    :param Problem problem: 問題
+    :param bool horizontal: 左右反転の時 True, 上下反転の時 False にする．
+    :return: ブロック番号をキーとして反転後のブロック番号を値とする辞書を返す．
+    鏡映が自己同型とならない(もしくは探索の上限に達した)場合は None を返す．
+    """
+    def mirror(block, pos):
+        if horizontal:
+            return Position(block.width - 1 - pos.x, pos.y)
+        else:
+            return Position(pos.x, block.height - 1 - pos.y)
+
+    block_list = problem.block_list
+    # 反転させたブロックの形状と端子の位置に一致するブロックを候補とする．
+    signature_list = [_signature(block1, block1.shape, lambda pos: pos)
+                      for block1 in block_list]
+    cand_list_list = []
+    for block in block_list:
+        signature = _signature(block, block.shape.mirror(horizontal),
+                               lambda pos: mirror(block, pos))
+        cand_list = [block1.block_id for block1, signature1 in zip(block_list, signature_list)
+                     if signature1 == signature]
+        if not cand_list:
+            return None
+        cand_list_list.append(cand_list)
+
+    block_map = dict()
+    line_map = dict()
+    used = set()
+    steps = 0
+
+    def search(index):
+        nonlocal steps
+        steps += 1
+        if steps > MAX_SEARCH_STEPS:
+            return False
+        if index == len(block_list):
+            return True
+        block = block_list[index]
+        for block_id1 in cand_list_list[index]:
+            if block_id1 in used:
+                continue
+            block1 = problem.block(block_id1)
+            new_line_map = dict(line_map)
+            for pos, label in block.pos_label_list:
+                label1 = block1.label(mirror(block, pos))
+                if not _extend_line_map(new_line_map, label, label1):
+                    break
+            else:
+                saved_line_map = dict(line_map)
+                line_map.clear()
+                line_map.update(new_line_map)
+                block_map[block.block_id] = block_id1
+                used.add(block_id1)
+                if search(index + 1):
+                    return True
+                used.discard(block_id1)
+                del block_map[block.block_id]
+                line_map.clear()
+                line_map.update(saved_line_map)
+        return False
+
+    if not search(0):
+        return None
+    return block_map
+
+
+def _is_swappable(problem, block1, block2):
+    """2つのブロックの互換が自己同型となる時 True を返す．
+    :param Problem problem: 問題
+    :param Block block1, block2: 対象のブロック
+    """
+    if block1.shape is not block2.shape:
+        return False
+    if _signature(block1, block1.shape, lambda pos: pos) != \
+       _signature(block2, block2.shape, lambda pos: pos):
+        return False
+    line_map = dict()
+    for pos, label1 in block1.pos_label_list:
+        label2 = block2.label(pos)
+        if not _extend_line_map(line_map, label1, label2):
+            return False
+        if not _extend_line_map(line_map, label2, label1):
+            return False
+    # それ以外のブロックの線分番号は変わらない．
+    for block in problem.block_list:
+        if block.block_id in (block1.block_id, block2.block_id):
+            continue
+        for pos, label in block.pos_label_list:
+            if not _extend_line_map(line_map, label, label):
+                return False
+    return True
+
+
+def _signature(block, shape, transform):
+    """ブロックの形状と端子の位置を表す値を返す．
+    :param Block block: 対象のブロック
+    :param Shape shape: ブロックの形状を transform で変換した形状
+    :param transform: 位置の変換を行う関数
+    形状は形状番号で表す．線分番号は無視する．
+    """
+    label_pos_list = sorted((pos.x, pos.y) for pos in
+                            (transform(pos) for pos, _ in block.pos_label_list))
+    return shape.shape_id, tuple(label_pos_list)
+
+
+def _extend_line_map(line_map, label1, label2):
+    """線分番号の対応に label1 -> label2 を加える．
+    :param dict line_map: 線分番号の対応を表す辞書
+    :param int label1, label2: 線分番号
+    :return: 矛盾なく加えられた時 True を返す．
+    """
+    if label1 in line_map:
+        return line_map[label1] == label2
+    if label2 in line_map.values():
+        return False
+    line_map[label1] = label2
+    return True
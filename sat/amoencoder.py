@@ -0,0 +1,175 @@
+#! /usr/bin/env python3
+
+"""At-Most-One/One-Hot 制約の符号化を行うクラス
+:file: amoencoder.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import math
+
+
+# 符号化方法の名前のリスト
+# - 'pairwise'   : 全ての変数対に対して節を作る．補助変数は用いない．O(n^2) 節
+# - 'seqcounter' : 逐次カウンタ(Sinz)．n - 1 個の補助変数と 3n 程度の節
+# - 'commander'  : コマンダー符号化(Klieber & Kwon)．3個ずつのグループに分けて再帰する．
+# - 'product'    : 積符号化(Chen)．変数を2次元に並べて行と列で再帰する．
+# - 'binary'     : 二進符号化．log2(n) 個の補助変数と n log2(n) 個の節
+# - 'bimander'   : バイマンダー符号化(Hölldobler & Nguyen)．
+#                  2個ずつのグループの番号を二進符号化する．
+AMO_METHOD_LIST = ('pairwise', 'seqcounter', 'commander', 'product', 'binary', 'bimander')
+
+# この個数以下の変数は常に pairwise で符号化する．
+PAIRWISE_THRESHOLD = 3
+
+# commander 符号化のグループの大きさ
+COMMANDER_GROUP_SIZE = 3
+
+# bimander 符号化のグループの大きさ
+BIMANDER_GROUP_SIZE = 2
+
+
+class AmoEncoder:
+    """At-Most-One/One-Hot 制約の符号化を行うクラス
+    :param Solver solver: SATソルバ
+    :param str method: 符号化方法(AMO_METHOD_LIST のいずれか)
+
+    どの方法でも変数の個数が PAIRWISE_THRESHOLD 以下の場合は
+    pairwise で符号化する．
+    cond を指定した場合は全ての節に -cond を加えるので，
+    cond が False の時は制約は課されない．
+    """
+
+    def __init__(self, solver, method='pairwise'):
+        if method not in AMO_METHOD_LIST:
+            raise ValueError(f'{method}: unknown at-most-one encoding')
+        self.__solver = solver
+        self.__method = method
+
+    @property
+    def method(self):
+        """符号化方法を返す．"""
+        return self.__method
+
+    def gen_at_most_one(self, var_list, cond=None):
+        """At-Most-One 制約を作る．
+        :param list[int] var_list: 対象の変数のリスト
+        :param int cond: 条件となるリテラル(省略時は無条件)
+        """
+        var_list = list(var_list)
+        if len(var_list) <= PAIRWISE_THRESHOLD or self.__method == 'pairwise':
+            self.__gen_pairwise(var_list, cond)
+        elif self.__method == 'seqcounter':
+            self.__gen_seqcounter(var_list, cond)
+        elif self.__method == 'commander':
+            self.__gen_commander(var_list, cond)
+        elif self.__method == 'product':
+            self.__gen_product(var_list, cond)
+        elif self.__method == 'binary':
+            self.__gen_bimander(var_list, cond, 1)
+        elif self.__method == 'bimander':
+            self.__gen_bimander(var_list, cond, BIMANDER_GROUP_SIZE)
+        else:
+            assert False
+
+    def gen_one_hot(self, var_list, cond=None):
+        """One-Hot 制約を作る．
+        :param list[int] var_list: 対象の変数のリスト
+        :param int cond: 条件となるリテラル(省略時は無条件)
+        """
+        var_list = list(var_list)
+
+        # 2つの変数が同時に True にならないという制約
+        self.gen_at_most_one(var_list, cond)
+
+        # 最低1つの変数が True になるという制約
+        self.__add_clause(cond, *var_list)
+
+    def __gen_pairwise(self, var_list, cond):
+        """pairwise 符号化を行う．"""
+        # 単純に O(n^2) の節を作っている．
+        nv = len(var_list)
+        for i1 in range(0, nv - 1):
+            v1 = var_list[i1]
+            for i2 in range(i1 + 1, nv):
+                v2 = var_list[i2]
+                self.__add_clause(cond, -v1, -v2)
+
+    def __gen_seqcounter(self, var_list, cond):
+        """逐次カウンタによる符号化を行う．"""
+        # s_i は x_1 から x_i までのいずれかが True の時に True となる．
+        nv = len(var_list)
+        s_prev = None
+        for i, x in enumerate(var_list):
+            if i < nv - 1:
+                s = self.__solver.new_variable()
+                self.__add_clause(cond, -x, s)
+            if s_prev is not None:
+                self.__add_clause(cond, -x, -s_prev)
+                if i < nv - 1:
+                    self.__add_clause(cond, -s_prev, s)
+            if i < nv - 1:
+                s_prev = s
+
+    def __gen_commander(self, var_list, cond):
+        """コマンダー符号化を行う．"""
+        commander_list = []
+        for i in range(0, len(var_list), COMMANDER_GROUP_SIZE):
+            group = var_list[i: i + COMMANDER_GROUP_SIZE]
+            # グループ内は高々1つ
+            self.__gen_pairwise(group, cond)
+            if len(group) == 1:
+                commander_list.append(group[0])
+                continue
+            # グループ内のいずれかが True の時 c は True となる．
+            c = self.__solver.new_variable()
+            for x in group:
+                self.__add_clause(cond, -x, c)
+            self.__add_clause(cond, -c, *group)
+            commander_list.append(c)
+        # コマンダーは高々1つ
+        self.gen_at_most_one(commander_list, cond)
+
+    def __gen_product(self, var_list, cond):
+        """積符号化を行う．"""
+        # 変数を p x q の2次元に並べる．
+        nv = len(var_list)
+        p = math.ceil(math.sqrt(nv))
+        q = math.ceil(nv / p)
+        row_list = [self.__solver.new_variable() for _ in range(p)]
+        col_list = [self.__solver.new_variable() for _ in range(q)]
+        for i, x in enumerate(var_list):
+            self.__add_clause(cond, -x, row_list[i // q])
+            self.__add_clause(cond, -x, col_list[i % q])
+        # 行と列はそれぞれ高々1つ
+        self.gen_at_most_one(row_list, cond)
+        self.gen_at_most_one(col_list, cond)
+
+    def __gen_bimander(self, var_list, cond, group_size):
+        """バイマンダー符号化を行う．
+        :param int group_size: グループの大きさ(1 の時は二進符号化となる)
+        """
+        group_list = [var_list[i: i + group_size]
+                      for i in range(0, len(var_list), group_size)]
+        ng = len(group_list)
+        nb = max(1, math.ceil(math.log2(ng)))
+        bit_list = [self.__solver.new_variable() for _ in range(nb)]
+        for index, group in enumerate(group_list):
+            # グループ内は高々1つ
+            self.__gen_pairwise(group, cond)
+            # グループの変数が True の時にビット変数がグループ番号を表す．
+            for x in group:
+                for j, b in enumerate(bit_list):
+                    if (index >> j) & 1:
+                        self.__add_clause(cond, -x, b)
+                    else:
+                        self.__add_clause(cond, -x, -b)
+
+    def __add_clause(self, cond, *lits):
+        """cond を条件とした節を加える．"""
+        if cond is None:
+            self.__solver.add_clause(list(lits))
+        else:
+            self.__solver.add_clause([-cond] + list(lits))
@@ -0,0 +1,654 @@
+#! /usr/bin/env python3
+
+"""Python で記述した CDCL 型の SAT ソルバ
+:file: cdclsolver.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import heapq
+import time
+from array import array
+
+from sat.satbool3 import SatBool3
+from sat.satmodel import SatModel
+
+
+def luby(y, x):
+    """Luby 系列の値を求める．
+    :param float y: 基数
+    :param int x: 系列の位置(0から始まる)
+    MiniSat の実装と同じ計算を行う．
+    """
+    size = 1
+    seq = 0
+    while size < x + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != x:
+        size = (size - 1) >> 1
+        seq -= 1
+        x = x % size
+    return y ** seq
+
+
+class CdclSolver:
+    """Python で実装した CDCL 型 SAT ソルバ
+    SatSolver と同じインターフェイスを持つが外部プログラムを必要としない．
+    - 2-watched-literal による含意操作
+    - VSIDS による変数選択と極性の保存(phase saving)
+    - 1UIP による学習節の生成
+    - Luby 系列によるリスタート
+    を行う．
+
+    内部ではリテラルを整数で表す．
+    変数番号 v の肯定リテラルは v * 2，否定リテラルは v * 2 + 1
+    となる．従って lit ^ 1 で否定リテラルが得られる．
+
+    solve() に時間や衝突回数の上限を与えた場合や別のスレッドから
+    interrupt() が呼ばれた場合は次の衝突の時点で探索を打ち切って
+    SatBool3.X を返す．
+    """
+
+    def __init__(self, satprog=None):
+        """初期化
+        :param str satprog: SatSolver との互換性のためのダミー引数
+        """
+        self._var_count = 0
+        # リテラルの値(1: 真, -1: 偽, 0: 未定)
+        # インデックスは内部表現のリテラル
+        self._vals = [0, 0]
+        # 変数の決定レベル
+        self._level = [0]
+        # 変数の値を決めた節(決定変数の場合は None)
+        self._reason = [None]
+        # 変数の活性度
+        self._activity = [0.0]
+        # 保存された極性(True なら否定)
+        self._polarity = [True]
+        # 学習節の解析用の作業領域
+        self._seen = bytearray(1)
+        # 監視リテラルのリスト
+        # インデックスのリテラルが偽になった時に調べる節のリスト
+        self._watches = [[], []]
+        # 問題の節のリスト
+        self._clause_list = []
+        # 学習節のリスト
+        self._learnt_list = []
+        # 値割り当ての履歴
+        self._trail = []
+        # 各決定レベルの開始位置
+        self._trail_lim = []
+        # 含意操作の処理済みの位置
+        self._qhead = 0
+        # 変数選択用のヒープ
+        # 要素は (-activity, varid) のタプルで遅延削除を行う．
+        self._heap = []
+        self._var_inc = 1.0
+        self._var_decay = 0.95
+        # 矛盾が見つかっていたら False
+        self._ok = True
+        # 学習節数の上限
+        self._max_learnts = 0
+        # リスタートの単位(衝突回数)
+        self._restart_first = 100
+        self._restart_inc = 2.0
+        # 衝突回数の上限(負の時は制限なし)
+        self._conflict_budget = -1
+        # 探索を打ち切る時刻(time.monotonic() の値，None の時は制限なし)
+        self._deadline = None
+        # 中断要求のフラグ
+        self._interrupted = False
+        # 統計情報
+        self._conflict_count = 0
+        self._decision_count = 0
+        self._propagation_count = 0
+        # デバッグフラグ
+        self._debug = False
+
+    def new_variable(self):
+        """変数を作る．
+        :return: 変数番号を返す．
+        """
+        self._var_count += 1
+        varid = self._var_count
+        self._vals.append(0)
+        self._vals.append(0)
+        self._level.append(0)
+        self._reason.append(None)
+        self._activity.append(0.0)
+        self._polarity.append(True)
+        self._seen.append(0)
+        self._watches.append([])
+        self._watches.append([])
+        heapq.heappush(self._heap, (0.0, varid))
+        return varid
+
+    def add_clause(self, *args):
+        """節を追加する．
+        :param list[int] args: 節のリテラルのリスト
+        リテラルは 0 以外の整数で，絶対値が番号を
+        符号が極性を表す．
+        SatSolver.add_clause() と同様に変数とリストの混在も書ける．
+        """
+        tmp_list = []
+        for arg in args:
+            if isinstance(arg, int):
+                # singleton の場合
+                lit = arg
+                if self._check_lit(lit):
+                    tmp_list.append(lit)
+            else:
+                # リストの場合
+                for lit in arg:
+                    if not self._check_lit(lit):
+                        return
+                    tmp_list.append(lit)
+
+        if not self._ok:
+            return
+
+        # solve() の後で呼ばれた場合に備えてレベル0に戻す．
+        self._cancel_until(0)
+
+        vals = self._vals
+        lit_set = set()
+        lit_list = []
+        for lit in tmp_list:
+            ilit = lit * 2 if lit > 0 else -lit * 2 + 1
+            if vals[ilit] == 1 or (ilit ^ 1) in lit_set:
+                # 充足している節やトートロジーは追加しない．
+                return
+            if vals[ilit] == -1 or ilit in lit_set:
+                # 偽のリテラルと重複したリテラルは取り除く．
+                continue
+            lit_set.add(ilit)
+            lit_list.append(ilit)
+
+        n = len(lit_list)
+        if n == 0:
+            self._ok = False
+        elif n == 1:
+            self._assign(lit_list[0], None)
+            if self._propagate() is not None:
+                self._ok = False
+        else:
+            self._clause_list.append(lit_list)
+            self._watches[lit_list[0]].append(lit_list)
+            self._watches[lit_list[1]].append(lit_list)
+
+    def solve(self, assumption_list=[], *, time_limit=None, conflict_limit=None):
+        """SAT問題を解く．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :param float time_limit: 時間の上限(秒)
+        :param int conflict_limit: この呼び出しでの衝突回数の上限
+        :return: (result, model) を返す．
+        - result は SatBool3
+        - model は結果の各変数に対する値を格納した SatModel
+        変数番号が 1番の変数の値は model[1] に入っている．
+        値は SatBool3
+
+        仮定は単位節としてではなく先頭の決定として扱うので
+        学習節は次回以降の solve() でもそのまま使える．
+        上限を超えた場合や中断された場合は SatBool3.X を返す．
+        """
+        model = []
+        if not self._ok:
+            return SatBool3.FALSE, model
+        if self._interrupted:
+            return SatBool3.X, model
+
+        assumptions = []
+        for lit in assumption_list:
+            if not self._check_lit(lit):
+                return SatBool3.X, model
+            assumptions.append(lit * 2 if lit > 0 else -lit * 2 + 1)
+
+        if self._propagate() is not None:
+            self._ok = False
+            return SatBool3.FALSE, model
+
+        if self._max_learnts < len(self._clause_list) / 3:
+            self._max_learnts = len(self._clause_list) / 3 + 100
+
+        if conflict_limit is not None:
+            self._conflict_budget = self._conflict_count + conflict_limit
+        else:
+            self._conflict_budget = -1
+        if time_limit is not None:
+            self._deadline = time.monotonic() + time_limit
+        else:
+            self._deadline = None
+
+        result = SatBool3.X
+        restart_count = 0
+        while result == SatBool3.X and self._within_budget():
+            nof_conflicts = luby(self._restart_inc, restart_count) * self._restart_first
+            result = self._search(nof_conflicts, assumptions)
+            restart_count += 1
+
+        if result == SatBool3.TRUE:
+            # 肯定リテラルの値が変数の値となる．
+            model = SatModel(array('b', self._vals[0::2]))
+
+        if self._debug:
+            print(f'conflicts:    {self._conflict_count}')
+            print(f'decisions:    {self._decision_count}')
+            print(f'propagations: {self._propagation_count}')
+
+        self._cancel_until(0)
+        return result, model
+
+    def interrupt(self):
+        """実行中の solve() を中断する．
+        別のスレッドから呼び出してよい．
+        clear_interrupt() が呼ばれるまでは以降の solve() も
+        すぐに SatBool3.X を返す．
+        """
+        self._interrupted = True
+
+    def clear_interrupt(self):
+        """interrupt() による中断要求を取り消す．"""
+        self._interrupted = False
+
+    def _within_budget(self):
+        """上限に達しておらず中断要求も出ていない時 True を返す．"""
+        if self._interrupted:
+            return False
+        if 0 <= self._conflict_budget <= self._conflict_count:
+            return False
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            return False
+        return True
+
+    def _search(self, nof_conflicts, assumptions):
+        """探索を行う．
+        :param int nof_conflicts: リスタートまでの衝突回数
+        :param list[int] assumptions: 仮定(内部表現のリテラル)
+        :return: SatBool3 を返す．
+        リスタートする場合や上限に達した場合には SatBool3.X を返す．
+        """
+        conflict_count = 0
+        budget_over = False
+        while True:
+            confl = self._propagate()
+            if confl is not None:
+                # 衝突が起きた．
+                self._conflict_count += 1
+                conflict_count += 1
+                if not self._trail_lim:
+                    self._ok = False
+                    return SatBool3.FALSE
+                learnt, bt_level = self._analyze(confl)
+                self._cancel_until(bt_level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self._learnt_list.append(learnt)
+                    self._watches[learnt[0]].append(learnt)
+                    self._watches[learnt[1]].append(learnt)
+                    self._assign(learnt[0], learnt)
+                self._var_inc /= self._var_decay
+                budget_over = not self._within_budget()
+                continue
+
+            if conflict_count >= nof_conflicts or budget_over:
+                # リスタートする．
+                self._cancel_until(0)
+                return SatBool3.X
+
+            if len(self._learnt_list) - len(self._trail) >= self._max_learnts:
+                self._reduce_db()
+
+            # 仮定を決定として割り当てる．
+            next_lit = None
+            while len(self._trail_lim) < len(assumptions):
+                lit = assumptions[len(self._trail_lim)]
+                val = self._vals[lit]
+                if val == 1:
+                    # すでに成り立っているのでダミーのレベルを作る．
+                    self._trail_lim.append(len(self._trail))
+                elif val == -1:
+                    # 仮定のもとでは充足不能
+                    self._cancel_until(0)
+                    return SatBool3.FALSE
+                else:
+                    next_lit = lit
+                    break
+
+            if next_lit is None:
+                next_lit = self._pick_branch_lit()
+                if next_lit is None:
+                    # すべての変数に値が割り当てられた．
+                    return SatBool3.TRUE
+                self._decision_count += 1
+
+            self._trail_lim.append(len(self._trail))
+            self._assign(next_lit, None)
+
+    def _propagate(self):
+        """含意操作を行う．
+        :return: 衝突が起きた場合にはその節を返す．
+        衝突が起きなければ None を返す．
+        """
+        vals = self._vals
+        watches = self._watches
+        trail = self._trail
+        level = self._level
+        reason = self._reason
+        cur_level = len(self._trail_lim)
+        qhead = self._qhead
+        confl = None
+        while qhead < len(trail):
+            false_lit = trail[qhead] ^ 1
+            qhead += 1
+            ws = watches[false_lit]
+            n = len(ws)
+            i = 0
+            j = 0
+            while i < n:
+                c = ws[i]
+                i += 1
+                # false_lit を c[1] に置く．
+                if c[0] == false_lit:
+                    c[0] = c[1]
+                    c[1] = false_lit
+                first = c[0]
+                if vals[first] == 1:
+                    # すでに充足している．
+                    ws[j] = c
+                    j += 1
+                    continue
+                # 新しい監視リテラルを探す．
+                for k in range(2, len(c)):
+                    lit = c[k]
+                    if vals[lit] != -1:
+                        c[1] = lit
+                        c[k] = false_lit
+                        watches[lit].append(c)
+                        break
+                else:
+                    ws[j] = c
+                    j += 1
+                    if vals[first] == -1:
+                        # 衝突
+                        confl = c
+                        while i < n:
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        qhead = len(trail)
+                    else:
+                        # first が含意される．
+                        vals[first] = 1
+                        vals[first ^ 1] = -1
+                        varid = first >> 1
+                        level[varid] = cur_level
+                        reason[varid] = c
+                        trail.append(first)
+            del ws[j:]
+        self._propagation_count += qhead - self._qhead
+        self._qhead = qhead
+        return confl
+
+    def _analyze(self, confl):
+        """衝突の解析を行う．
+        :param list[int] confl: 衝突した節
+        :return: (学習節, バックトラックレベル) を返す．
+        学習節の先頭は UIP の否定となる．
+        """
+        seen = self._seen
+        level = self._level
+        reason = self._reason
+        trail = self._trail
+        cur_level = len(self._trail_lim)
+        learnt = [0]
+        path_count = 0
+        p = None
+        index = len(trail) - 1
+        c = confl
+        while True:
+            start = 0 if p is None else 1
+            for k in range(start, len(c)):
+                q = c[k]
+                varid = q >> 1
+                if not seen[varid] and level[varid] > 0:
+                    self._bump_var(varid)
+                    seen[varid] = 1
+                    if level[varid] >= cur_level:
+                        path_count += 1
+                    else:
+                        learnt.append(q)
+            # 次に調べるリテラルを探す．
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            p = trail[index]
+            index -= 1
+            varid = p >> 1
+            c = reason[varid]
+            seen[varid] = 0
+            path_count -= 1
+            if path_count == 0:
+                break
+        learnt[0] = p ^ 1
+
+        # 冗長なリテラルを取り除く(簡易版)
+        # 理由となる節のリテラルがすべて学習節に含まれている
+        # リテラルは不要となる．
+        out_learnt = [learnt[0]]
+        for k in range(1, len(learnt)):
+            q = learnt[k]
+            r = reason[q >> 1]
+            if r is None:
+                out_learnt.append(q)
+                continue
+            for lit in r[1:]:
+                varid = lit >> 1
+                if not seen[varid] and level[varid] > 0:
+                    out_learnt.append(q)
+                    break
+        for q in learnt:
+            seen[q >> 1] = 0
+        learnt = out_learnt
+
+        # バックトラックレベルを求める．
+        if len(learnt) == 1:
+            bt_level = 0
+        else:
+            max_k = 1
+            for k in range(2, len(learnt)):
+                if level[learnt[k] >> 1] > level[learnt[max_k] >> 1]:
+                    max_k = k
+            learnt[1], learnt[max_k] = learnt[max_k], learnt[1]
+            bt_level = level[learnt[1] >> 1]
+        return learnt, bt_level
+
+    def _reduce_db(self):
+        """学習節の半分を削除する．
+        短い節と現在の割り当ての理由になっている節は残す．
+        """
+        vals = self._vals
+        reason = self._reason
+        learnt_list = self._learnt_list
+        learnt_list.sort(key=len)
+        keep_num = len(learnt_list) // 2
+        new_list = learnt_list[:keep_num]
+        for c in learnt_list[keep_num:]:
+            lit0 = c[0]
+            if len(c) <= 2 or (vals[lit0] == 1 and reason[lit0 >> 1] is c):
+                new_list.append(c)
+        self._learnt_list = new_list
+        self._max_learnts *= 1.1
+
+        # 監視リストを作り直す．
+        watches = [[] for i in range(len(self._watches))]
+        for c in self._clause_list:
+            watches[c[0]].append(c)
+            watches[c[1]].append(c)
+        for c in new_list:
+            watches[c[0]].append(c)
+            watches[c[1]].append(c)
+        self._watches = watches
+
+    def _pick_branch_lit(self):
+        """次の決定リテラルを選ぶ．
+        :return: リテラル(内部表現)を返す．
+        全ての変数に値が割り当てられていたら None を返す．
+        """
+        heap = self._heap
+        vals = self._vals
+        activity = self._activity
+        while heap:
+            act, varid = heapq.heappop(heap)
+            if vals[varid * 2] != 0 or -act != activity[varid]:
+                # 割り当て済みか古い要素
+                continue
+            if self._polarity[varid]:
+                return varid * 2 + 1
+            else:
+                return varid * 2
+        return None
+
+    def _bump_var(self, varid):
+        """変数の活性度を増やす．
+        :param int varid: 変数番号
+        """
+        activity = self._activity
+        activity[varid] += self._var_inc
+        if activity[varid] > 1e100:
+            # 値が大きくなりすぎたので全体をスケーリングする．
+            for i in range(1, self._var_count + 1):
+                activity[i] *= 1e-100
+            self._var_inc *= 1e-100
+            self._rebuild_heap()
+        elif self._vals[varid * 2] == 0:
+            heapq.heappush(self._heap, (-activity[varid], varid))
+
+    def _rebuild_heap(self):
+        """ヒープを作り直す．"""
+        vals = self._vals
+        activity = self._activity
+        self._heap = [(-activity[varid], varid)
+                      for varid in range(1, self._var_count + 1)
+                      if vals[varid * 2] == 0]
+        heapq.heapify(self._heap)
+
+    def _assign(self, lit, reason):
+        """値を割り当てる．
+        :param int lit: 割り当てるリテラル(内部表現)
+        :param list[int] reason: 割り当ての理由となる節
+        """
+        self._vals[lit] = 1
+        self._vals[lit ^ 1] = -1
+        varid = lit >> 1
+        self._level[varid] = len(self._trail_lim)
+        self._reason[varid] = reason
+        self._trail.append(lit)
+
+    def _cancel_until(self, level):
+        """指定されたレベルまでバックトラックする．
+        :param int level: 戻り先の決定レベル
+        """
+        if len(self._trail_lim) <= level:
+            return
+        vals = self._vals
+        activity = self._activity
+        polarity = self._polarity
+        reason = self._reason
+        heap = self._heap
+        trail = self._trail
+        pos = self._trail_lim[level]
+        for k in range(len(trail) - 1, pos - 1, -1):
+            lit = trail[k]
+            vals[lit] = 0
+            vals[lit ^ 1] = 0
+            varid = lit >> 1
+            reason[varid] = None
+            polarity[varid] = (lit & 1) == 1
+            heapq.heappush(heap, (-activity[varid], varid))
+        del trail[pos:]
+        del self._trail_lim[level:]
+        self._qhead = pos
+        if len(heap) > 4 * self._var_count + 1000:
+            self._rebuild_heap()
+
+    def _check_lit(self, lit):
+        """リテラルが適正な値かチェックする．"""
+        if lit > 0:
+            varid = lit
+        elif lit < 0:
+            varid = -lit
+        else:
+            msg = 'Error in add_clause(), 0 is not allowed as a literal value.'
+            print(msg)
+            return False
+        if varid > self._var_count:
+            print('Error in add_clause(), {} is out of range'.format(lit))
+            return False
+        return True
+
+
+def model_to_str(model):
+    """SatModel をリテラルの並びの文字列に変換する．
+    :param SatModel model: 解
+    :return: 'l1 l2 ... 0' の形の文字列を返す．
+    値が不定の変数は真とする．
+    """
+    values = model.values
+    return ' '.join(str(-varid) if values[varid] == -1 else str(varid)
+                    for varid in range(1, len(values))) + ' 0'
+
+
+def read_dimacs(fin, solver):
+    """DIMACS 形式のファイルを読み込んで solver に節を追加する．
+    :param FILE fin: 入力ファイル
+    :param solver: 節を追加するソルバ
+    """
+    lit_list = []
+    for line in fin:
+        if line[0] == 'p':
+            # ヘッダの変数の数だけ変数を作っておく．
+            var_num = int(line.split()[2])
+            while solver._var_count < var_num:
+                solver.new_variable()
+            continue
+        if line[0] in 'c%':
+            continue
+        for lit_str in line.split():
+            lit = int(lit_str)
+            if lit == 0:
+                solver.add_clause(lit_list)
+                lit_list = []
+                continue
+            varid = abs(lit)
+            while solver._var_count < varid:
+                solver.new_variable()
+            lit_list.append(lit)
+
+
+# MiniSat2 互換のコマンドとして使うためのメインプログラム
+# 使用方法: python3 -m sat.cdclsolver <DIMACSファイル> <結果ファイル>
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        print(f'USAGE: {sys.argv[0]} <input-file> <result-file>')
+        exit(1)
+
+    solver = CdclSolver()
+    with open(sys.argv[1], 'rt') as fin:
+        read_dimacs(fin, solver)
+
+    stat, model = solver.solve()
+
+    with open(sys.argv[2], 'wt') as fout:
+        if stat == SatBool3.TRUE:
+            fout.write('SAT\n')
+            fout.write(model_to_str(model))
+            fout.write('\n')
+        elif stat == SatBool3.FALSE:
+            fout.write('UNSAT\n')
+        else:
+            fout.write('INDET\n')
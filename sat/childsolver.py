@@ -0,0 +1,306 @@
+#! /usr/bin/env python3
+
+"""子プロセスで動いている SAT ソルバとやり取りするクラス
+:file: childsolver.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+
+子プロセスとは標準入出力を通して以下の行単位のプロトコルでやり取りする．
+- 'v <n>'             : 変数の数を n にする．
+- '<lit> ... <lit> 0' : 節を追加する(DIMACS 形式と同じ)．
+- 'l <time> <conf>'   : 次の 'a' の時間(秒)と衝突回数の上限を設定する．
+                        負の値は制限なしを表す．
+- 'a <lit> ... 0'     : 仮定のもとで SAT 問題を解く．
+- 'c'                 : SIGINT による中断要求を取り消す．
+- 'q'                 : 終了する．
+'a' に対する応答は SAT competition の形式で
+'s SATISFIABLE' と 'v <lit> ... 0' の行，
+もしくは 's UNSATISFIABLE'，'s UNKNOWN' の行となる．
+子プロセスは SIGINT を受け取ると実行中の 'a' を中断して
+'s UNKNOWN' を返す．中断要求は 'c' を受け取るまで有効となる．
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+from sat.satbool3 import SatBool3
+from sat.satmodel import parse_model
+from sat.cdclsolver import CdclSolver, model_to_str
+
+
+class ChildSolver:
+    """子プロセスとして起動したSATソルバを表すクラス
+    SatSolver と同じインターフェイスを持つが，子プロセスは
+    solve() の後も生き続けるので，節や学習結果は次の solve() に
+    引き継がれる．
+    子プロセスに送るのは前回の solve() 以降に追加された節のみとなる．
+
+    interrupt() は子プロセスに SIGINT を送って実行中の solve() を中断する．
+    子プロセスは終了しないので，中断後も同じセッションを使い続けられる．
+    """
+
+    def __init__(self, command=None):
+        """初期化
+        :param list[str] command: 子プロセスのコマンド行
+        省略された場合は CdclSolver を用いたサーバー(このファイル)を起動する．
+        """
+        if command is None:
+            command = [sys.executable, '-m', 'sat.childsolver']
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = root + os.pathsep + env.get('PYTHONPATH', '')
+        self._proc = subprocess.Popen(command,
+                                      stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE,
+                                      env=env,
+                                      universal_newlines=True)
+        self._var_count = 0
+        # 子プロセスに伝えた変数の数
+        self._sent_var_count = 0
+        # 子プロセスにまだ送っていない行のリスト
+        self._pending_list = []
+        # 子プロセスが solve() を実行中の時 True
+        self._solving = False
+        # 中断要求のフラグ
+        self._interrupted = False
+        # _solving と _interrupted を保護するロック
+        self._lock = threading.Lock()
+        # デバッグフラグ
+        self._debug = False
+
+    def new_variable(self):
+        """変数を作る．
+        :return: 変数番号を返す．
+        """
+        self._var_count += 1
+        return self._var_count
+
+    def add_clause(self, *args):
+        """節を追加する．
+        :param list[int] args: 節のリテラルのリスト
+        SatSolver.add_clause() と同様に変数とリストの混在も書ける．
+        """
+        tmp_list = []
+        for arg in args:
+            if isinstance(arg, int):
+                # singleton の場合
+                lit = arg
+                if self._check_lit(lit):
+                    tmp_list.append(lit)
+            else:
+                # リストの場合
+                for lit in arg:
+                    if not self._check_lit(lit):
+                        return
+                    tmp_list.append(lit)
+        self._sync_var_count()
+        tmp_list.append(0)
+        self._pending_list.append(' '.join(map(str, tmp_list)) + '\n')
+
+    def solve(self, assumption_list=[], *, time_limit=None, conflict_limit=None):
+        """SAT問題を解く．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :param float time_limit: 時間の上限(秒)
+        :param int conflict_limit: この呼び出しでの衝突回数の上限
+        :return: (result, model) を返す．
+        - result は SatBool3
+        - model は結果の各変数に対する値を格納した SatModel
+        変数番号が 1番の変数の値は model[1] に入っている．
+        値は SatBool3
+        仮定はこの呼び出しの間だけ有効となる．
+        上限を超えた場合や中断された場合は SatBool3.X を返す．
+        """
+        result = SatBool3.X
+        model = []
+        if self._interrupted:
+            return result, model
+        for lit in assumption_list:
+            if not self._check_lit(lit):
+                return result, model
+        self._sync_var_count()
+        if time_limit is not None or conflict_limit is not None:
+            time_str = -1 if time_limit is None else time_limit
+            conf_str = -1 if conflict_limit is None else conflict_limit
+            self._pending_list.append(f'l {time_str} {conf_str}\n')
+        tmp_list = ['a']
+        tmp_list.extend(map(str, assumption_list))
+        tmp_list.append('0\n')
+        self._pending_list.append(' '.join(tmp_list))
+        with self._lock:
+            self._solving = True
+        try:
+            self._proc.stdin.write(''.join(self._pending_list))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            print('Error in ChildSolver.solve(), the child process has terminated.')
+            return result, model
+        finally:
+            self._pending_list = []
+
+        # 結果を読み込む．
+        try:
+            return self._read_result()
+        finally:
+            with self._lock:
+                self._solving = False
+
+    def interrupt(self):
+        """実行中の solve() を中断する．
+        別のスレッドから呼び出してよい．
+        clear_interrupt() が呼ばれるまでは以降の solve() も
+        すぐに SatBool3.X を返す．
+        """
+        with self._lock:
+            self._interrupted = True
+            if self._solving and self._proc is not None:
+                self._proc.send_signal(signal.SIGINT)
+
+    def clear_interrupt(self):
+        """interrupt() による中断要求を取り消す．
+        子プロセスには次の solve() の時に伝える．
+        """
+        with self._lock:
+            if self._interrupted:
+                self._interrupted = False
+                self._pending_list.append('c\n')
+
+    def _read_result(self):
+        """子プロセスからの応答を読み込む．
+        :return: (result, model) を返す．
+        """
+        result = SatBool3.X
+        model = []
+        var_num = self._sent_var_count
+        while True:
+            line = self._proc.stdout.readline()
+            if line == '':
+                print('Error in ChildSolver.solve(), unexpected EOF.')
+                return result, model
+            if line.startswith('s '):
+                break
+        if line.startswith('s SATISFIABLE'):
+            result = SatBool3.TRUE
+            v_list = []
+            while True:
+                line = self._proc.stdout.readline()
+                if line == '':
+                    break
+                if not line.startswith('v '):
+                    continue
+                v_list.append(line[2:])
+                if line.split()[-1] == '0':
+                    break
+            model = parse_model(' '.join(v_list), var_num)
+        elif line.startswith('s UNSATISFIABLE'):
+            result = SatBool3.FALSE
+        return result, model
+
+    def close(self):
+        """子プロセスを終了させる．"""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.write('q\n')
+            self._proc.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, '_proc', None) is not None:
+            self._proc.kill()
+            self._proc.wait()
+
+    def _sync_var_count(self):
+        """変数の数を子プロセスに伝える．"""
+        if self._sent_var_count < self._var_count:
+            self._pending_list.append(f'v {self._var_count}\n')
+            self._sent_var_count = self._var_count
+
+    def _check_lit(self, lit):
+        """リテラルが適正な値かチェックする．"""
+        if lit > 0:
+            varid = lit
+        elif lit < 0:
+            varid = -lit
+        else:
+            msg = 'Error in add_clause(), 0 is not allowed as a literal value.'
+            print(msg)
+            return False
+        if varid > self._var_count:
+            print('Error in add_clause(), {} is out of range'.format(lit))
+            return False
+        return True
+
+
+def serve(fin, fout, solver):
+    """子プロセス側の処理を行う．
+    :param FILE fin: 入力ファイル
+    :param FILE fout: 出力ファイル
+    :param solver: SATソルバ(CdclSolver と同じインターフェイスを持つもの)
+    """
+    var_count = 0
+    time_limit = None
+    conflict_limit = None
+    for line in fin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        cmd = tokens[0]
+        if cmd == 'v':
+            var_num = int(tokens[1])
+            while var_count < var_num:
+                solver.new_variable()
+                var_count += 1
+        elif cmd == 'l':
+            time_limit = float(tokens[1])
+            conflict_limit = int(tokens[2])
+            if time_limit < 0:
+                time_limit = None
+            if conflict_limit < 0:
+                conflict_limit = None
+        elif cmd == 'a':
+            assumption_list = [int(lit_str) for lit_str in tokens[1:-1]]
+            stat, model = solver.solve(assumption_list,
+                                       time_limit=time_limit,
+                                       conflict_limit=conflict_limit)
+            # 上限はこの呼び出しだけ有効
+            time_limit = None
+            conflict_limit = None
+            if stat == SatBool3.TRUE:
+                fout.write('s SATISFIABLE\n')
+                fout.write(f'v {model_to_str(model)}\n')
+            elif stat == SatBool3.FALSE:
+                fout.write('s UNSATISFIABLE\n')
+            else:
+                fout.write('s UNKNOWN\n')
+            fout.flush()
+        elif cmd == 'c':
+            solver.clear_interrupt()
+        elif cmd == 'q':
+            break
+        else:
+            lit_list = [int(lit_str) for lit_str in tokens]
+            lit_list.pop()
+            solver.add_clause(lit_list)
+
+
+# 子プロセスとして起動された時のメインプログラム
+if __name__ == '__main__':
+    solver = CdclSolver()
+    # SIGINT で実行中の solve() を中断する．
+    signal.signal(signal.SIGINT, lambda signum, frame: solver.interrupt())
+    serve(sys.stdin, sys.stdout, solver)
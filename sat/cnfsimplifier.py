@@ -0,0 +1,385 @@
+#! /usr/bin/env python3
+
+"""CNF を簡単化してから SAT ソルバに渡すクラス
+:file: cnfsimplifier.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import sys
+import time
+from array import array
+
+from sat.satbool3 import SatBool3
+from sat.satmodel import SatModel
+
+
+class CnfSimplifier:
+    """CNF を簡単化してから別の SAT ソルバに渡すクラス
+    SatSolver と同じインターフェイスを持ち，add_clause() で追加された
+    節は solve() の時点でまとめて以下の簡単化を行ってから
+    内部の SAT ソルバ(solver)に渡す．
+    - 単位節の伝搬(値の決まった変数を含む節の削除とリテラルの削除)
+    - 節内の重複リテラルと恒真な節の削除
+    - 重複した節と包含される(subsumed)節の削除
+    - 残った節に現れる変数だけを用いた変数番号の詰め直し
+    solve() の返す model は元の変数番号のものに戻してある．
+    値の決まった変数は決まった値，どの節にも現れなくなった変数は
+    SatBool3.X となる．
+
+    solve() の後に追加された節は，それまでに決まった値を用いて
+    簡単化してから内部の SAT ソルバに追加する．
+
+    なお，現在の Adc2019Enc の生成する CNF にはこれらの簡単化で
+    削除できる節や変数が含まれないため，大きさは変わらない
+    (bench.bench_simplify を参照)．
+    """
+
+    def __init__(self, solver):
+        """初期化
+        :param solver: 内部の SAT ソルバ
+        """
+        self._solver = solver
+        self._var_count = 0
+        # 変数の値(1: 真, -1: 偽, 0: 未定)
+        self._vals = array('b', [0])
+        # 元の変数番号から内部の SAT ソルバの変数番号への写像
+        # 0 の場合はまだ割り当てていない．
+        self._var_map = array('i', [0])
+        # 内部の SAT ソルバの変数番号から元の変数番号への写像
+        self._inv_map = array('i', [0])
+        # まだ内部の SAT ソルバに渡していない節のリスト
+        self._pending_list = []
+        # 矛盾が見つかったら False
+        self._ok = True
+        # 統計情報
+        self._stats = {
+            'orig_clauses': 0,
+            'orig_literals': 0,
+            'units': 0,
+            'satisfied': 0,
+            'duplicates': 0,
+            'subsumed': 0,
+            'clauses': 0,
+            'literals': 0,
+            'time': 0.0,
+        }
+
+    def new_variable(self):
+        """変数を作る．
+        :return: 変数番号を返す．
+        """
+        self._var_count += 1
+        self._vals.append(0)
+        self._var_map.append(0)
+        return self._var_count
+
+    def add_clause(self, *args):
+        """節を追加する．
+        :param list[int] args: 節のリテラルのリスト
+        SatSolver.add_clause() と同様に変数とリストの混在も書ける．
+        """
+        tmp_list = []
+        for arg in args:
+            if isinstance(arg, int):
+                # singleton の場合
+                lit = arg
+                if self._check_lit(lit):
+                    tmp_list.append(lit)
+            else:
+                # リストの場合
+                for lit in arg:
+                    if not self._check_lit(lit):
+                        return
+                    tmp_list.append(lit)
+        self._stats['orig_clauses'] += 1
+        self._stats['orig_literals'] += len(tmp_list)
+        self._pending_list.append(tmp_list)
+
+    def solve(self, assumption_list=[], **kwargs):
+        """SAT問題を解く．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :return: (result, model) を返す．
+        kwargs(time_limit, conflict_limit)はそのまま内部の SAT ソルバに渡す．
+        返り値は SatSolver.solve() と同じ
+        """
+        self._flush()
+        if not self._ok:
+            return SatBool3.FALSE, []
+
+        # 仮定を内部の変数番号に直す．
+        inner_assumption_list = []
+        for lit in assumption_list:
+            if not self._check_lit(lit):
+                return SatBool3.X, []
+            varid = abs(lit)
+            val = self._vals[varid]
+            if val != 0:
+                if (val == 1) != (lit > 0):
+                    # 仮定のもとでは充足不能
+                    return SatBool3.FALSE, []
+                continue
+            inner_varid = self._inner_var(varid)
+            inner_assumption_list.append(inner_varid if lit > 0 else -inner_varid)
+
+        result, inner_model = self._solver.solve(inner_assumption_list, **kwargs)
+        if result != SatBool3.TRUE:
+            return result, []
+
+        # 元の変数番号の解に戻す．
+        values = array('b', self._vals)
+        inner_values = inner_model.values
+        inv_map = self._inv_map
+        for inner_varid in range(1, min(len(inv_map), len(inner_values))):
+            varid = inv_map[inner_varid]
+            if values[varid] == 0:
+                values[varid] = inner_values[inner_varid]
+        return result, SatModel(values)
+
+    def interrupt(self):
+        """実行中の solve() を中断する．"""
+        self._solver.interrupt()
+
+    def clear_interrupt(self):
+        """interrupt() による中断要求を取り消す．"""
+        self._solver.clear_interrupt()
+
+    def stats(self):
+        """統計情報を返す．
+        :return: 以下のキーを持つ辞書を返す．
+        - 'orig_clauses', 'orig_literals': 元の節数とリテラル数
+        - 'units': 値が決まった変数の数
+        - 'satisfied': 値の決まった変数によって充足された節と恒真な節の数
+        - 'duplicates', 'subsumed': 重複した節と包含された節の数
+        - 'clauses', 'literals': 内部の SAT ソルバに渡した節数とリテラル数
+        - 'vars': 内部の SAT ソルバに渡した変数の数
+        - 'orig_vars': 元の変数の数
+        - 'time': 簡単化にかかった時間(秒)
+        """
+        stats = dict(self._stats)
+        stats['orig_vars'] = self._var_count
+        stats['vars'] = len(self._inv_map) - 1
+        return stats
+
+    def print_stats(self, fout=sys.stdout):
+        """簡単化の結果を出力する．
+        :param FILE fout: 出力先のファイルオブジェクト
+        """
+        stats = self.stats()
+
+        def ratio(a, b):
+            return 100.0 * a / b if b > 0 else 0.0
+
+        fout.write('CNF simplification:\n')
+        for name, orig in (('vars', 'orig_vars'),
+                           ('clauses', 'orig_clauses'),
+                           ('literals', 'orig_literals')):
+            fout.write(f'  {name:10s} {stats[orig]:10d} -> {stats[name]:10d}'
+                       f' ({ratio(stats[name], stats[orig]):5.1f}%)\n')
+        fout.write(f'  units      {stats["units"]:10d}\n')
+        fout.write(f'  satisfied  {stats["satisfied"]:10d}\n')
+        fout.write(f'  duplicates {stats["duplicates"]:10d}\n')
+        fout.write(f'  subsumed   {stats["subsumed"]:10d}\n')
+        fout.write(f'  time       {stats["time"]:10.3f}s\n')
+
+    def _flush(self):
+        """未処理の節を簡単化して内部の SAT ソルバに渡す．"""
+        if not self._pending_list:
+            return
+        start = time.perf_counter()
+        clause_list = self._pending_list
+        self._pending_list = []
+        if self._ok:
+            clause_list = self._propagate_units(clause_list)
+        if self._ok:
+            clause_list = self._remove_subsumed(clause_list)
+            solver = self._solver
+            for clause in clause_list:
+                solver.add_clause([self._inner_lit(lit) for lit in clause])
+                self._stats['clauses'] += 1
+                self._stats['literals'] += len(clause)
+        self._stats['time'] += time.perf_counter() - start
+
+    def _propagate_units(self, clause_list):
+        """単位節の伝搬を行う．
+        :param list[list[int]] clause_list: 節のリスト
+        :return: 残った節のリストを返す．
+        値の決まったリテラルは取り除く．
+        矛盾が見つかった場合は self._ok を False にする．
+        """
+        vals = self._vals
+        # リテラルをキーとしてそのリテラルを含む節番号のリストを持つ辞書
+        occ_dict = {}
+        # 各節の残りのリテラル数(充足された節は -1)
+        rest_list = []
+        unit_list = []
+        for cid, clause in enumerate(clause_list):
+            # 重複したリテラルと恒真な節を取り除く．
+            lit_set = set(clause)
+            if any(-lit in lit_set for lit in lit_set):
+                rest_list.append(-1)
+                self._stats['satisfied'] += 1
+                continue
+            clause = list(lit_set)
+            clause_list[cid] = clause
+            rest = 0
+            satisfied = False
+            for lit in clause:
+                val = vals[abs(lit)]
+                if val == 0:
+                    rest += 1
+                    occ_dict.setdefault(lit, []).append(cid)
+                elif (val == 1) == (lit > 0):
+                    satisfied = True
+            if satisfied:
+                rest = -1
+                self._stats['satisfied'] += 1
+            elif rest == 0:
+                self._ok = False
+                return []
+            elif rest == 1:
+                unit_list.append(cid)
+            rest_list.append(rest)
+
+        # 単位節のリテラルを順に割り当てる．
+        queue = []
+        for cid in unit_list:
+            if rest_list[cid] == 1:
+                queue.append(self._unit_lit(clause_list[cid]))
+        while queue:
+            lit = queue.pop()
+            varid = abs(lit)
+            val = vals[varid]
+            if val != 0:
+                if (val == 1) != (lit > 0):
+                    self._ok = False
+                    return []
+                continue
+            self._fix(lit)
+            for cid in occ_dict.get(lit, ()):
+                if rest_list[cid] >= 0:
+                    rest_list[cid] = -1
+                    self._stats['satisfied'] += 1
+            for cid in occ_dict.get(-lit, ()):
+                rest = rest_list[cid]
+                if rest < 0:
+                    continue
+                rest -= 1
+                rest_list[cid] = rest
+                if rest == 0:
+                    self._ok = False
+                    return []
+                if rest == 1:
+                    queue.append(self._unit_lit(clause_list[cid]))
+
+        # 充足されていない節から値の決まったリテラルを取り除く．
+        ans_list = []
+        for cid, clause in enumerate(clause_list):
+            if rest_list[cid] < 0:
+                continue
+            ans_list.append([lit for lit in clause if vals[abs(lit)] == 0])
+        return ans_list
+
+    def _remove_subsumed(self, clause_list):
+        """重複した節と包含される節を取り除く．
+        :param list[list[int]] clause_list: 節のリスト
+        :return: 残った節のリストを返す．
+        節 C のリテラルが全て節 D に含まれている時 D を取り除く．
+        """
+        # 重複した節を取り除き，短い順に並べる．
+        clause_set = set(tuple(sorted(clause)) for clause in clause_list)
+        self._stats['duplicates'] += len(clause_list) - len(clause_set)
+        sorted_list = sorted(clause_set, key=len)
+
+        # リテラルをキーとしてそのリテラルを含む節番号のリストを持つ辞書
+        occ_dict = {}
+        for cid, clause in enumerate(sorted_list):
+            for lit in clause:
+                occ_dict.setdefault(lit, []).append(cid)
+
+        removed = bytearray(len(sorted_list))
+        set_list = [None] * len(sorted_list)
+        for cid, clause in enumerate(sorted_list):
+            if removed[cid]:
+                continue
+            # 最も出現回数の少ないリテラルを含む節だけを調べればよい．
+            min_lit = min(clause, key=lambda lit: len(occ_dict[lit]))
+            n = len(clause)
+            clause_set1 = None
+            for cid2 in occ_dict[min_lit]:
+                if cid2 == cid or removed[cid2]:
+                    continue
+                clause2 = sorted_list[cid2]
+                if len(clause2) <= n:
+                    continue
+                if n == 1:
+                    removed[cid2] = 1
+                    continue
+                if clause_set1 is None:
+                    clause_set1 = set(clause)
+                set2 = set_list[cid2]
+                if set2 is None:
+                    set2 = set_list[cid2] = frozenset(clause2)
+                if clause_set1 <= set2:
+                    removed[cid2] = 1
+
+        ans_list = [list(clause) for cid, clause in enumerate(sorted_list)
+                    if not removed[cid]]
+        self._stats['subsumed'] += len(sorted_list) - len(ans_list)
+        return ans_list
+
+    def _unit_lit(self, clause):
+        """単位節となった節の未割り当てのリテラルを返す．"""
+        vals = self._vals
+        for lit in clause:
+            if vals[abs(lit)] == 0:
+                return lit
+        assert False
+
+    def _fix(self, lit):
+        """リテラルの値を確定させる．
+        :param int lit: 真にするリテラル
+        すでに内部の SAT ソルバに渡している変数の場合は単位節を追加する．
+        """
+        varid = abs(lit)
+        self._vals[varid] = 1 if lit > 0 else -1
+        self._stats['units'] += 1
+        if self._var_map[varid] != 0:
+            self._solver.add_clause(self._inner_lit(lit))
+
+    def _inner_var(self, varid):
+        """内部の SAT ソルバの変数番号を返す．
+        :param int varid: 元の変数番号
+        まだ割り当てられていない場合は新たに作る．
+        """
+        inner_varid = self._var_map[varid]
+        if inner_varid == 0:
+            inner_varid = self._solver.new_variable()
+            assert inner_varid == len(self._inv_map)
+            self._var_map[varid] = inner_varid
+            self._inv_map.append(varid)
+        return inner_varid
+
+    def _inner_lit(self, lit):
+        """内部の SAT ソルバのリテラルを返す．
+        :param int lit: 元のリテラル
+        """
+        inner_varid = self._inner_var(abs(lit))
+        return inner_varid if lit > 0 else -inner_varid
+
+    def _check_lit(self, lit):
+        """リテラルが適正な値かチェックする．"""
+        if lit > 0:
+            varid = lit
+        elif lit < 0:
+            varid = -lit
+        else:
+            msg = 'Error in add_clause(), 0 is not allowed as a literal value.'
+            print(msg)
+            return False
+        if varid > self._var_count:
+            print('Error in add_clause(), {} is out of range'.format(lit))
+            return False
+        return True
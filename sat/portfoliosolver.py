@@ -0,0 +1,250 @@
+#! /usr/bin/env python3
+
+"""複数の SAT ソルバを並列に走らせるクラス
+:file: portfoliosolver.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+import fcntl
+import json
+import os
+import queue
+import shlex
+import subprocess
+import tempfile
+import threading
+import time
+
+from sat.satbool3 import SatBool3
+from sat.satsolver import SatSolver, kill_proc
+from sat.satsolver import read_minisat_output, read_competition_output
+
+
+class PortfolioSolver(SatSolver):
+    """複数の SAT ソルバ(ポートフォリオ)を表すクラス
+    同じ CNF を全てのメンバーで並列に解き，最初に得られた
+    確定した答(SAT もしくは UNSAT)を用いて残りのプロセスは終了させる．
+
+    各メンバーはコマンド行を表す文字列で指定する．
+    'minisat -rnd-seed=7' のようにオプションを含めてよいので，
+    同じプログラムを異なる乱数の種で走らせることもできる．
+    コマンド行は shlex.split() で分割する．
+    起動方法は SatSolver と同じで pipe=True の時は CNF を標準入力から与え，
+    SAT competition の形式の出力を読み込む．
+
+    メンバーごとの勝ち数を記録しておき，stats() で参照できる．
+    stats_file を指定した場合はこの統計情報を JSON 形式で
+    ファイルに読み書きして累積させる．
+    ファイルは複数のプロセスで共有してもよいように，記録する度に
+    ロックを取ってから読み直して今回の勝ちを加え，一時ファイル経由で置き換える．
+    壊れたファイルは空の統計情報とみなす．
+    """
+
+    def __init__(self, satprog_list, *, stream=False, pipe=False, stats_file=None):
+        """初期化
+        :param list[str] satprog_list: SATソルバのコマンド行のリスト
+        :param bool stream: ストリーミングモードの時 True にする．
+        :param bool pipe: パイプモードの時 True にする．
+        :param str stats_file: 統計情報を記録するファイル名
+        """
+        super().__init__(None, stream=stream, pipe=pipe)
+        self._satprog_list = list(satprog_list)
+        self._command_list = [shlex.split(satprog) for satprog in self._satprog_list]
+        self._stats_file = stats_file
+        # 統計情報
+        # 'runs' は solve() で確定した答が得られた回数
+        # 'members' はメンバーのコマンド行をキーとして勝ち数('wins')と
+        # 勝った時の実行時間の合計('win_time')を持つ辞書
+        self._stats = _load_stats(stats_file, self._satprog_list)
+
+    def solve(self, assumption_list=[], *, time_limit=None, conflict_limit=None):
+        """SAT問題を解く．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :param float time_limit: 時間の上限(秒)
+        :param int conflict_limit: 衝突回数の上限(無視される)
+        :return: (result, model) を返す．
+        返り値は SatSolver.solve() と同じ
+        """
+        if self._interrupted:
+            return SatBool3.X, []
+
+        # 全てのメンバーで同じファイルを用いる．
+        dimacs_file, spool_end = self._prepare_dimacs(assumption_list)
+        if self._debug:
+            print(f'INPUT:       {dimacs_file}')
+            derr = None
+        else:
+            derr = subprocess.DEVNULL
+
+        start = time.perf_counter()
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        result_queue = queue.Queue()
+        thread_list = []
+        output_file_list = []
+        result = SatBool3.X
+        model = []
+        winner = None
+        try:
+            # プロセスの起動はこのスレッドで行い，
+            # 終了待ちと結果の読み込みをメンバーごとのスレッドで行う．
+            for index, command_line in enumerate(self._command_list):
+                if self._pipe:
+                    output_file = None
+                    with open(dimacs_file, 'rt') as fin:
+                        proc = self._start_proc(command_line,
+                                                stdin=fin,
+                                                stdout=subprocess.PIPE,
+                                                stderr=derr,
+                                                universal_newlines=True)
+                else:
+                    (fh, output_file) = tempfile.mkstemp()
+                    os.close(fh)
+                    output_file_list.append(output_file)
+                    proc = self._start_proc(command_line + [dimacs_file, output_file],
+                                            stdout=subprocess.DEVNULL,
+                                            stderr=derr)
+                thread = threading.Thread(target=self._wait_member,
+                                          args=(index, proc, output_file, result_queue))
+                thread.start()
+                thread_list.append(thread)
+
+            # 最初に確定した答を待つ．
+            for _ in range(len(thread_list)):
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    index, result1, model1 = result_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if result1 != SatBool3.X:
+                    result = result1
+                    model = model1
+                    winner = index
+                    break
+        finally:
+            # 残りのプロセスを終了させる．
+            with self._lock:
+                for proc in self._proc_list:
+                    kill_proc(proc)
+            for thread in thread_list:
+                thread.join()
+            for output_file in output_file_list:
+                os.remove(output_file)
+            self._release_dimacs(dimacs_file, spool_end)
+
+        if winner is not None:
+            self._record_win(winner, time.perf_counter() - start)
+        return result, model
+
+    def stats(self):
+        """統計情報を返す．
+        :return: 'runs' と 'members' をキーとする辞書を返す．
+        """
+        return self._stats
+
+    def print_stats(self, fout=None):
+        """統計情報を出力する．
+        :param FILE fout: 出力先のファイルオブジェクト
+        """
+        print(f'runs: {self._stats["runs"]}', file=fout)
+        for satprog in self._satprog_list:
+            member = self._stats['members'][satprog]
+            print(f'{member["wins"]:6d} {member["win_time"]:10.2f}s  {satprog}', file=fout)
+
+    def _wait_member(self, index, proc, output_file, result_queue):
+        """メンバーの1つの終了を待って結果を読み込む．
+        :param int index: メンバーの番号
+        :param Popen proc: プロセス
+        :param str output_file: 結果のファイル名(パイプモードの時は None)
+        :param Queue result_queue: 結果を入れるキュー
+        (index, result, model) をキューに入れる．
+        """
+        result = SatBool3.X
+        model = []
+        var_num = self._var_count
+        try:
+            if output_file is None:
+                try:
+                    result, model = read_competition_output(proc.stdout, var_num)
+                finally:
+                    if result == SatBool3.X:
+                        kill_proc(proc)
+                    proc.stdout.close()
+                    self._wait_proc(proc, None)
+            elif self._wait_proc(proc, None):
+                with open(output_file, 'r') as fin:
+                    result, model = read_minisat_output(fin, var_num)
+        finally:
+            result_queue.put((index, result, model))
+
+    def _record_win(self, index, elapsed):
+        """勝者を記録する．
+        :param int index: メンバーの番号
+        :param float elapsed: 実行時間(秒)
+        """
+        satprog = self._satprog_list[index]
+        if self._debug:
+            print(f'WINNER:      {satprog} ({elapsed:.2f}s)')
+        if self._stats_file is None:
+            _add_win(self._stats, satprog, elapsed)
+            return
+
+        # 他のプロセスの記録を失わないようにロックを取ってから読み直す．
+        with open(self._stats_file + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                stats = _load_stats(self._stats_file, self._satprog_list)
+                _add_win(stats, satprog, elapsed)
+                # 書き込み途中で終了しても元のファイルが壊れないように
+                # 一時ファイルに書いてから置き換える．
+                stats_dir = os.path.dirname(os.path.abspath(self._stats_file))
+                (fh, tmp_file) = tempfile.mkstemp(dir=stats_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fh, 'wt') as fout:
+                        json.dump(stats, fout, indent=2)
+                    os.replace(tmp_file, self._stats_file)
+                except BaseException:
+                    os.remove(tmp_file)
+                    raise
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._stats = stats
+
+
+def _load_stats(stats_file, satprog_list):
+    """統計情報をファイルから読み込む．
+    :param str stats_file: ファイル名(None の場合は読み込まない)
+    :param list[str] satprog_list: SATソルバのコマンド行のリスト
+    :return: 統計情報の辞書を返す．
+    ファイルがない場合や内容が壊れている場合は空の統計情報を返す．
+    """
+    stats = None
+    if stats_file is not None:
+        try:
+            with open(stats_file, 'rt') as fin:
+                stats = json.load(fin)
+        except (OSError, ValueError):
+            stats = None
+    if not isinstance(stats, dict) or \
+       not isinstance(stats.get('runs'), int) or \
+       not isinstance(stats.get('members'), dict):
+        stats = {'runs': 0, 'members': {}}
+    for satprog in satprog_list:
+        stats['members'].setdefault(satprog, {'wins': 0, 'win_time': 0.0})
+    return stats
+
+
+def _add_win(stats, satprog, elapsed):
+    """統計情報に勝ちを1つ加える．
+    :param dict stats: 統計情報
+    :param str satprog: 勝ったメンバーのコマンド行
+    :param float elapsed: 実行時間(秒)
+    """
+    stats['runs'] += 1
+    member = stats['members'][satprog]
+    member['wins'] += 1
+    member['win_time'] += elapsed
@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+
+"""SAT の解を表すクラス
+:file: satmodel.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from array import array
+from functools import lru_cache
+from sat.satbool3 import SatBool3
+
+
+# 値(-1, 0, 1)から SatBool3 への変換表
+# -1 は末尾の要素を指す．
+_b3_table = (SatBool3.X, SatBool3.TRUE, SatBool3.FALSE)
+
+# 空白文字を ' ' に変換する表
+_space_table = bytes.maketrans(b'\t\n\r\f\v', b'     ')
+
+
+class SatModel:
+    """SAT の解(各変数の値割り当て)を表すクラス
+    値は array('b') に -1(偽)，0(不定)，1(真) の形で保持する．
+    従来のリストと同様に model[varid] で SatBool3 の値が得られる．
+    変数番号 0 は使わない．
+
+    :param array values: 値の配列
+    """
+
+    def __init__(self, values):
+        self.__values = values
+
+    @staticmethod
+    def from_list(b3_list):
+        """SatBool3 のリストから作る．
+        :param list[SatBool3] b3_list: 値のリスト
+        """
+        return SatModel(array('b', [val.value for val in b3_list]))
+
+    @property
+    def values(self):
+        """値の配列を返す．"""
+        return self.__values
+
+    def is_true(self, varid):
+        """変数の値が真の時 True を返す．
+        :param int varid: 変数番号
+        """
+        return self.__values[varid] == 1
+
+    def __getitem__(self, varid):
+        """変数の値を SatBool3 で返す．
+        :param int varid: 変数番号
+        """
+        return _b3_table[self.__values[varid]]
+
+    def __len__(self):
+        """要素数を返す．"""
+        return len(self.__values)
+
+    def __iter__(self):
+        """SatBool3 の値を順に返す．"""
+        for val in self.__values:
+            yield _b3_table[val]
+
+
+def parse_model(text, var_num):
+    """リテラルの並びから SatModel を作る．
+    :param str text: 空白で区切られたリテラルの並び(末尾の 0 はあってもなくてもよい)
+    :param int var_num: 変数の数
+    :return: SatModel を返す．
+
+    MiniSat2 などの出力のように 1 から var_num までの変数のリテラルが
+    順番に並んでいる場合は int() を用いずにバイト列の置換だけで
+    まとめて変換する．
+    順番に並んでいるかどうかは符号を除いたバイト列を比較して確かめる．
+    それ以外の場合は1つずつ変換する．
+    """
+    if isinstance(text, str):
+        text = text.encode()
+    buff = b' ' + text.translate(_space_table)
+    while b'  ' in buff:
+        buff = buff.replace(b'  ', b' ')
+    buff = buff.rstrip()
+    if buff.endswith(b' 0'):
+        buff = buff[:-2]
+
+    # 全てのリテラルが順番に並んでいるかを調べる．
+    # 先頭と末尾だけでは途中が入れ替わっている場合を見逃すので
+    # 符号を取り除いたものを ' 1 2 ... var_num' と比較する．
+    ordered = buff.count(b' ') == var_num and \
+        buff.replace(b' -', b' ') == _ordered_text(var_num)
+
+    if ordered:
+        # 各リテラルを負なら '\xff'，正なら '\x01' に置き換える．
+        buff = buff.replace(b' -', b' F')
+        buff = buff.translate(None, b'0123456789')
+        buff = buff.replace(b' F', b'\xff').replace(b' ', b'\x01')
+        values = array('b', [0])
+        values.frombytes(buff)
+        return SatModel(values)
+
+    values = array('b', bytes(var_num + 1))
+    for val in map(int, buff.split()):
+        if val > 0:
+            values[val] = 1
+        elif val < 0:
+            values[-val] = -1
+    return SatModel(values)
+
+
+@lru_cache(maxsize=4)
+def _ordered_text(var_num):
+    """1 から var_num までの変数番号を順に並べたバイト列を返す．
+    :param int var_num: 変数の数
+
+    同じソルバは同じ変数の数で繰り返し呼ぶので結果をキャッシュしておく．
+    """
+    return b' ' + b' '.join(b'%d' % i for i in range(1, var_num + 1))
@@ -9,12 +9,33 @@ All rights reserved.
 """
 
 
+from array import array
 from enum import Enum
 import tempfile
 import os
+import shutil
+import signal
 import subprocess
+import threading
 
 from sat.satbool3 import SatBool3
+from sat.satmodel import parse_model
+
+
+# ストリーミングモードでスプールファイルの先頭に確保するヘッダの大きさ
+# ヘッダ行の後ろをコメント行で埋めて常にこの大きさにする．
+SPOOL_HEADER_SIZE = 64
+
+# スプールファイルのバッファサイズ
+SPOOL_BUFFER_SIZE = 1 << 20
+
+# DIMACS 形式で書き出す時に一度に文字列に変換するリテラル数の目安
+DIMACS_CHUNK_SIZE = 1 << 16
+
+# 節のリテラルを array('i') に移すまで溜めておくリストの大きさ
+# array の extend() は1要素ずつ変換するので，リストに溜めて
+# fromlist() でまとめて移す方が速い．
+LIT_BUFFER_SIZE = 1 << 12
 
 
 class SatSolver:
@@ -22,15 +43,58 @@ class SatSolver:
     このクラスは内部でSATソルバのプログラムを呼び出している．
     同じインターフェイスで内部で SAT を解くクラスを(主にC++で)
     実装しても良い．
+
+    節は全てのリテラルを連結した array('i') で保持する．
+    各節の末尾には DIMACS 形式と同様に 0 を置き，別に各節の先頭位置を
+    表す array('l') を持つ．
+
+    stream=True の場合，節はメモリ上に保持せずに追加されたそばから
+    DIMACS 形式でスプールファイルに書き出す(ストリーミングモード)．
+    'p cnf' ヘッダは solve() の時点でファイルの先頭に書き込む．
+
+    通常は MiniSat2 と同様に '<satprog> <入力ファイル> <結果ファイル>'
+    の形式で SAT ソルバを起動する．
+    pipe=True の場合は kissat や CaDiCaL のように標準入力から問題を読み込み，
+    標準出力に SAT competition の形式で結果を出力するものとして
+    SAT ソルバを起動する(パイプモード)．
+
+    solve() には時間の上限を与えることができる．
+    上限を超えた場合や別のスレッドから interrupt() が呼ばれた場合は
+    SAT ソルバのプロセスを終了させて SatBool3.X を返す．
+    外部プログラムには衝突回数の上限を指定する共通の方法がないので
+    conflict_limit は無視する．
     """
 
-    def __init__(self, satprog):
+    def __init__(self, satprog, *, stream=False, pipe=False):
         """初期化
         :param str satprog: SATソルバのプログラム名
+        :param bool stream: ストリーミングモードの時 True にする．
+        :param bool pipe: パイプモードの時 True にする．
         """
         self._var_count = 0
-        self._clause_list = []
+        self._clause_num = 0
+        # 全ての節のリテラルを連結した配列
+        # 各節の末尾には区切りの 0 を置く．
+        # 最後の LIT_BUFFER_SIZE 個程度は _lit_buffer に置かれているので，
+        # 参照する前に _flush_lits() を呼ぶ必要がある．
+        self._lit_array = array('i')
+        self._lit_buffer = []
         self._satprog = satprog
+        self._pipe = pipe
+        # ストリーミングモード用のスプールファイル
+        self._spool = None
+        self._spool_file = None
+        if stream:
+            (fh, self._spool_file) = tempfile.mkstemp(suffix='.cnf')
+            self._spool = os.fdopen(fh, 'w', buffering=SPOOL_BUFFER_SIZE)
+            # ヘッダの場所を確保しておく．
+            self._spool.write(make_header(0, 0))
+        # 実行中の SAT ソルバのプロセスのリスト
+        self._proc_list = []
+        # 中断要求のフラグ
+        self._interrupted = False
+        # _proc_list と _interrupted を保護するロック
+        self._lock = threading.Lock()
         # デバッグフラグ
         self._debug = False
 
@@ -52,59 +116,60 @@ class SatSolver:
         tmp_list = []
         for arg in args:
             if isinstance(arg, int):
-                # singleton の場合
-                lit = arg
-                if self._check_lit(lit):
-                    tmp_list.append(lit)
+                tmp_list.append(arg)
             else:
-                # リストの場合
-                for lit in arg:
-                    if not self._check_lit(lit):
-                        return
-                    tmp_list.append(lit)
-        self._clause_list.append(tmp_list)
+                tmp_list.extend(arg)
+        # 節はほとんどが数リテラルなので，メソッド呼び出しや
+        # min()/max() を重ねるより1回のループで調べる方が速い．
+        var_count = self._var_count
+        for lit in tmp_list:
+            if not 0 < abs(lit) <= var_count:
+                # 不正なリテラルを含んでいたので1つずつチェックし直す．
+                tmp_list = self._filter_lits(args)
+                if tmp_list is None:
+                    return
+                break
+        self._clause_num += 1
+        if self._spool is not None:
+            tmp_list.append(0)
+            self._spool.write(' '.join(map(str, tmp_list)))
+            self._spool.write('\n')
+        else:
+            lit_buffer = self._lit_buffer
+            lit_buffer += tmp_list
+            lit_buffer.append(0)
+            if len(lit_buffer) >= LIT_BUFFER_SIZE:
+                self._flush_lits()
 
-    def solve(self, assumption_list=[]):
+    def solve(self, assumption_list=[], *, time_limit=None, conflict_limit=None):
         """SAT問題を解く．
         :param list[int] assumption_list: 仮定する割り当てリスト
+        :param float time_limit: 時間の上限(秒)
+        :param int conflict_limit: 衝突回数の上限(外部プログラムでは無視される)
         :return: (result, model) を返す．
         - result は SatBool3
-        - model は結果の各変数に対する値を格納したリスト
+        - model は結果の各変数に対する値を格納した SatModel
         変数番号が 1番の変数の値は model[1] に入っている．
         値は SatBool3
+        上限を超えた場合や中断された場合は SatBool3.X を返す．
         """
+        if self._interrupted:
+            return SatBool3.X, []
+
+        if self._pipe:
+            return self._solve_pipe(assumption_list, time_limit)
 
         # デフォルトの返り値
         result = SatBool3.X
         model = []
 
-        # dimacs 形式のファイルを作る．
-        # fh は使わない．
-        (fh, dimacs_file) = tempfile.mkstemp()
-        fout = open(dimacs_file, 'w')
-        if not fout:
-            msg = 'Error: could not create {} for DIMACS input.'
-            print(msg.format(dimacs_file))
-            return
-
-        # ヘッダを書き出す．
         var_num = self._var_count
-        clause_num = len(self._clause_list)
-        fout.write(f'p cnf {var_num} {clause_num}\n')
-
-        # 節の内容を書き出す．
-        for lit_list in self._clause_list:
-            for lit in lit_list:
-                fout.write(f' {lit}')
-            fout.write(' 0\n')
-
-        # assumption を単一リテラル節の形で書き出す．
-        for lit in assumption_list:
-            fout.write(f' {lit} 0\n')
-        fout.close()
+        dimacs_file, spool_end = self._prepare_dimacs(assumption_list)
 
         # SATソルバを起動する．
+        # 結果のファイルは SAT ソルバが書き込むので fh はすぐに閉じる．
         (fh, output_file) = tempfile.mkstemp()
+        os.close(fh)
         command_line = [self._satprog, dimacs_file, output_file]
         if self._debug:
             print(f'SAT program: {self._satprog}')
@@ -115,34 +180,257 @@ class SatSolver:
         else:
             dout = subprocess.DEVNULL
             derr = subprocess.DEVNULL
-        subprocess.run(command_line, stdout=dout, stderr=derr)
-        if not self._debug:
+        try:
+            proc = self._start_proc(command_line, stdout=dout, stderr=derr)
+            completed = self._wait_proc(proc, time_limit)
+
+            if completed:
+                # 結果のファイルを読み込む．
+                with open(output_file, 'r') as fin:
+                    result, model = read_minisat_output(fin, var_num)
+        finally:
+            self._release_dimacs(dimacs_file, spool_end)
+            if not self._debug:
+                os.remove(output_file)
+
+        return result, model
+
+    def interrupt(self):
+        """実行中の solve() を中断する．
+        別のスレッドから呼び出してよい．
+        clear_interrupt() が呼ばれるまでは以降の solve() も
+        すぐに SatBool3.X を返す．
+        """
+        with self._lock:
+            self._interrupted = True
+            for proc in self._proc_list:
+                kill_proc(proc)
+
+    def clear_interrupt(self):
+        """interrupt() による中断要求を取り消す．"""
+        with self._lock:
+            self._interrupted = False
+
+    def _prepare_dimacs(self, assumption_list):
+        """SAT ソルバに渡す DIMACS 形式のファイルを用意する．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :return: (ファイル名, 仮定を書き出す前のスプールファイルの位置) を返す．
+        ストリーミングモードの時はスプールファイルをそのまま用いる．
+        それ以外の時は一時ファイルを作る(2番目の値は None となる)．
+        """
+        if self._spool is not None:
+            return self._spool_file, self._finish_spool(assumption_list)
+        (fh, dimacs_file) = tempfile.mkstemp()
+        with os.fdopen(fh, 'w') as fout:
+            self.write_dimacs(fout, assumption_list)
+        return dimacs_file, None
+
+    def _release_dimacs(self, dimacs_file, spool_end):
+        """_prepare_dimacs() で用意したファイルを後始末する．
+        :param str dimacs_file: ファイル名
+        :param int spool_end: 仮定を書き出す前のスプールファイルの位置
+        """
+        if self._spool is not None:
+            # 仮定の単位節を取り除く．
+            self._spool.truncate(spool_end)
+            self._spool.seek(spool_end)
+        elif not self._debug:
             os.remove(dimacs_file)
 
-        # 結果のファイルを読み込む．
-        with open(output_file, 'r') as fin:
-            lines = fin.readlines()
+    def _start_proc(self, command_line, **kwargs):
+        """SAT ソルバのプロセスを起動する．
+        :param list[str] command_line: コマンド行
+        kwargs は subprocess.Popen() にそのまま渡す．
+        SAT ソルバがシェルスクリプトなどから起動される場合も
+        まとめて終了させられるように新しいプロセスグループで起動する．
+        すでに中断要求が出ていた場合はすぐに終了させる．
+        """
+        proc = subprocess.Popen(command_line, start_new_session=True, **kwargs)
+        with self._lock:
+            self._proc_list.append(proc)
+            if self._interrupted:
+                kill_proc(proc)
+        return proc
 
-            # 1行目が結果
-            if lines[0] == 'SAT\n':
-                assert len(lines) == 2
-                result = SatBool3.TRUE
-                # 割り当て結果を model に反映させる．
-                val_list = lines[1].split()
-                model = [SatBool3.X for i in range(var_num + 1)]
-                for val_str in val_list:
-                    val = int(val_str)
-                    if val > 0:
-                        model[val] = SatBool3.TRUE
-                    elif val < 0:
-                        model[-val] = SatBool3.FALSE
-            elif lines[0] == 'UNSAT\n':
-                result = SatBool3.FALSE
-        if not self._debug:
-            os.remove(output_file)
+    def _wait_proc(self, proc, time_limit):
+        """SAT ソルバのプロセスの終了を待つ．
+        :param Popen proc: プロセス
+        :param float time_limit: 時間の上限(秒)
+        :return: 正常に終了した時 True を返す．
+        時間の上限を超えた場合はプロセスを終了させて False を返す．
+        待っている間に例外(KeyboardInterrupt など)が起きた場合も
+        プロセスを終了させてから例外を送出する．
+        """
+        try:
+            proc.wait(timeout=time_limit)
+        except subprocess.TimeoutExpired:
+            kill_proc(proc)
+            proc.wait()
+        except BaseException:
+            kill_proc(proc)
+            proc.wait()
+            raise
+        finally:
+            with self._lock:
+                self._proc_list.remove(proc)
+        with self._lock:
+            interrupted = self._interrupted
+        # kill() で終了した場合は returncode が負(シグナル番号)になる．
+        return not interrupted and proc.returncode >= 0
+
+    def _solve_pipe(self, assumption_list, time_limit):
+        """パイプモードで SAT 問題を解く．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :param float time_limit: 時間の上限(秒)
+        :return: (result, model) を返す．
+        DIMACS 形式の入力を SAT ソルバの標準入力に流し込み，
+        標準出力に SAT competition の形式で出力された
+        's' 行と 'v' 行を読み込む．
+        一時ファイルは用いない．
+        """
+        command_line = [self._satprog]
+        if self._debug:
+            print(f'SAT program: {self._satprog}')
+            derr = None
+        else:
+            derr = subprocess.DEVNULL
+        proc = self._start_proc(command_line,
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE,
+                                stderr=derr,
+                                universal_newlines=True)
+
+        # 入力の書き込みは別スレッドで行う．
+        def feed():
+            try:
+                self.write_dimacs(proc.stdin, assumption_list)
+                proc.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+        thread = threading.Thread(target=feed)
+        thread.start()
 
+        # 出力の読み込みは時間の上限を超えても戻ってこないので
+        # タイマーでプロセスを終了させる．
+        # 途中で終了させられた場合は出力が途切れるので
+        # read_competition_output() は SatBool3.X を返す．
+        timer = None
+        if time_limit is not None:
+            timer = threading.Timer(time_limit, kill_proc, args=(proc,))
+            timer.start()
+        result = SatBool3.X
+        model = []
+        try:
+            result, model = read_competition_output(proc.stdout, self._var_count)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if result == SatBool3.X:
+                kill_proc(proc)
+            thread.join()
+            proc.stdout.close()
+            self._wait_proc(proc, None)
         return result, model
 
+    def write_dimacs(self, fout, assumption_list=[]):
+        """DIMACS 形式で書き出す．
+        :param FILE fout: 出力先のファイルオブジェクト
+        :param list[int] assumption_list: 単位節として書き出す仮定のリスト
+        """
+        if self._spool is not None:
+            spool_end = self._finish_spool(assumption_list)
+            with open(self._spool_file, 'r') as fin:
+                shutil.copyfileobj(fin, fout)
+            self._spool.truncate(spool_end)
+            self._spool.seek(spool_end)
+            return
+
+        # ヘッダを書き出す．
+        clause_num = self._clause_num + len(assumption_list)
+        fout.write(f'p cnf {self._var_count} {clause_num}\n')
+
+        # 節の内容を書き出す．
+        # 節の区切りの 0 も含めて ' %d' の形でまとめて文字列に変換し，
+        # 区切りの後に改行を入れて行頭の空白を取り除く．
+        # 整数の表記は 0 から始まらないので ' 0' は区切りにしか現れない．
+        # 巨大な文字列を作らないように節の境界で分割する．
+        # 境界は DIMACS_CHUNK_SIZE 個ごとの位置から次の区切りの 0 まで進めて決める．
+        self._flush_lits()
+        lit_array = self._lit_array
+        n = len(lit_array)
+        pos1 = 0
+        while pos1 < n:
+            pos2 = min(pos1 + DIMACS_CHUNK_SIZE, n)
+            while lit_array[pos2 - 1] != 0:
+                pos2 += 1
+            chunk = lit_array[pos1:pos2]
+            pos1 = pos2
+            buff = (' %d' * len(chunk)) % tuple(chunk)
+            fout.write(buff.replace(' 0', ' 0\n').replace('\n ', '\n')[1:])
+
+        # assumption を単一リテラル節の形で書き出す．
+        for lit in assumption_list:
+            fout.write(f'{lit} 0\n')
+
+    def close(self):
+        """スプールファイルを削除する．
+        ストリーミングモード以外では何もしない．
+        """
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+            if not self._debug:
+                os.remove(self._spool_file)
+
+    def __del__(self):
+        if getattr(self, '_spool', None) is not None:
+            self.close()
+
+    def _finish_spool(self, assumption_list):
+        """スプールファイルを SAT ソルバに渡せる形にする．
+        :param list[int] assumption_list: 仮定する割り当てリスト
+        :return: 仮定を書き出す前のファイル位置を返す．
+        先頭のヘッダを書き換え，末尾に仮定を単位節として書き出す．
+        """
+        fout = self._spool
+        spool_end = fout.tell()
+        for lit in assumption_list:
+            fout.write(f'{lit} 0\n')
+        clause_num = self._clause_num + len(assumption_list)
+        fout.seek(0)
+        fout.write(make_header(self._var_count, clause_num))
+        fout.seek(0, os.SEEK_END)
+        fout.flush()
+        return spool_end
+
+    def _flush_lits(self):
+        """_lit_buffer に溜めたリテラルを _lit_array に移す．"""
+        if self._lit_buffer:
+            self._lit_array.fromlist(self._lit_buffer)
+            self._lit_buffer.clear()
+
+    def _filter_lits(self, args):
+        """add_clause() の引数を1つずつチェックしてリテラルのリストを作る．
+        :param args: add_clause() の引数
+        :return: リテラルのリストを返す．
+        - 単独で与えられた不正なリテラルは取り除く．
+        - リストの中に不正なリテラルがある場合は None を返す．
+        """
+        tmp_list = []
+        for arg in args:
+            if isinstance(arg, int):
+                # singleton の場合
+                lit = arg
+                if self._check_lit(lit):
+                    tmp_list.append(lit)
+            else:
+                # リストの場合
+                for lit in arg:
+                    if not self._check_lit(lit):
+                        return None
+                    tmp_list.append(lit)
+        return tmp_list
+
     def _check_lit(self, lit):
         """リテラルが適正な値かチェックする．"""
         if lit > 0:
@@ -157,3 +445,85 @@ class SatSolver:
             print('Error in add_clause(), {} is out of range'.format(lit))
             return False
         return True
+
+
+def kill_proc(proc):
+    """SAT ソルバのプロセスをプロセスグループごと終了させる．
+    :param Popen proc: プロセス
+    すでに終了している場合は何もしない．
+    """
+    if proc.poll() is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def make_header(var_num, clause_num):
+    """スプールファイル用の固定長のヘッダを作る．
+    :param int var_num: 変数の数
+    :param int clause_num: 節の数
+    'p cnf' 行の後ろを SPOOL_HEADER_SIZE バイトになるまでコメント行で埋める．
+    """
+    header = f'p cnf {var_num} {clause_num}\n'
+    pad_size = SPOOL_HEADER_SIZE - len(header) - 2
+    assert pad_size >= 0
+    return header + 'c' + ' ' * pad_size + '\n'
+
+
+def read_minisat_output(fin, var_num):
+    """MiniSat2 の形式の結果ファイルを読み込む．
+    :param FILE fin: 入力ファイル
+    :param int var_num: 変数の数
+    :return: (result, model) を返す．
+    1行目が 'SAT' の時は2行目が解となる．
+    """
+    result = SatBool3.X
+    model = []
+    lines = fin.readlines()
+
+    # 1行目が結果
+    if lines and lines[0] == 'SAT\n':
+        assert len(lines) == 2
+        result = SatBool3.TRUE
+        # 割り当て結果を model に反映させる．
+        model = parse_model(lines[1], var_num)
+    elif lines and lines[0] == 'UNSAT\n':
+        result = SatBool3.FALSE
+    return result, model
+
+
+def read_competition_output(fin, var_num):
+    """SAT competition の形式の出力を読み込む．
+    :param FILE fin: 入力ファイル
+    :param int var_num: 変数の数
+    :return: (result, model) を返す．
+    's' 行と 'v' 行以外(コメント行など)は読み飛ばす．
+    'v' 行が末尾の 0 まで揃わずに終わった場合は SatBool3.X を返す．
+    """
+    result = SatBool3.X
+    model = []
+    v_list = []
+    complete = False
+    for line in fin:
+        if line.startswith('s '):
+            status = line[2:].strip()
+            if status == 'SATISFIABLE':
+                result = SatBool3.TRUE
+            elif status == 'UNSATISFIABLE':
+                result = SatBool3.FALSE
+                break
+            else:
+                break
+        elif line.startswith('v ') and result == SatBool3.TRUE:
+            # 'v' 行の中身をまとめて変換する．
+            v_list.append(line[2:])
+            if line.split()[-1] == '0':
+                complete = True
+                break
+    if result == SatBool3.TRUE:
+        if not complete:
+            return SatBool3.X, model
+        model = parse_model(' '.join(v_list), var_num)
+    return result, model
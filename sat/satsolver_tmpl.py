@@ -33,17 +33,44 @@ class SatSolver :
     # 符号が極性を表す．
     # たとえば 3 なら 3番目の変数の肯定
     # -1 なら 1番目の変数の否定を表す．
+    #
+    # solve() の後に呼び出してもよい．
+    # その場合，次の solve() は追加された節も含めて解く．
     def add_clause(self, lit_list) :
         pass
 
 
     ## @brief SAT問題を解く．
     # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] time_limit 時間の上限(秒, キーワード引数)
+    # @param[in] conflict_limit 衝突回数の上限(キーワード引数)
     # @return (result, model) を返す．
     #
     # - result は SatBool3
-    # - model は結果の各変数に対する値を格納したリスト
+    # - model は結果の各変数に対する値を格納した SatModel
     #   変数番号が 1番の変数の値は model[1] に入っている．
     #   値は SatBool3
-    def solve(self, assumption_list) :
+    #
+    # 上限を超えた場合や interrupt() で中断された場合は
+    # result は SatBool3.X となる．
+    # conflict_limit に対応していない実装では無視してよい．
+    #
+    # 仮定はこの呼び出しの間だけ有効で，節としては残らない．
+    # 何度呼び出してもよい．
+    # インクリメンタルなソルバ(CdclSolver, ChildSolver)は
+    # 前回までに追加された節と学習結果を保持したまま解く．
+    def solve(self, assumption_list, *, time_limit=None, conflict_limit=None) :
+        pass
+
+
+    ## @brief 実行中の solve() を中断する．
+    #
+    # 別のスレッドから呼び出してよい．
+    # clear_interrupt() が呼ばれるまで以降の solve() も中断される．
+    def interrupt(self) :
+        pass
+
+
+    ## @brief interrupt() による中断要求を取り消す．
+    def clear_interrupt(self) :
         pass
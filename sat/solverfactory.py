@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+
+"""SAT ソルバを名前から生成する関数
+:file: solverfactory.py
+:author: Yusuke Matsunaga (松永 裕介)
+
+Copyright (C) 2020 Yusuke Matsunaga
+All rights reserved.
+"""
+
+from sat.satsolver import SatSolver
+from sat.cdclsolver import CdclSolver
+from sat.childsolver import ChildSolver
+from sat.portfoliosolver import PortfolioSolver
+
+
+# 外部プログラムを用いない(組み込みの)ソルバの辞書
+# キーは名前，値はクラス
+builtin_solver_dict = {
+    'cdcl': CdclSolver,
+    'cdcl-child': ChildSolver,
+}
+
+
+def new_solver(satprog, *, stream=False, pipe=False, portfolio_stats=None):
+    """SAT ソルバを作る．
+    :param str satprog: ソルバ名もしくはSATソルバのプログラム名
+    :param bool stream: SatSolver をストリーミングモードにする時 True にする．
+    :param bool pipe: SatSolver をパイプモードにする時 True にする．
+    :param str portfolio_stats: PortfolioSolver の統計情報のファイル名
+    satprog が builtin_solver_dict に登録されている名前の場合は
+    組み込みのソルバを作る．
+    satprog がリストの場合は各要素をコマンド行とする
+    PortfolioSolver を作る(要素が1つの場合はその要素を satprog とみなす)．
+    PortfolioSolver のメンバーは外部プログラムとして起動するので，
+    組み込みのソルバの名前は指定できない(ValueError となる)．
+    それ以外の場合は satprog を外部プログラムとして起動する
+    SatSolver を作る．
+    """
+    if isinstance(satprog, (list, tuple)):
+        if len(satprog) > 1:
+            for satprog1 in satprog:
+                if satprog1 in builtin_solver_dict:
+                    raise ValueError(f'{satprog1}: builtin solver cannot be a portfolio member')
+            return PortfolioSolver(satprog, stream=stream, pipe=pipe,
+                                   stats_file=portfolio_stats)
+        satprog = satprog[0]
+    if satprog in builtin_solver_dict:
+        return builtin_solver_dict[satprog]()
+    return SatSolver(satprog, stream=stream, pipe=pipe)
@@ -9,20 +9,111 @@ All rights reserved.
 """
 
 if __name__ == '__main__':
+    import argparse
     import sys
     from core.adc2019parser import Adc2019Parser
-    from sat.adc2019enc import solve_adc2019
+    from sat.satbool3 import SatBool3
+    from sat.adc2019enc import solve_adc2019, AMO_FAMILY_LIST
+    from sat.amoencoder import AMO_METHOD_LIST
+    from sat.adc2019cache import Adc2019Cache
+    from sat.adc2019minimize import minimize_adc2019, minimize_adc2019_incremental
+    from sat.adc2019minimize import is_optimal
 
-    if len(sys.argv) != 5:
-        print('USAGE: {} <problem-filename> <width> <height> <sat-program>'.format(sys.argv[0]))
-        exit(1)
+    # コマンドラインパーサーの作成
+    parser = argparse.ArgumentParser(
+        usage='%(prog)s [options] input width height satprog [satprog ...]\n'
+        '       %(prog)s [options] --minimize input satprog [satprog ...]')
+    parser.add_argument('--stream', action='store_true',
+                        help='write clauses to a spool file as they are generated')
+    parser.add_argument('--pipe', action='store_true',
+                        help='pass the CNF to the SAT program through a pipe')
+    parser.add_argument('--time-limit', type=float,
+                        help='time limit of the SAT solver in seconds')
+    parser.add_argument('--conflict-limit', type=int,
+                        help='conflict limit of the SAT solver (builtin solvers only)')
+    parser.add_argument('--portfolio-stats', type=str, metavar='FILE',
+                        help='record win statistics of the portfolio to FILE')
+    parser.add_argument('--simplify', action='store_true',
+                        help='simplify the CNF before passing it to the SAT solver '
+                        '(the shrinkage is reported to stderr). '
+                        'NOTE: this currently has no effect on the CNF generated '
+                        'by Adc2019Enc and only adds runtime')
+    parser.add_argument('--stats', action='store_true',
+                        help='report the size and the generation time of each '
+                        'constraint family of the CNF to stderr')
+    parser.add_argument('--cache', type=str, metavar='DIR',
+                        help='reuse and record results in the cache directory DIR')
+    parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                        help='size limit of the cache in megabytes [default: 256]')
+    parser.add_argument('--amo', type=str, action='append', default=[],
+                        metavar='[FAMILY=]METHOD',
+                        help='encoding of at-most-one/one-hot constraints '
+                        f'(FAMILY: {", ".join(AMO_FAMILY_LIST)}; '
+                        f'METHOD: {", ".join(AMO_METHOD_LIST)}; '
+                        'without FAMILY, METHOD is used for all families)')
+    parser.add_argument('--no-symmetry-breaking', action='store_true',
+                        help='do not add symmetry-breaking constraints')
+    parser.add_argument('--minimize', action='store_true',
+                        help='search the board of the minimum area '
+                        '(width and height are not given)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='in --minimize mode, encode the largest board once '
+                        'and shrink it by assumptions (-j and --cache are ignored)')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='number of parallel probes in --minimize mode '
+                        '[default: number of CPUs]')
+    parser.add_argument('--max-width', type=int,
+                        help='maximum width in --minimize mode '
+                        '[default: the size of the problem]')
+    parser.add_argument('--max-height', type=int,
+                        help='maximum height in --minimize mode '
+                        '[default: the size of the problem]')
+    parser.add_argument('input', type=str,
+                        help='problem filename')
+    parser.add_argument('args', type=str, nargs='+', metavar='...',
+                        help='width and height of the board (without --minimize) '
+                        'and SAT program names '
+                        '(several command lines make a parallel portfolio)')
 
-    ifile = sys.argv[1]
+    # コマンド行の解析
+    args = parser.parse_args()
 
-    width = int(sys.argv[2])
-    height = int(sys.argv[3])
+    ifile = args.input
 
-    satprog = sys.argv[4]
+    if args.minimize:
+        satprog = args.args
+    else:
+        if len(args.args) < 3:
+            parser.error('width, height and satprog are required')
+        try:
+            width = int(args.args[0])
+            height = int(args.args[1])
+        except ValueError:
+            parser.error('width and height must be integers')
+        satprog = args.args[2:]
+
+    # At-Most-One 制約の符号化方法
+    amo_encoding = dict()
+    for spec in args.amo:
+        family, _, method = spec.rpartition('=')
+        if method not in AMO_METHOD_LIST:
+            parser.error(f'{method}: unknown encoding method')
+        if family == '':
+            for family in AMO_FAMILY_LIST:
+                amo_encoding[family] = method
+        elif family in AMO_FAMILY_LIST:
+            amo_encoding[family] = method
+        else:
+            parser.error(f'{family}: unknown constraint family')
+    enc_options = dict()
+    if amo_encoding:
+        enc_options['amo_encoding'] = amo_encoding
+    if args.no_symmetry_breaking:
+        enc_options['symmetry_breaking'] = False
+
+    cache = None
+    if args.cache is not None:
+        cache = Adc2019Cache(args.cache, max_size=args.cache_size << 20)
 
     parser = Adc2019Parser()
 
@@ -32,7 +123,61 @@ if __name__ == '__main__':
             print('{}: read failed.'.format(ifile))
             exit(-1)
 
-        ans = solve_adc2019(problem, width, height, satprog)
+        if args.minimize:
+            # 試行の結果はその都度標準エラー出力に出力する．
+            if args.incremental:
+                ans, probe_list = minimize_adc2019_incremental(
+                    problem, satprog,
+                    max_width=args.max_width,
+                    max_height=args.max_height,
+                    log_out=sys.stderr,
+                    stream=args.stream, pipe=args.pipe,
+                    time_limit=args.time_limit,
+                    conflict_limit=args.conflict_limit,
+                    portfolio_stats=args.portfolio_stats,
+                    simplify=args.simplify,
+                    stats_out=sys.stderr,
+                    enc_options=enc_options,
+                    enc_stats=args.stats)
+            else:
+                ans, probe_list = minimize_adc2019(problem, satprog,
+                                                   jobs=args.jobs,
+                                                   max_width=args.max_width,
+                                                   max_height=args.max_height,
+                                                   log_out=sys.stderr,
+                                                   stream=args.stream, pipe=args.pipe,
+                                                   time_limit=args.time_limit,
+                                                   conflict_limit=args.conflict_limit,
+                                                   portfolio_stats=args.portfolio_stats,
+                                                   cache=cache,
+                                                   simplify=args.simplify,
+                                                   stats_out=sys.stderr if args.stats else None,
+                                                   enc_options=enc_options,
+                                                   enc_stats=args.stats)
+            total_time = sum(probe.time for probe in probe_list)
+            print(f'{len(probe_list)} probes, {total_time:.2f}s in total', file=sys.stderr)
+            if ans is None:
+                print('UNSAT' if is_optimal(ans, probe_list) else 'UNKNOWN')
+            else:
+                if not is_optimal(ans, probe_list):
+                    print('the answer may not be optimal.', file=sys.stderr)
+                ans.print()
+            exit(0)
+
+        stat, ans = solve_adc2019(problem, width, height, satprog,
+                                  stream=args.stream, pipe=args.pipe,
+                                  time_limit=args.time_limit,
+                                  conflict_limit=args.conflict_limit,
+                                  portfolio_stats=args.portfolio_stats,
+                                  cache=cache,
+                                  simplify=args.simplify,
+                                  stats_out=sys.stderr,
+                                  enc_options=enc_options,
+                                  enc_stats=args.stats)
 
-        if ans is not None:
+        if stat == SatBool3.TRUE:
             ans.print()
+        elif stat == SatBool3.FALSE:
+            print('UNSAT')
+        else:
+            print('UNKNOWN')